@@ -1,7 +1,7 @@
 from __future__ import unicode_literals
 
 from django.db import models
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.contrib.auth.models import User
 from django.dispatch import receiver
 
@@ -60,3 +60,11 @@ class Profile(TimeStampedModel):
 def create_user_profile(sender, instance, created, **kwargs):
     if created:
         Profile.objects.create(user=instance)
+
+
+@receiver(post_save, sender="account.EmailAddress")
+@receiver(post_delete, sender="account.EmailAddress")
+def invalidate_email_verification(sender, instance, **kwargs):
+    from .utils import invalidate_authorization_context
+
+    invalidate_authorization_context([instance.user_id])
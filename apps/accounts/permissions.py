@@ -1,7 +1,7 @@
-from allauth.account.models import EmailAddress
-from django.conf import settings
 from rest_framework import permissions
 
+from .utils import get_authorization_context
+
 
 class HasVerifiedEmail(permissions.BasePermission):
     """
@@ -15,11 +15,5 @@ class HasVerifiedEmail(permissions.BasePermission):
         if request.user.is_anonymous:
             return True
         else:
-            email_query = EmailAddress.objects.filter(user=request.user)
-            require_verified = settings.ACCOUNT_EMAIL_REQUIRED
-            if require_verified:
-                email_query = email_query.filter(verified=True)
-            if email_query.exists():
-                return True
-            else:
-                return False
+            context = get_authorization_context(request.user)
+            return context.has_verified_email
@@ -0,0 +1,127 @@
+from allauth.account.models import EmailAddress
+from django.conf import settings
+from django.core.cache import cache
+
+from base.utils import get_request_memo
+
+AUTHORIZATION_CACHE_KEY = "user_{}_authorization_{}"
+AUTHORIZATION_CACHE_TIMEOUT = 5 * 60
+AUTHORIZATION_FIELDS = (
+    "hosted_challenge_pks",
+    "participated_challenge_pks",
+    "has_verified_email",
+)
+
+
+class AuthorizationContext(object):
+    """
+    Hosted challenges, participated challenges and email verification
+    status of a user.
+
+    Each value is computed with one query the first time it is needed, then
+    cached per user and memoized for the rest of the request, so that the
+    permission checks of a request do not query the same data repeatedly.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.values = {}
+        self.created_challenges = {}
+
+    def get(self, field):
+        if field not in self.values:
+            cache_key = AUTHORIZATION_CACHE_KEY.format(self.user.pk, field)
+            value = cache.get(cache_key)
+            if value is None:
+                value = getattr(self, "get_{}".format(field))()
+                cache.set(cache_key, value, AUTHORIZATION_CACHE_TIMEOUT)
+            self.values[field] = value
+        return self.values[field]
+
+    @property
+    def hosted_challenge_pks(self):
+        return self.get("hosted_challenge_pks")
+
+    @property
+    def participated_challenge_pks(self):
+        return self.get("participated_challenge_pks")
+
+    @property
+    def has_verified_email(self):
+        return self.get("has_verified_email")
+
+    def is_challenge_creator(self, challenge_pk):
+        """
+        Returns boolean if the user created the host team of a challenge,
+        memoized for the request only
+        """
+        from challenges.models import Challenge
+
+        challenge_pk = int(challenge_pk)
+        if challenge_pk not in self.created_challenges:
+            created_by = (
+                Challenge.objects.filter(pk=challenge_pk)
+                .values_list("creator__created_by", flat=True)
+                .first()
+            )
+            self.created_challenges[challenge_pk] = (
+                created_by == self.user.pk
+            )
+        return self.created_challenges[challenge_pk]
+
+    def get_hosted_challenge_pks(self):
+        from challenges.models import Challenge
+
+        return frozenset(
+            Challenge.objects.filter(
+                creator__challengehost__user=self.user
+            ).values_list("pk", flat=True)
+        )
+
+    def get_participated_challenge_pks(self):
+        from challenges.models import Challenge
+
+        return frozenset(
+            Challenge.objects.filter(
+                participant_teams__participants__user=self.user
+            ).values_list("pk", flat=True)
+        )
+
+    def get_has_verified_email(self):
+        email_query = EmailAddress.objects.filter(user=self.user)
+        if settings.ACCOUNT_EMAIL_REQUIRED:
+            email_query = email_query.filter(verified=True)
+        return email_query.exists()
+
+
+def get_authorization_context(user):
+    """
+    Returns the `AuthorizationContext` of an authenticated user, shared by
+    all the permission checks of the current request
+    """
+    memo = get_request_memo()
+    if memo is None:
+        return AuthorizationContext(user)
+    memo_key = "authorization_context_{}".format(user.pk)
+    if memo_key not in memo:
+        memo[memo_key] = AuthorizationContext(user)
+    return memo[memo_key]
+
+
+def invalidate_authorization_context(user_pks):
+    """
+    Drops the cached and memoized authorization data of users, e.g. when
+    they join a team or when their team joins a challenge
+    """
+    user_pks = list(user_pks)
+    cache.delete_many(
+        [
+            AUTHORIZATION_CACHE_KEY.format(user_pk, field)
+            for user_pk in user_pks
+            for field in AUTHORIZATION_FIELDS
+        ]
+    )
+    memo = get_request_memo()
+    if memo is not None:
+        for user_pk in user_pks:
+            memo.pop("authorization_context_{}".format(user_pk), None)
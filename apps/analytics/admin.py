@@ -1 +1,23 @@
-# Register your models here.
+from django.contrib import admin
+
+from base.admin import TimeStampedAdmin
+
+from .models import ExportJob
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(TimeStampedAdmin):
+    list_display = (
+        "id",
+        "challenge",
+        "export_type",
+        "file_format",
+        "status",
+        "rows_count",
+        "created_by",
+        "created_at",
+        "completed_at",
+    )
+    list_filter = ("export_type", "file_format", "status")
+    search_fields = ("challenge__title", "created_by__username")
+    raw_id_fields = ("challenge", "challenge_phase", "created_by")
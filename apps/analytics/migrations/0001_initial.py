@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.20 on 2026-10-18 16:10
+from __future__ import unicode_literals
+
+import base.utils
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('challenges', '0060_add_leaderboard_snapshot_model'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('modified_at', models.DateTimeField(auto_now=True)),
+                ('export_type', models.CharField(choices=[('submissions', 'submissions'), ('participants', 'participants')], max_length=30)),
+                ('file_format', models.CharField(choices=[('csv', 'csv'), ('jsonl', 'jsonl'), ('parquet', 'parquet')], max_length=30)),
+                ('status', models.CharField(choices=[('queued', 'queued'), ('running', 'running'), ('finished', 'finished'), ('failed', 'failed')], default='queued', max_length=30)),
+                ('fingerprint', models.CharField(db_index=True, max_length=32)),
+                ('export_file', models.FileField(blank=True, null=True, upload_to=base.utils.RandomFileName('exports'))),
+                ('rows_count', models.PositiveIntegerField(default=0)),
+                ('error_message', models.TextField(blank=True, default='')),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('challenge', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='export_jobs', to='challenges.Challenge')),
+                ('challenge_phase', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='challenges.ChallengePhase')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'export_job',
+            },
+        ),
+    ]
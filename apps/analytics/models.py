@@ -1 +1,77 @@
-# Create your models here.
+from __future__ import unicode_literals
+
+from django.contrib.auth.models import User
+from django.db import models
+
+from base.models import TimeStampedModel
+from base.utils import RandomFileName
+
+
+class ExportJob(TimeStampedModel):
+    """
+    Model representing a bulk export of the submissions or the participant
+    teams of a challenge, generated in the background by a celery worker
+    """
+
+    # export types
+    SUBMISSIONS = "submissions"
+    PARTICIPANTS = "participants"
+
+    # file formats
+    CSV = "csv"
+    JSONL = "jsonl"
+    PARQUET = "parquet"
+
+    # status options
+    QUEUED = "queued"
+    RUNNING = "running"
+    FINISHED = "finished"
+    FAILED = "failed"
+
+    EXPORT_TYPE_OPTIONS = (
+        (SUBMISSIONS, SUBMISSIONS),
+        (PARTICIPANTS, PARTICIPANTS),
+    )
+
+    FILE_FORMAT_OPTIONS = ((CSV, CSV), (JSONL, JSONL), (PARQUET, PARQUET))
+
+    STATUS_OPTIONS = (
+        (QUEUED, QUEUED),
+        (RUNNING, RUNNING),
+        (FINISHED, FINISHED),
+        (FAILED, FAILED),
+    )
+
+    challenge = models.ForeignKey(
+        "challenges.Challenge", related_name="export_jobs"
+    )
+    challenge_phase = models.ForeignKey(
+        "challenges.ChallengePhase", null=True, blank=True
+    )
+    created_by = models.ForeignKey(User)
+    export_type = models.CharField(
+        max_length=30, choices=EXPORT_TYPE_OPTIONS
+    )
+    file_format = models.CharField(max_length=30, choices=FILE_FORMAT_OPTIONS)
+    status = models.CharField(
+        max_length=30, choices=STATUS_OPTIONS, default=QUEUED
+    )
+    # Digest of the exported rows' state, used to reuse an export when
+    # nothing has changed since it was generated
+    fingerprint = models.CharField(max_length=32, db_index=True)
+    export_file = models.FileField(
+        upload_to=RandomFileName("exports"), null=True, blank=True
+    )
+    rows_count = models.PositiveIntegerField(default=0)
+    error_message = models.TextField(blank=True, default="")
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return "{}: {} ({})".format(
+            self.challenge_id, self.export_type, self.file_format
+        )
+
+    class Meta:
+        app_label = "analytics"
+        db_table = "export_job"
@@ -1,5 +1,7 @@
 from rest_framework import serializers
 
+from .models import ExportJob
+
 
 class ChallengePhaseSubmissionAnalytics(object):
     def __init__(
@@ -62,3 +64,46 @@ class LastSubmissionTimestampSerializer(serializers.Serializer):
         format=None
     )
     challenge_phase = serializers.IntegerField()
+
+
+class CreateExportJobSerializer(serializers.Serializer):
+    export_type = serializers.ChoiceField(choices=ExportJob.EXPORT_TYPE_OPTIONS)
+    file_format = serializers.ChoiceField(
+        choices=ExportJob.FILE_FORMAT_OPTIONS, default=ExportJob.CSV
+    )
+    challenge_phase = serializers.IntegerField(required=False)
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+
+    url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportJob
+        fields = (
+            "id",
+            "challenge",
+            "challenge_phase",
+            "export_type",
+            "file_format",
+            "status",
+            "rows_count",
+            "error_message",
+            "created_at",
+            "started_at",
+            "completed_at",
+            "url",
+        )
+
+    def get_url(self, obj):
+        """
+        Returns the url of a finished export, which the S3 media storage
+        presigns with an expiring signature
+        """
+        if obj.status != ExportJob.FINISHED or not obj.export_file:
+            return None
+        url = obj.export_file.url
+        request = self.context.get("request")
+        if request is not None:
+            url = request.build_absolute_uri(url)
+        return url
@@ -0,0 +1,49 @@
+import logging
+import tempfile
+
+from django.core.files import File
+from django.utils import timezone
+
+from evalai.celery import app
+
+from .models import ExportJob
+from .utils import write_export_file
+
+logger = logging.getLogger(__name__)
+
+
+@app.task
+def run_export_job(export_job_pk):
+    """
+    Writes the rows of an export job to a temporary file and stores it
+    """
+    export_job = ExportJob.objects.select_related(
+        "challenge", "challenge_phase"
+    ).get(pk=export_job_pk)
+    export_job.status = ExportJob.RUNNING
+    export_job.started_at = timezone.now()
+    export_job.save(update_fields=["status", "started_at", "modified_at"])
+    try:
+        with tempfile.TemporaryFile() as export_file:
+            export_job.rows_count = write_export_file(export_job, export_file)
+            export_file.seek(0)
+            export_job.export_file.save(
+                "{}_{}.{}".format(
+                    export_job.export_type,
+                    export_job.challenge_id,
+                    export_job.file_format,
+                ),
+                File(export_file),
+                save=False,
+            )
+        export_job.status = ExportJob.FINISHED
+    except Exception as e:
+        logger.exception(
+            "Exception while running export job {}: {}".format(
+                export_job_pk, e
+            )
+        )
+        export_job.status = ExportJob.FAILED
+        export_job.error_message = str(e)
+    export_job.completed_at = timezone.now()
+    export_job.save()
@@ -18,11 +18,21 @@ urlpatterns = [
         views.get_submission_count,
         name="get_submission_count",
     ),
+    url(
+        r"^challenge/(?P<challenge_pk>[0-9]+)/submission/trends$",
+        views.get_submission_trends_of_challenge,
+        name="get_submission_trends_of_challenge",
+    ),
     url(
         r"^challenge/(?P<challenge_pk>[0-9]+)/challenge_phase/(?P<challenge_phase_pk>[0-9]+)/analytics$",
         views.get_challenge_phase_submission_analysis,
         name="get_challenge_phase_submission_analysis",
     ),
+    url(
+        r"^challenge/(?P<challenge_pk>[0-9]+)/analytics$",
+        views.get_challenge_analytics_of_all_phases,
+        name="get_challenge_analytics_of_all_phases",
+    ),
     url(
         r"^challenge/(?P<challenge_pk>[0-9]+)/challenge_phase/(?P<challenge_phase_pk>[0-9]+)/count$",
         views.get_challenge_phase_submission_count_by_team,
@@ -45,4 +55,14 @@ urlpatterns = [
         views.download_all_participants,
         name="download_all_participants",
     ),
+    url(
+        r"^challenges/(?P<challenge_pk>[0-9]+)/exports/$",
+        views.create_export_job,
+        name="create_export_job",
+    ),
+    url(
+        r"^challenges/(?P<challenge_pk>[0-9]+)/exports/(?P<export_job_pk>[0-9]+)/$",
+        views.get_export_job,
+        name="get_export_job",
+    ),
 ]
@@ -0,0 +1,455 @@
+import codecs
+import csv
+import hashlib
+import json
+
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.db.models import (
+    Case,
+    Count,
+    IntegerField,
+    Max,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    When,
+)
+from django.db.models.functions import Trunc
+from django.utils import timezone
+from rest_framework.utils.encoders import JSONEncoder
+
+from base.utils import QUERYSET_CHUNK_SIZE
+from challenges.models import ChallengePhase
+from jobs.models import Submission, SubmissionRollup
+from jobs.utils import serialize_submissions_in_chunks
+from participants.models import Participant, ParticipantTeam
+from participants.utils import get_participant_team_roster
+
+from .models import ExportJob
+
+# Queued or running exports older than this are considered lost and are
+# not reused
+EXPORT_JOB_TIMEOUT = timedelta(hours=1)
+
+SUBMISSION_TREND_GRANULARITIES = ("hour", "day", "week", "month")
+
+# Columns of the exports with their parquet types
+SUBMISSION_EXPORT_COLUMNS = (
+    ("id", "int64"),
+    ("team_name", "string"),
+    ("team_members", "string"),
+    ("team_members_email_ids", "string"),
+    ("team_members_affiliations", "string"),
+    ("challenge_phase", "string"),
+    ("status", "string"),
+    ("created_by", "string"),
+    ("execution_time", "double"),
+    ("submission_number", "int64"),
+    ("method_name", "string"),
+    ("input_file", "string"),
+    ("stdout_file", "string"),
+    ("stderr_file", "string"),
+    ("submission_result_file", "string"),
+    ("submission_metadata_file", "string"),
+    ("submitted_at", "string"),
+)
+
+PARTICIPANT_EXPORT_COLUMNS = (
+    ("team_name", "string"),
+    ("team_members", "string"),
+    ("team_members_email_ids", "string"),
+)
+
+
+def get_submission_analytics_aggregates(prefix=""):
+    """
+    Returns the aggregates of the submission analytics, computed together
+    with conditional aggregation. `prefix` is the lookup path from the
+    aggregated model to the submissions.
+    """
+
+    def count_submissions(**lookups):
+        lookups = {
+            "{}{}".format(prefix, lookup): value
+            for lookup, value in lookups.items()
+        }
+        return Sum(
+            Case(
+                When(then=1, **lookups),
+                default=0,
+                output_field=IntegerField(),
+            )
+        )
+
+    aggregates = {
+        "total_submissions": Count("{}id".format(prefix)),
+        "participant_team_count": Count(
+            "{}participant_team".format(prefix), distinct=True
+        ),
+        "flagged_submissions_count": count_submissions(is_flagged=True),
+        "public_submissions_count": count_submissions(is_public=True),
+        "last_submission_timestamp": Max("{}submitted_at".format(prefix)),
+    }
+    for submission_status, _ in Submission.STATUS_OPTIONS:
+        aggregates[
+            "{}_submissions_count".format(submission_status)
+        ] = count_submissions(status=submission_status)
+    return aggregates
+
+
+def get_challenge_analytics(challenge):
+    """
+    Returns the submission analytics of every phase of a challenge, computed
+    in one grouped query
+    """
+    challenge_phases = (
+        ChallengePhase.objects.filter(challenge=challenge)
+        .values("pk", "name")
+        .annotate(**get_submission_analytics_aggregates("submissions__"))
+        .order_by("pk")
+    )
+    phase_analytics = []
+    for challenge_phase in challenge_phases:
+        phase_analytics.append(
+            {
+                "challenge_phase": challenge_phase["pk"],
+                "name": challenge_phase["name"],
+                "total_submissions": challenge_phase["total_submissions"],
+                "participant_team_count": challenge_phase[
+                    "participant_team_count"
+                ],
+                "flagged_submissions_count": challenge_phase[
+                    "flagged_submissions_count"
+                ],
+                "public_submissions_count": challenge_phase[
+                    "public_submissions_count"
+                ],
+                "status_counts": OrderedDict(
+                    (
+                        submission_status,
+                        challenge_phase[
+                            "{}_submissions_count".format(submission_status)
+                        ],
+                    )
+                    for submission_status, _ in Submission.STATUS_OPTIONS
+                ),
+                "last_submission_timestamp": challenge_phase[
+                    "last_submission_timestamp"
+                ],
+            }
+        )
+    last_submission_timestamps = [
+        analytics["last_submission_timestamp"]
+        for analytics in phase_analytics
+        if analytics["last_submission_timestamp"] is not None
+    ]
+    return {
+        "challenge": challenge.pk,
+        "last_submission_timestamp_in_challenge": max(
+            last_submission_timestamps
+        )
+        if last_submission_timestamps
+        else None,
+        "challenge_phases": phase_analytics,
+    }
+
+
+def get_last_submission_timestamps(challenge, challenge_phase):
+    """
+    Returns the last submission time in a challenge and in one of its phases.
+    The last submission time of each phase is read with a correlated
+    subquery, i.e. a backward scan of the (challenge_phase, submitted_at)
+    index, and the one of the challenge is the latest of them.
+    """
+    last_submitted_at = Submission.objects.filter(
+        challenge_phase=OuterRef("pk")
+    ).order_by("-submitted_at")
+    last_submission_timestamps = dict(
+        ChallengePhase.objects.filter(challenge=challenge)
+        .annotate(
+            last_submitted_at=Subquery(
+                last_submitted_at.values("submitted_at")[:1]
+            )
+        )
+        .values_list("pk", "last_submitted_at")
+    )
+    return {
+        "last_submission_timestamp_in_challenge": max(
+            filter(None, last_submission_timestamps.values()), default=None
+        ),
+        "last_submission_timestamp_in_challenge_phase": last_submission_timestamps.get(
+            challenge_phase.pk
+        ),
+    }
+
+
+def get_submission_rollups(challenge, since=None, challenge_phase=None):
+    rollups = SubmissionRollup.objects.filter(
+        challenge_phase__challenge=challenge
+    )
+    if since is not None:
+        rollups = rollups.filter(hour__gte=since)
+    if challenge_phase is not None:
+        rollups = rollups.filter(challenge_phase=challenge_phase)
+    return rollups
+
+
+def get_submission_count_since(challenge, since=None):
+    """
+    Returns the number of submissions of a challenge made since an hour,
+    read from the submission rollups
+    """
+    submission_count = get_submission_rollups(challenge, since).aggregate(
+        submission_count=Sum("count")
+    )["submission_count"]
+    return submission_count or 0
+
+
+def get_submission_trends(
+    challenge, granularity, since=None, challenge_phase=None
+):
+    """
+    Returns the number of submissions of each status per hour, day, week or
+    month, read from the submission rollups
+    """
+    rollups = (
+        get_submission_rollups(challenge, since, challenge_phase)
+        .annotate(period=Trunc("hour", granularity))
+        .values("period", "status")
+        .annotate(submission_count=Sum("count"))
+        .filter(submission_count__gt=0)
+        .order_by("period", "status")
+    )
+    trends = OrderedDict()
+    for rollup in rollups:
+        trend = trends.setdefault(
+            rollup["period"],
+            {"period": rollup["period"], "total": 0, "status_counts": {}},
+        )
+        trend["total"] += rollup["submission_count"]
+        trend["status_counts"][rollup["status"]] = rollup["submission_count"]
+    return list(trends.values())
+
+
+def get_export_submissions(challenge, challenge_phase=None):
+    submissions = Submission.objects.filter(
+        challenge_phase__challenge=challenge
+    )
+    if challenge_phase is not None:
+        submissions = submissions.filter(challenge_phase=challenge_phase)
+    return submissions.order_by("-submitted_at")
+
+
+def get_submission_export_rows(challenge, challenge_phase=None):
+    """Yields the rows of a submissions export"""
+    submissions = get_export_submissions(challenge, challenge_phase)
+    for submission in serialize_submissions_in_chunks(submissions):
+        members = submission["participant_team_members"]
+        execution_time = submission["execution_time"]
+        if not isinstance(execution_time, float):
+            execution_time = None
+        yield OrderedDict(
+            [
+                ("id", submission["id"]),
+                ("team_name", submission["participant_team"]),
+                (
+                    "team_members",
+                    ",".join(member["username"] for member in members),
+                ),
+                (
+                    "team_members_email_ids",
+                    ",".join(member["email"] for member in members),
+                ),
+                (
+                    "team_members_affiliations",
+                    ",".join(
+                        submission["participant_team_members_affiliations"]
+                    ),
+                ),
+                ("challenge_phase", submission["challenge_phase"]),
+                ("status", submission["status"]),
+                ("created_by", submission["created_by"]),
+                ("execution_time", execution_time),
+                ("submission_number", submission["submission_number"]),
+                ("method_name", submission["method_name"]),
+                ("input_file", submission["input_file"]),
+                ("stdout_file", submission["stdout_file"]),
+                ("stderr_file", submission["stderr_file"]),
+                (
+                    "submission_result_file",
+                    submission["submission_result_file"],
+                ),
+                (
+                    "submission_metadata_file",
+                    submission["submission_metadata_file"],
+                ),
+                ("submitted_at", submission["submitted_at"]),
+            ]
+        )
+
+
+def get_participant_export_rows(challenge):
+    """Yields the rows of a participant teams export"""
+    participant_teams = get_participant_team_roster(challenge).values_list(
+        "team_name", "team_member_usernames", "team_member_email_ids"
+    )
+    for team_name, usernames, email_ids in participant_teams.iterator():
+        yield OrderedDict(
+            [
+                ("team_name", team_name),
+                ("team_members", ",".join(usernames)),
+                ("team_members_email_ids", ",".join(email_ids)),
+            ]
+        )
+
+
+def get_export_rows(export_job):
+    if export_job.export_type == ExportJob.SUBMISSIONS:
+        return get_submission_export_rows(
+            export_job.challenge, export_job.challenge_phase
+        )
+    return get_participant_export_rows(export_job.challenge)
+
+
+def get_export_columns(export_type):
+    if export_type == ExportJob.SUBMISSIONS:
+        return SUBMISSION_EXPORT_COLUMNS
+    return PARTICIPANT_EXPORT_COLUMNS
+
+
+def get_export_fingerprint(
+    challenge, export_type, file_format, challenge_phase=None
+):
+    """
+    Returns a digest of the state of the rows of an export, which changes
+    whenever a row is added, removed or saved. Both exports show the
+    participant teams and their members.
+    """
+    state = ParticipantTeam.objects.filter(challenge=challenge).aggregate(
+        count=Count("id"), modified_at=Max("modified_at")
+    )
+    state.update(
+        Participant.objects.filter(team__challenge=challenge).aggregate(
+            members_count=Count("id"),
+            members_modified_at=Max("modified_at"),
+        )
+    )
+    if export_type == ExportJob.SUBMISSIONS:
+        state.update(
+            get_export_submissions(challenge, challenge_phase).aggregate(
+                submissions_count=Count("id"),
+                submissions_modified_at=Max("modified_at"),
+            )
+        )
+    key = [
+        challenge.pk,
+        export_type,
+        file_format,
+        challenge_phase.pk if challenge_phase else None,
+        sorted(state.items()),
+    ]
+    return hashlib.md5(
+        json.dumps(key, cls=JSONEncoder).encode("utf-8")
+    ).hexdigest()
+
+
+def get_reusable_export_job(challenge, fingerprint):
+    """
+    Returns a finished, running or recently queued export with the same
+    fingerprint, if any
+    """
+    return (
+        ExportJob.objects.filter(challenge=challenge, fingerprint=fingerprint)
+        .filter(
+            Q(status=ExportJob.FINISHED)
+            | Q(
+                status__in=[ExportJob.QUEUED, ExportJob.RUNNING],
+                created_at__gte=timezone.now() - EXPORT_JOB_TIMEOUT,
+            )
+        )
+        .order_by("-pk")
+        .first()
+    )
+
+
+def write_csv_export(rows, columns, export_file):
+    writer = csv.writer(codecs.getwriter("utf-8")(export_file))
+    writer.writerow([name for name, _ in columns])
+    rows_count = 0
+    for row in rows:
+        writer.writerow(list(row.values()))
+        rows_count += 1
+    return rows_count
+
+
+def write_jsonl_export(rows, columns, export_file):
+    rows_count = 0
+    for row in rows:
+        export_file.write(json.dumps(row, cls=JSONEncoder).encode("utf-8"))
+        export_file.write(b"\n")
+        rows_count += 1
+    return rows_count
+
+
+def write_parquet_export(rows, columns, export_file):
+    # pyarrow is only needed by the workers which generate parquet exports
+    import pyarrow
+    import pyarrow.parquet
+
+    schema = pyarrow.schema(
+        [
+            pyarrow.field(name, pyarrow.type_for_alias(type_alias))
+            for name, type_alias in columns
+        ]
+    )
+
+    def write_row_group(writer, batch):
+        writer.write_table(
+            pyarrow.Table.from_arrays(
+                [
+                    pyarrow.array(
+                        [row[field.name] for row in batch], type=field.type
+                    )
+                    for field in schema
+                ],
+                schema=schema,
+            )
+        )
+
+    writer = pyarrow.parquet.ParquetWriter(export_file, schema)
+    rows_count = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == QUERYSET_CHUNK_SIZE:
+            write_row_group(writer, batch)
+            rows_count += len(batch)
+            batch = []
+    if batch or not rows_count:
+        write_row_group(writer, batch)
+        rows_count += len(batch)
+    writer.close()
+    return rows_count
+
+
+EXPORT_WRITERS = {
+    ExportJob.CSV: write_csv_export,
+    ExportJob.JSONL: write_jsonl_export,
+    ExportJob.PARQUET: write_parquet_export,
+}
+
+
+def write_export_file(export_job, export_file):
+    """
+    Writes the rows of an export to a binary file object row by row and
+    returns the number of rows written
+    """
+    write_export = EXPORT_WRITERS[export_job.file_format]
+    return write_export(
+        get_export_rows(export_job),
+        get_export_columns(export_job.export_type),
+        export_file,
+    )
@@ -2,6 +2,8 @@ import csv
 
 from datetime import timedelta
 
+from django.db import transaction
+from django.db.models import Max
 from django.http import HttpResponse
 from django.utils import timezone
 
@@ -30,7 +32,10 @@ from jobs.serializers import (
     SubmissionCountSerializer,
 )
 from participants.models import Participant
-from participants.utils import get_participant_team_id_of_user_for_a_challenge
+from participants.utils import (
+    get_participant_team_id_of_user_for_a_challenge,
+    get_participant_team_roster,
+)
 from participants.serializers import (
     ParticipantCount,
     ParticipantCountSerializer,
@@ -38,14 +43,28 @@ from participants.serializers import (
     ParticipantTeamCountSerializer,
     ChallengeParticipantSerializer,
 )
+from .models import ExportJob
 from .serializers import (
     ChallengePhaseSubmissionAnalytics,
     ChallengePhaseSubmissionAnalyticsSerializer,
     ChallengePhaseSubmissionCount,
     ChallengePhaseSubmissionCountSerializer,
+    CreateExportJobSerializer,
+    ExportJobSerializer,
     LastSubmissionTimestamp,
     LastSubmissionTimestampSerializer,
 )
+from .tasks import run_export_job
+from .utils import (
+    get_challenge_analytics,
+    get_export_fingerprint,
+    get_last_submission_timestamps,
+    get_reusable_export_job,
+    get_submission_analytics_aggregates,
+    get_submission_count_since,
+    get_submission_trends,
+    SUBMISSION_TREND_GRANULARITIES,
+)
 
 
 @api_view(["GET"])
@@ -103,11 +122,6 @@ def get_submission_count(request, challenge_pk, duration):
 
     challenge = get_challenge_model(challenge_pk)
 
-    challenge_phase_ids = challenge.challengephase_set.all().values_list(
-        "id", flat=True
-    )
-
-    q_params = {"challenge_phase__id__in": challenge_phase_ids}
     since_date = None
     if duration.lower() == "daily":
         # Get the midnight time of the day
@@ -124,16 +138,58 @@ def get_submission_count(request, challenge_pk, duration):
         since_date = (timezone.now() - timedelta(days=30)).replace(
             hour=0, minute=0, second=0, microsecond=0
         )
-    # for `all` we dont need any condition in `q_params`
-    if since_date:
-        q_params["submitted_at__gte"] = since_date
-
-    submission_count = Submission.objects.filter(**q_params).count()
+    # for `all` we dont need any `since_date`
+    submission_count = get_submission_count_since(challenge, since_date)
     submission_count = SubmissionCount(submission_count)
     serializer = SubmissionCountSerializer(submission_count)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+@api_view(["GET"])
+@throttle_classes([UserRateThrottle])
+@permission_classes((permissions.IsAuthenticated, HasVerifiedEmail))
+@authentication_classes((ExpiringTokenAuthentication,))
+def get_submission_trends_of_challenge(request, challenge_pk):
+    """
+        Returns the number of submissions of each status of a challenge per
+        `granularity` (hour, day, week or month), optionally since a number
+        of `days` and for one `challenge_phase`
+    """
+    challenge = get_challenge_model(challenge_pk)
+    if not is_user_a_host_of_challenge(request.user, challenge_pk):
+        response_data = {
+            "error": "Sorry, you are not authorized to make this request"
+        }
+        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+
+    granularity = request.query_params.get("granularity", "day")
+    if granularity not in SUBMISSION_TREND_GRANULARITIES:
+        response_data = {
+            "error": "granularity should be one of {}".format(
+                ", ".join(SUBMISSION_TREND_GRANULARITIES)
+            )
+        }
+        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        days = request.query_params.get("days")
+        since = None
+        if days is not None:
+            since = (timezone.now() - timedelta(days=int(days))).replace(
+                minute=0, second=0, microsecond=0
+            )
+        challenge_phase = request.query_params.get("challenge_phase")
+        if challenge_phase is not None:
+            challenge_phase = int(challenge_phase)
+    except ValueError:
+        response_data = {"error": "days and challenge_phase should be integers"}
+        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+
+    response_data = get_submission_trends(
+        challenge, granularity, since, challenge_phase
+    )
+    return Response(response_data, status=status.HTTP_200_OK)
+
+
 @api_view(["GET"])
 @throttle_classes([UserRateThrottle])
 @permission_classes(
@@ -197,10 +253,9 @@ def get_last_submission_time(
             created_by=request.user.pk,
             challenge_phase=challenge_phase,
             challenge_phase__challenge=challenge,
-        )
-        last_submitted_at = last_submitted_at.order_by("-submitted_at")[
-            0
-        ].created_at
+        ).aggregate(last_submitted_at=Max("submitted_at"))[
+            "last_submitted_at"
+        ]
         last_submitted_at = LastSubmissionDateTime(last_submitted_at)
         serializer = LastSubmissionDateTimeSerializer(last_submitted_at)
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -229,34 +284,25 @@ def get_last_submission_datetime_analysis(
 
     challenge_phase = get_challenge_phase_model(challenge_phase_pk)
 
-    submissions = Submission.objects.filter(
-        challenge_phase__challenge=challenge
+    last_submission_timestamps = get_last_submission_timestamps(
+        challenge, challenge_phase
     )
-
-    if not submissions:
+    last_submission_timestamp_in_challenge = last_submission_timestamps[
+        "last_submission_timestamp_in_challenge"
+    ]
+    if last_submission_timestamp_in_challenge is None:
         response_data = {
             "message": "You dont have any submissions in this challenge!"
         }
         return Response(response_data, status.HTTP_200_OK)
 
-    last_submission_timestamp_in_challenge = submissions.order_by(
-        "-submitted_at"
-    )[0].created_at
-
-    submissions_in_a_phase = submissions.filter(
-        challenge_phase=challenge_phase
-    )
-
-    if not submissions_in_a_phase:
+    last_submission_timestamp_in_challenge_phase = last_submission_timestamps[
+        "last_submission_timestamp_in_challenge_phase"
+    ]
+    if last_submission_timestamp_in_challenge_phase is None:
         last_submission_timestamp_in_challenge_phase = (
             "You dont have any submissions in this challenge phase!"
         )
-    else:
-        last_submission_timestamp_in_challenge_phase = submissions_in_a_phase.order_by(
-            "-submitted_at"
-        )[
-            0
-        ].created_at
 
     last_submission_timestamp = LastSubmissionTimestamp(
         last_submission_timestamp_in_challenge,
@@ -296,20 +342,13 @@ def get_challenge_phase_submission_analysis(
     submissions = Submission.objects.filter(
         challenge_phase=challenge_phase, challenge_phase__challenge=challenge
     )
-    total_submissions = submissions.count()
-    # Get the total participant teams in a challenge phase
-    participant_team_count = (
-        submissions.values("participant_team").distinct().count()
-    )
-    # Get flagged submission count
-    flagged_submissions_count = submissions.filter(is_flagged=True).count()
-    # Get public submission count
-    public_submissions_count = submissions.filter(is_public=True).count()
+    # Get the total, team, flagged and public counts in one query
+    analytics = submissions.aggregate(**get_submission_analytics_aggregates())
     challenge_phase_submission_count = ChallengePhaseSubmissionAnalytics(
-        total_submissions,
-        participant_team_count,
-        flagged_submissions_count,
-        public_submissions_count,
+        analytics["total_submissions"],
+        analytics["participant_team_count"],
+        analytics["flagged_submissions_count"] or 0,
+        analytics["public_submissions_count"] or 0,
         challenge_phase.pk,
     )
     try:
@@ -323,6 +362,28 @@ def get_challenge_phase_submission_analysis(
         return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(["GET"])
+@throttle_classes([UserRateThrottle])
+@permission_classes((permissions.IsAuthenticated, HasVerifiedEmail))
+@authentication_classes((ExpiringTokenAuthentication,))
+def get_challenge_analytics_of_all_phases(request, challenge_pk):
+    """
+    Returns for every phase of a challenge
+    1. Total number of submissions and of teams which made submissions
+    2. Number of submissions of each status
+    3. Number of flagged & public submissions
+    4. Last submission time, along with the last submission time in the challenge
+    """
+    challenge = get_challenge_model(challenge_pk)
+    if not is_user_a_host_of_challenge(request.user, challenge_pk):
+        response_data = {
+            "error": "Sorry, you are not authorized to make this request"
+        }
+        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+    response_data = get_challenge_analytics(challenge)
+    return Response(response_data, status=status.HTTP_200_OK)
+
+
 @api_view(["GET"])
 @throttle_classes([UserRateThrottle])
 @permission_classes(
@@ -337,7 +398,7 @@ def download_all_participants(request, challenge_pk):
             user=request.user, challenge_pk=challenge_pk
     ):
         challenge = get_challenge_model(challenge_pk)
-        participant_teams = challenge.participant_teams.all().order_by("-team_name")
+        participant_teams = get_participant_team_roster(challenge)
         teams = ChallengeParticipantSerializer(participant_teams, many=True, context={"request": request})
         response = HttpResponse(content_type="text/csv")
         response["Content-Disposition"] = "attachment; filename=participant_teams_{0}.csv".format(challenge_pk)
@@ -367,3 +428,91 @@ def download_all_participants(request, challenge_pk):
             "error": "Sorry, you are not authorized to make this request"
         }
         return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(["POST"])
+@throttle_classes([UserRateThrottle])
+@permission_classes((permissions.IsAuthenticated, HasVerifiedEmail))
+@authentication_classes((ExpiringTokenAuthentication,))
+def create_export_job(request, challenge_pk):
+    """
+        Queues a background export of the submissions or the participant
+        teams of a challenge, or returns the last export if nothing has
+        changed since it was generated
+    """
+    challenge = get_challenge_model(challenge_pk)
+    if not is_user_a_host_of_challenge(request.user, challenge_pk):
+        response_data = {
+            "error": "Sorry, you are not authorized to make this request"
+        }
+        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+
+    serializer = CreateExportJobSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    export_type = serializer.validated_data["export_type"]
+    file_format = serializer.validated_data["file_format"]
+    challenge_phase = None
+    challenge_phase_pk = serializer.validated_data.get("challenge_phase")
+    if challenge_phase_pk is not None:
+        challenge_phase = get_challenge_phase_model(challenge_phase_pk)
+        if challenge_phase.challenge_id != challenge.pk:
+            response_data = {
+                "error": "Challenge Phase {} does not exist".format(
+                    challenge_phase_pk
+                )
+            }
+            return Response(response_data, status=status.HTTP_404_NOT_FOUND)
+
+    fingerprint = get_export_fingerprint(
+        challenge, export_type, file_format, challenge_phase
+    )
+    export_job = get_reusable_export_job(challenge, fingerprint)
+    if export_job is not None:
+        response_data = ExportJobSerializer(
+            export_job, context={"request": request}
+        ).data
+        return Response(response_data, status=status.HTTP_200_OK)
+
+    export_job = ExportJob.objects.create(
+        challenge=challenge,
+        challenge_phase=challenge_phase,
+        created_by=request.user,
+        export_type=export_type,
+        file_format=file_format,
+        fingerprint=fingerprint,
+    )
+    transaction.on_commit(lambda: run_export_job.delay(export_job.pk))
+    response_data = ExportJobSerializer(
+        export_job, context={"request": request}
+    ).data
+    return Response(response_data, status=status.HTTP_201_CREATED)
+
+
+@api_view(["GET"])
+@throttle_classes([UserRateThrottle])
+@permission_classes((permissions.IsAuthenticated, HasVerifiedEmail))
+@authentication_classes((ExpiringTokenAuthentication,))
+def get_export_job(request, challenge_pk, export_job_pk):
+    """
+        Returns the status of an export job and the url of its file once
+        it has finished
+    """
+    if not is_user_a_host_of_challenge(request.user, challenge_pk):
+        response_data = {
+            "error": "Sorry, you are not authorized to make this request"
+        }
+        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        export_job = ExportJob.objects.get(
+            pk=export_job_pk, challenge=challenge_pk
+        )
+    except ExportJob.DoesNotExist:
+        response_data = {
+            "error": "Export job {} does not exist".format(export_job_pk)
+        }
+        return Response(response_data, status=status.HTTP_404_NOT_FOUND)
+    response_data = ExportJobSerializer(
+        export_job, context={"request": request}
+    ).data
+    return Response(response_data, status=status.HTTP_200_OK)
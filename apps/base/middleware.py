@@ -0,0 +1,18 @@
+from .utils import clear_request_memo, start_request_memo
+
+
+class RequestMemoMiddleware(object):
+    """
+    Scopes the values memoized with `base.utils.get_request_memo` to a
+    single request
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start_request_memo()
+        try:
+            return self.get_response(request)
+        finally:
+            clear_request_memo()
@@ -0,0 +1,26 @@
+import msgpack
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class MsgPackRenderer(BaseRenderer):
+    """
+    Renderer which serializes the data to MessagePack, a compact binary
+    alternative to JSON. Clients opt in with the `application/msgpack`
+    accept header or the `?format=msgpack` query parameter.
+    """
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+    encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        # Dates, decimals, etc. are encoded the same way as in JSON
+        return msgpack.packb(
+            data, default=self.encoder.default, use_bin_type=True
+        )
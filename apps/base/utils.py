@@ -1,19 +1,34 @@
 import base64
 import boto3
 import botocore
+import csv
+import hashlib
 import json
 import logging
 import os
 import re
 import requests
 import sendgrid
+import threading
+import time
 import uuid
 
+from collections import OrderedDict
+from functools import wraps
+
 from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models.query import QuerySet
+from django.http import StreamingHttpResponse
 from django.utils.deconstruct import deconstructible
+from django.utils.http import http_date
 
+from rest_framework import status
 from rest_framework.exceptions import NotFound
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 from sendgrid.helpers.mail import Email, Mail, Personalization
 
@@ -26,18 +41,317 @@ class StandardResultSetPagination(PageNumberPagination):
     max_page_size = 1000
 
 
+class StandardCursorPagination(CursorPagination):
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+
+# Counts above this are reported as e.g. "10000+" by the capped count mode
+PAGINATION_COUNT_CAP = 10000
+
+
+def get_estimated_count(queryset):
+    """
+        Returns the number of rows of a queryset as estimated by the
+        PostgreSQL planner from the table statistics, without scanning them
+    """
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute("EXPLAIN (FORMAT JSON) {}".format(sql), params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class ApproximateCountPagination(PageNumberPagination):
+    """
+        Page number pagination reporting an estimated or a capped count of
+        the results instead of counting all of them.
+
+        Every page is fetched with one extra row to know whether there is a
+        next page, so the count is only approximated when there is one.
+    """
+
+    ESTIMATED = "estimated"
+    CAPPED = "capped"
+
+    COUNT_MODES = (ESTIMATED, CAPPED)
+
+    def __init__(self, count_mode):
+        self.count_mode = count_mode
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        try:
+            self.page_number = int(
+                request.query_params.get(self.page_query_param, 1)
+            )
+        except ValueError:
+            raise NotFound(self.invalid_page_message)
+        if self.page_number < 1:
+            raise NotFound(self.invalid_page_message)
+
+        offset = (self.page_number - 1) * page_size
+        results = list(queryset[offset:offset + page_size + 1])
+        if not results and self.page_number > 1:
+            raise NotFound(self.invalid_page_message)
+
+        self.has_next = len(results) > page_size
+        results = results[:page_size]
+        if self.has_next:
+            self.count = self.get_approximate_count(
+                queryset, offset + len(results) + 1
+            )
+        else:
+            self.count = offset + len(results)
+        self.request = request
+        return results
+
+    def get_approximate_count(self, queryset, minimum_count):
+        """
+            Returns the estimated or the capped count of a queryset known to
+            have at least `minimum_count` rows
+        """
+        if self.count_mode == self.ESTIMATED:
+            return max(get_estimated_count(queryset), minimum_count)
+        if minimum_count <= PAGINATION_COUNT_CAP:
+            count = queryset.order_by()[: PAGINATION_COUNT_CAP + 1].count()
+            if count <= PAGINATION_COUNT_CAP:
+                return count
+        return "{}+".format(PAGINATION_COUNT_CAP)
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("count", self.count),
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.page_query_param, self.page_number + 1
+        )
+
+    def get_previous_link(self):
+        if self.page_number == 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(
+            url, self.page_query_param, self.page_number - 1
+        )
+
+
 def paginated_queryset(
-    queryset, request, pagination_class=PageNumberPagination()
+    queryset,
+    request,
+    pagination_class=PageNumberPagination(),
+    cursor_ordering=None,
 ):
     """
         Return a paginated result for a queryset
+
+        Views passing a `cursor_ordering` let clients request
+        `?pagination=cursor`, which pages through the queryset in that
+        ordering with an opaque cursor instead of a page number. Every page
+        is then fetched with a range filter on the first ordering field
+        rather than an OFFSET, and no total count is computed.
+
+        Clients paging through large querysets can also request
+        `?count=estimated` or `?count=capped` to get the count estimated by
+        the planner or capped at `PAGINATION_COUNT_CAP` instead of the
+        exact one.
     """
     paginator = pagination_class
+    count_mode = request.query_params.get("count")
+    if (
+        cursor_ordering is not None
+        and request.query_params.get("pagination") == "cursor"
+    ):
+        paginator = StandardCursorPagination()
+        paginator.ordering = cursor_ordering
+    elif count_mode in ApproximateCountPagination.COUNT_MODES and isinstance(
+        queryset, QuerySet
+    ):
+        paginator = ApproximateCountPagination(count_mode)
+        paginator.page_size_query_param = pagination_class.page_size_query_param
+        paginator.max_page_size = pagination_class.max_page_size
     paginator.page_size = settings.REST_FRAMEWORK["PAGE_SIZE"]
     result_page = paginator.paginate_queryset(queryset, request)
     return (paginator, result_page)
 
 
+QUERYSET_CHUNK_SIZE = 500
+
+
+def queryset_in_chunks(queryset, chunk_size=QUERYSET_CHUNK_SIZE):
+    """
+        Yields the objects of an ordered queryset in lists of `chunk_size`
+
+        Only the primary keys are loaded up front, the objects of every
+        chunk are fetched with the `select_related` and `prefetch_related`
+        lookups of the queryset, which `QuerySet.iterator` would ignore.
+    """
+    pks = list(
+        queryset.prefetch_related(None).values_list("pk", flat=True)
+    )
+    for start in range(0, len(pks), chunk_size):
+        chunk_pks = pks[start:start + chunk_size]
+        objects = queryset.filter(pk__in=chunk_pks).order_by()
+        objects_by_pk = {obj.pk: obj for obj in objects}
+        yield [objects_by_pk[pk] for pk in chunk_pks if pk in objects_by_pk]
+
+
+class Echo(object):
+    """
+        File-like object which returns what is written to it, used to build
+        CSV rows for streaming responses
+    """
+
+    def write(self, value):
+        return value
+
+
+def get_streaming_csv_response(rows, filename):
+    """
+        Returns a `StreamingHttpResponse` which writes the `rows` iterable
+        as CSV while it is consumed
+    """
+    writer = csv.writer(Echo())
+    response = StreamingHttpResponse(
+        (writer.writerow(row) for row in rows), content_type="text/csv"
+    )
+    response["Content-Disposition"] = "attachment; filename={}".format(
+        filename
+    )
+    return response
+
+
+_request_local = threading.local()
+
+
+def start_request_memo():
+    """Starts memoizing values for the request handled by this thread"""
+    _request_local.memo = {}
+
+
+def clear_request_memo():
+    """Drops the values memoized for the current request"""
+    _request_local.memo = None
+
+
+def get_request_memo():
+    """
+    Returns the dict memoizing values for the current request, or None
+    outside of a request, e.g. in the submission workers
+    """
+    return getattr(_request_local, "memo", None)
+
+
+def get_cache_versions(version_keys):
+    """
+    Returns the versions, i.e. the last modification timestamps, stored in
+    the cache for a list of version keys. Missing versions are created.
+    """
+    versions = cache.get_many(version_keys)
+    now = time.time()
+    for version_key in version_keys:
+        if version_key not in versions:
+            cache.add(version_key, now, None)
+            versions[version_key] = now
+    return [versions[version_key] for version_key in version_keys]
+
+
+def invalidate_cache_version(*version_keys):
+    """
+    Bumps the versions of the given keys so that the responses cached with
+    `cache_response` which depend on them are recomputed
+    """
+    now = time.time()
+    cache.set_many({version_key: now for version_key in version_keys}, None)
+
+
+def cache_response(get_cache_keys):
+    """
+    Decorator caching the data of the successful GET responses of a view.
+
+    The cached responses are keyed by the versions of the objects they
+    depend on, so they are invalidated with `invalidate_cache_version`. The
+    ETag and Last-Modified headers are set and a 304 is returned when the
+    client already has the current response.
+
+    Arguments:
+        get_cache_keys {function} -- called with the view arguments, returns
+            a `(variant, version_keys)` tuple, where `variant` separates the
+            responses which differ per user, or None to skip the cache
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != "GET":
+                return view(request, *args, **kwargs)
+            cache_keys = get_cache_keys(request, *args, **kwargs)
+            if cache_keys is None:
+                return view(request, *args, **kwargs)
+
+            variant, version_keys = cache_keys
+            versions = get_cache_versions(version_keys)
+            timeout = settings.RESPONSE_CACHE_TIMEOUT
+            # Responses such as the list of present challenges depend on the
+            # current time, so they are never served for more than `timeout`
+            time_bucket = int(time.time() // timeout)
+            # The negotiated media type separates e.g. JSON and msgpack
+            fingerprint = hashlib.md5(
+                "{}|{}|{}|{}|{}|{}|{}".format(
+                    view.__name__,
+                    request.get_host(),
+                    request.get_full_path(),
+                    getattr(request, "accepted_media_type", ""),
+                    variant,
+                    versions,
+                    time_bucket,
+                ).encode("utf-8")
+            ).hexdigest()
+            etag = '"{}"'.format(fingerprint)
+
+            if etag in request.META.get("HTTP_IF_NONE_MATCH", ""):
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            else:
+                cache_key = "response_{}".format(fingerprint)
+                response_data = cache.get(cache_key)
+                if response_data is None:
+                    response = view(request, *args, **kwargs)
+                    if response.status_code != status.HTTP_200_OK:
+                        return response
+                    cache.set(cache_key, response.data, timeout)
+                else:
+                    response = Response(response_data, status=status.HTTP_200_OK)
+
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(max(versions))
+            # Browsers have to revalidate, which is answered with a 304
+            response["Cache-Control"] = "no-cache"
+            return response
+
+        return wrapper
+
+    return decorator
+
+
 @deconstructible
 class RandomFileName(object):
     def __init__(self, path):
@@ -3,6 +3,7 @@ from django.contrib import admin, messages
 from django.contrib.admin.helpers import ActionForm
 
 from base.admin import ImportExportTimeStampedAdmin
+from jobs.utils import create_leaderboard_snapshot
 
 from .aws_utils import (
     delete_workers,
@@ -199,6 +200,7 @@ class ChallengePhaseSplitAdmin(ImportExportTimeStampedAdmin):
         "leaderboard__id",
         "dataset_split__codename",
     )
+    actions = ["create_leaderboard_snapshots"]
 
     def get_challenge(self, obj):
         """Returns challenge name corresponding to phase-split"""
@@ -207,6 +209,27 @@ class ChallengePhaseSplitAdmin(ImportExportTimeStampedAdmin):
     get_challenge.short_description = "Challenge"
     get_challenge.admin_order_field = "challenge_phase__challenge"
 
+    def create_leaderboard_snapshots(self, request, queryset):
+        count = 0
+        for challenge_phase_split in queryset.select_related("leaderboard"):
+            if "default_order_by" not in challenge_phase_split.leaderboard.schema:
+                messages.error(
+                    request,
+                    "Challenge phase split {}: default filtering key not found in leaderboard schema.".format(
+                        challenge_phase_split.pk
+                    ),
+                )
+                continue
+            create_leaderboard_snapshot(challenge_phase_split)
+            count += 1
+        messages.success(
+            request, "{} leaderboard snapshots were created.".format(count)
+        )
+
+    create_leaderboard_snapshots.short_description = (
+        "Create leaderboard snapshots of the selected phase splits."
+    )
+
 
 @admin.register(DatasetSplit)
 class DatasetSplitAdmin(ImportExportTimeStampedAdmin):
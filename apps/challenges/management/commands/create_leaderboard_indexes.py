@@ -0,0 +1,56 @@
+from django.core.management import BaseCommand
+
+from challenges.utils import (
+    create_leaderboard_metric_index,
+    drop_leaderboard_metric_index,
+    get_active_leaderboard_metrics,
+    get_leaderboard_metric_index_name,
+    get_leaderboard_metric_indexes,
+)
+
+
+class Command(BaseCommand):
+
+    help = (
+        "Creates the partial expression indexes on the ranking metric of "
+        "every active leaderboard schema. Invalid indexes, e.g. left by a "
+        "failed concurrent build, are rebuilt."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--prune",
+            action="store_true",
+            help="Drop the indexes of metrics no longer used by a leaderboard.",
+        )
+
+    def handle(self, *args, **options):
+        metrics = get_active_leaderboard_metrics()
+        indexes = get_leaderboard_metric_indexes()
+        rebuilt_count = 0
+        for metric in metrics:
+            name = get_leaderboard_metric_index_name(metric)
+            if indexes.get(name) is False:
+                drop_leaderboard_metric_index(name)
+                rebuilt_count += 1
+            create_leaderboard_metric_index(metric)
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Indexed {} leaderboard metrics, rebuilt {} invalid "
+                "indexes.".format(len(metrics), rebuilt_count)
+            )
+        )
+
+        if options["prune"]:
+            active_index_names = {
+                get_leaderboard_metric_index_name(metric)
+                for metric in metrics
+            }
+            stale_index_names = set(indexes) - active_index_names
+            for name in stale_index_names:
+                drop_leaderboard_metric_index(name)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    "Dropped {} stale indexes.".format(len(stale_index_names))
+                )
+            )
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.20 on 2026-10-18 10:12
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('participants', '0012_remove_docker_repository_uri_from_team'),
+        ('challenges', '0057_add_task_def_arn_and_workers_field_to_challenge_model'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardRank',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('modified_at', models.DateTimeField(auto_now=True)),
+                ('is_baseline', models.BooleanField(default=False)),
+                ('score', models.FloatField()),
+                ('score_error', models.FloatField(default=0)),
+                ('rank', models.PositiveIntegerField(default=0)),
+                ('challenge_phase_split', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ranks', to='challenges.ChallengePhaseSplit')),
+                ('leaderboard_data', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='rank', to='challenges.LeaderboardData')),
+                ('participant_team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='participants.ParticipantTeam')),
+            ],
+            options={
+                'db_table': 'leaderboard_rank',
+            },
+        ),
+        migrations.AlterIndexTogether(
+            name='leaderboardrank',
+            index_together=set([('challenge_phase_split', 'rank')]),
+        ),
+    ]
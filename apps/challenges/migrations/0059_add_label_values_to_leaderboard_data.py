@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.20 on 2026-10-18 12:40
+from __future__ import unicode_literals
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+BACKFILL_LABEL_VALUES_QUERY = """
+    UPDATE leaderboard_data
+    SET result_values = ARRAY(
+            SELECT CASE WHEN jsonb_typeof(leaderboard_data.result -> label) = 'number'
+                        THEN (leaderboard_data.result ->> label)::double precision END
+            FROM jsonb_array_elements_text(leaderboard.schema -> 'labels')
+                WITH ORDINALITY AS labels(label, position)
+            ORDER BY position
+        ),
+        error_values = CASE WHEN leaderboard_data.error IS NULL THEN NULL ELSE ARRAY(
+            SELECT CASE WHEN jsonb_typeof(leaderboard_data.error -> ('error_' || label)) = 'number'
+                        THEN (leaderboard_data.error ->> ('error_' || label))::double precision END
+            FROM jsonb_array_elements_text(leaderboard.schema -> 'labels')
+                WITH ORDINALITY AS labels(label, position)
+            ORDER BY position
+        ) END
+    FROM leaderboard
+    WHERE leaderboard.id = leaderboard_data.leaderboard_id
+        AND jsonb_typeof(leaderboard.schema -> 'labels') = 'array'
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0058_add_leaderboard_rank_model'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='leaderboarddata',
+            name='error_values',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.FloatField(null=True), blank=True, null=True, size=None),
+        ),
+        migrations.AddField(
+            model_name='leaderboarddata',
+            name='result_values',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.FloatField(null=True), blank=True, default=list, size=None),
+        ),
+        migrations.RunSQL(BACKFILL_LABEL_VALUES_QUERY, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.20 on 2026-10-18 13:25
+from __future__ import unicode_literals
+
+import base.utils
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0059_add_label_values_to_leaderboard_data'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardSnapshot',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('modified_at', models.DateTimeField(auto_now=True)),
+                ('snapshot_file', models.FileField(upload_to=base.utils.RandomFileName('leaderboard_snapshots'))),
+                ('entries_count', models.PositiveIntegerField(default=0)),
+                ('challenge_phase_split', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='snapshot', to='challenges.ChallengePhaseSplit')),
+            ],
+            options={
+                'db_table': 'leaderboard_snapshot',
+            },
+        ),
+    ]
@@ -1,5 +1,6 @@
 from __future__ import unicode_literals
 
+import copy
 import random
 import tempfile
 import zipfile
@@ -12,7 +13,7 @@ from django.conf import settings
 from django.contrib.auth.models import User
 from django.contrib.postgres.fields import ArrayField, JSONField
 from django.core.files.base import ContentFile
-from django.db import models
+from django.db import models, transaction
 from django.db.models import signals
 from django.db.models.signals import pre_save
 from django.dispatch import receiver
@@ -24,11 +25,22 @@ from base.models import (
     model_field_name,
 )
 
-from base.utils import RandomFileName, get_slug, get_queue_name
+from base.utils import (
+    RandomFileName,
+    get_slug,
+    get_queue_name,
+    invalidate_cache_version,
+)
 from hosts.models import ChallengeHost
 from participants.models import ParticipantTeam, Participant
 from .aws_utils import restart_workers_signal_callback
 
+# Cache version keys of the public API responses cached with
+# `base.utils.cache_response`
+CHALLENGE_LIST_CACHE_VERSION_KEY = "challenge_list_version"
+CHALLENGE_CACHE_VERSION_KEY = "challenge_{}_version"
+LEADERBOARD_CACHE_VERSION_KEY = "challenge_phase_split_{}_leaderboard_version"
+
 
 @receiver(pre_save, sender="challenges.Challenge")
 def save_challenge_slug(sender, instance, **kwargs):
@@ -43,6 +55,8 @@ class Challenge(TimeStampedModel):
     def __init__(self, *args, **kwargs):
         super(Challenge, self).__init__(*args, **kwargs)
         self._original_evaluation_script = self.evaluation_script
+        self._original_banned_email_ids = self.banned_email_ids
+        self._original_creator_id = self.__dict__.get("creator_id")
 
     title = models.CharField(max_length=100, db_index=True)
     short_description = models.TextField(null=True, blank=True)
@@ -457,6 +471,67 @@ signals.post_save.connect(
 )
 
 
+@receiver(signals.post_save, sender="challenges.Challenge")
+@receiver(signals.post_delete, sender="challenges.Challenge")
+def invalidate_challenge_cached_responses(sender, instance, **kwargs):
+    # Bumped once committed, so that a concurrent request cannot cache the
+    # previous state under the new version
+    version_keys = [
+        CHALLENGE_LIST_CACHE_VERSION_KEY,
+        CHALLENGE_CACHE_VERSION_KEY.format(instance.pk),
+    ]
+    transaction.on_commit(lambda: invalidate_cache_version(*version_keys))
+
+
+@receiver(signals.post_save, sender="challenges.Challenge")
+@receiver(signals.post_delete, sender="challenges.Challenge")
+def invalidate_challenge_host_authorization(sender, instance, **kwargs):
+    """Drops the cached hosted challenges of the old and new host teams"""
+    from accounts.utils import invalidate_authorization_context
+
+    host_team_pks = {instance.creator_id, instance._original_creator_id}
+    instance._original_creator_id = instance.creator_id
+    user_pks = ChallengeHost.objects.filter(
+        team_name__in=host_team_pks - {None}
+    ).values_list("user", flat=True)
+    invalidate_authorization_context(user_pks)
+
+
+@receiver(signals.post_save, sender="challenges.ChallengePhase")
+@receiver(signals.post_delete, sender="challenges.ChallengePhase")
+def invalidate_challenge_phase_cached_responses(sender, instance, **kwargs):
+    version_key = CHALLENGE_CACHE_VERSION_KEY.format(instance.challenge_id)
+    transaction.on_commit(lambda: invalidate_cache_version(version_key))
+
+
+@receiver(signals.m2m_changed, sender=Challenge.participant_teams.through)
+def invalidate_participant_team_on_challenge_participation(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    """Drops the cached participant teams of the users of joining teams"""
+    from accounts.utils import invalidate_authorization_context
+    from participants.utils import invalidate_participant_team_cache
+
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if action == "pre_clear":
+        if reverse:
+            pk_set = set(instance.challenge_set.values_list("pk", flat=True))
+        else:
+            pk_set = set(
+                instance.participant_teams.values_list("pk", flat=True)
+            )
+    if reverse:
+        challenge_pks, participant_team_pks = pk_set, [instance.pk]
+    else:
+        challenge_pks, participant_team_pks = [instance.pk], pk_set
+    user_pks = Participant.objects.filter(
+        team__in=participant_team_pks
+    ).values_list("user", flat=True)
+    invalidate_participant_team_cache(user_pks, challenge_pks)
+    invalidate_authorization_context(user_pks)
+
+
 class DatasetSplit(TimeStampedModel):
     name = models.CharField(max_length=100)
     codename = models.CharField(max_length=100)
@@ -476,6 +551,7 @@ class ChallengePhase(TimeStampedModel):
     def __init__(self, *args, **kwargs):
         super(ChallengePhase, self).__init__(*args, **kwargs)
         self._original_test_annotation = self.test_annotation
+        self._original_is_public = self.is_public
 
     name = models.CharField(max_length=100, db_index=True)
     description = models.TextField()
@@ -569,16 +645,45 @@ signals.post_save.connect(
 
 class Leaderboard(TimeStampedModel):
 
+    def __init__(self, *args, **kwargs):
+        super(Leaderboard, self).__init__(*args, **kwargs)
+        schema = self.__dict__.get("schema")
+        if not isinstance(schema, dict):
+            schema = {}
+        # The labels are copied since they may be edited in place
+        self._original_labels = copy.deepcopy(schema.get("labels"))
+        self._original_default_order_by = schema.get("default_order_by")
+
     schema = JSONField()
 
     def __str__(self):
         return "{}".format(self.id)
 
+    def get_schema_value(self, key, default=None):
+        """Returns a value of the schema, which may not be a JSON object"""
+        if isinstance(self.schema, dict):
+            return self.schema.get(key, default)
+        return default
+
     class Meta:
         app_label = "challenges"
         db_table = "leaderboard"
 
 
+@receiver(signals.post_save, sender="challenges.Leaderboard")
+def update_leaderboard_data_label_values_on_save(
+    sender, instance, created, **kwargs
+):
+    """Recomputes the label values of the results when the labels change"""
+    from .utils import update_leaderboard_data_label_values
+
+    labels = instance.get_schema_value("labels")
+    has_changed = labels != instance._original_labels
+    instance._original_labels = copy.deepcopy(labels)
+    if not created and has_changed:
+        update_leaderboard_data_label_values(instance)
+
+
 class ChallengePhaseSplit(TimeStampedModel):
 
     # visibility options
@@ -611,6 +716,49 @@ class ChallengePhaseSplit(TimeStampedModel):
         db_table = "challenge_phase_split"
 
 
+@receiver(signals.post_save, sender="challenges.ChallengePhaseSplit")
+@receiver(signals.post_delete, sender="challenges.ChallengePhaseSplit")
+def invalidate_challenge_phase_split_cached_responses(
+    sender, instance, **kwargs
+):
+    challenge_pk = (
+        ChallengePhase.objects.filter(pk=instance.challenge_phase_id)
+        .values_list("challenge", flat=True)
+        .first()
+    )
+    version_keys = [
+        CHALLENGE_CACHE_VERSION_KEY.format(challenge_pk),
+        LEADERBOARD_CACHE_VERSION_KEY.format(instance.pk),
+    ]
+    transaction.on_commit(lambda: invalidate_cache_version(*version_keys))
+
+
+def get_numeric_label_value(value):
+    """
+    Returns a leaderboard label value as a float used to sort and index the
+    entries, or None when it is not a number
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+def get_label_value(values, key):
+    """Returns the numeric value of a leaderboard label, if any"""
+    value = values.get(key) if isinstance(values, dict) else None
+    return get_numeric_label_value(value)
+
+
+class LeaderboardDataManager(models.Manager):
+    def bulk_create(self, objs, *args, **kwargs):
+        # `bulk_create` does not call `save()`, so the label values are set here
+        for obj in objs:
+            obj.set_label_values()
+        return super(LeaderboardDataManager, self).bulk_create(
+            objs, *args, **kwargs
+        )
+
+
 class LeaderboardData(TimeStampedModel):
 
     challenge_phase_split = models.ForeignKey("ChallengePhaseSplit")
@@ -618,15 +766,92 @@ class LeaderboardData(TimeStampedModel):
     leaderboard = models.ForeignKey("Leaderboard")
     result = JSONField()
     error = JSONField(null=True, blank=True)
+    # `result` and `error` values in the order of the leaderboard labels
+    result_values = ArrayField(
+        models.FloatField(null=True), default=list, blank=True
+    )
+    error_values = ArrayField(
+        models.FloatField(null=True), null=True, blank=True
+    )
+
+    objects = LeaderboardDataManager()
 
     def __str__(self):
         return "{0} : {1}".format(self.challenge_phase_split, self.submission)
 
+    def set_label_values(self):
+        labels = self.leaderboard.get_schema_value("labels", [])
+        self.result_values = [
+            get_label_value(self.result, label) for label in labels
+        ]
+        if self.error is None:
+            self.error_values = None
+        else:
+            self.error_values = [
+                get_label_value(self.error, "error_{0}".format(label))
+                for label in labels
+            ]
+
     class Meta:
         app_label = "challenges"
         db_table = "leaderboard_data"
 
 
+@receiver(pre_save, sender="challenges.LeaderboardData")
+def set_leaderboard_data_label_values(sender, instance, **kwargs):
+    instance.set_label_values()
+
+
+class LeaderboardRank(TimeStampedModel):
+    """
+    Materialized leaderboard of a Challenge Phase Split. It stores only the
+    entries shown on the leaderboard, already ranked, so that the
+    leaderboard can be paginated in the database.
+    """
+
+    challenge_phase_split = models.ForeignKey(
+        "ChallengePhaseSplit", related_name="ranks"
+    )
+    leaderboard_data = models.OneToOneField(
+        "LeaderboardData", related_name="rank"
+    )
+    participant_team = models.ForeignKey(ParticipantTeam)
+    is_baseline = models.BooleanField(default=False)
+    score = models.FloatField()
+    score_error = models.FloatField(default=0)
+    rank = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return "{0} : {1}".format(self.challenge_phase_split, self.rank)
+
+    class Meta:
+        app_label = "challenges"
+        db_table = "leaderboard_rank"
+        index_together = (("challenge_phase_split", "rank"),)
+
+
+class LeaderboardSnapshot(TimeStampedModel):
+    """
+    Frozen leaderboard of a Challenge Phase Split whose phase has ended. The
+    ranked entries are stored as a gzipped JSON file and served as they are.
+    """
+
+    challenge_phase_split = models.OneToOneField(
+        "ChallengePhaseSplit", related_name="snapshot"
+    )
+    snapshot_file = models.FileField(
+        upload_to=RandomFileName("leaderboard_snapshots")
+    )
+    entries_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return "{}".format(self.challenge_phase_split)
+
+    class Meta:
+        app_label = "challenges"
+        db_table = "leaderboard_snapshot"
+
+
 class ChallengeConfiguration(TimeStampedModel):
     """
     Model to store zip file for challenge creation.
@@ -1,6 +1,6 @@
 from rest_framework import permissions
 
-from .models import Challenge
+from accounts.utils import get_authorization_context
 
 
 class IsChallengeCreator(permissions.BasePermission):
@@ -15,16 +15,11 @@ class IsChallengeCreator(permissions.BasePermission):
         if request.method in permissions.SAFE_METHODS:
             return True
         elif request.method in ["DELETE", "PATCH", "PUT", "POST"]:
-            try:
-                challenge = Challenge.objects.get(
-                    pk=request.parser_context["kwargs"]["challenge_pk"]
-                )
-            except Challenge.DoesNotExist:
-                return False
-
-            if request.user.id == challenge.creator.created_by.id:
-                return True
-            else:
+            if request.user.is_anonymous():
                 return False
+            context = get_authorization_context(request.user)
+            return context.is_challenge_creator(
+                request.parser_context["kwargs"]["challenge_pk"]
+            )
         else:
             return False
@@ -28,6 +28,11 @@ class ChallengeSerializer(serializers.ModelSerializer):
         else:
             self.fields["creator"] = ChallengeHostTeamSerializer()
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Loads the host teams of a page of challenges"""
+        return queryset.select_related("creator__created_by")
+
     class Meta:
         model = Challenge
         fields = (
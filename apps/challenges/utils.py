@@ -1,16 +1,30 @@
 import os
 
+import hashlib
 import json
 import logging
 
 from botocore.exceptions import ClientError
 
-from base.utils import get_model_object, get_boto3_client
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from base.utils import (
+    get_model_object,
+    get_boto3_client,
+    invalidate_cache_version,
+)
+from hosts.utils import is_user_a_host_of_challenge
+from participants.models import Participant
 
 from .models import (
+    CHALLENGE_CACHE_VERSION_KEY,
+    CHALLENGE_LIST_CACHE_VERSION_KEY,
+    LEADERBOARD_CACHE_VERSION_KEY,
     Challenge,
     ChallengePhase,
     Leaderboard,
+    LeaderboardData,
     DatasetSplit,
     ChallengePhaseSplit,
 )
@@ -27,6 +41,241 @@ get_dataset_split_model = get_model_object(DatasetSplit)
 
 get_challenge_phase_split_model = get_model_object(ChallengePhaseSplit)
 
+BANNED_PARTICIPANT_TEAMS_CACHE_KEY = "challenge_{}_banned_participant_teams"
+# The cached set is invalidated on changes, the timeout is only a safety net
+BANNED_PARTICIPANT_TEAMS_CACHE_TIMEOUT = 60 * 60
+
+LEADERBOARD_METRIC_INDEX_PREFIX = "leaderboard_data_metric_"
+
+# Partial expression index backing the leaderboard ranking query. It must
+# use the same expression and predicate as the query to be picked up by the
+# planner. Only numbers are cast, so that a result storing another value
+# under the metric cannot make the inserts in `leaderboard_data` fail.
+CREATE_LEADERBOARD_METRIC_INDEX_QUERY = """
+    CREATE INDEX {concurrently} IF NOT EXISTS {name}
+    ON leaderboard_data (
+        challenge_phase_split_id,
+        (CASE WHEN jsonb_typeof(result -> %s) = 'number'
+              THEN (result ->> %s)::double precision END)
+    )
+    WHERE jsonb_typeof(result -> %s) = 'number'
+"""
+
+# Indexes built before the metric cast was guarded by `jsonb_typeof`
+LEADERBOARD_METRIC_INDEX_GUARD = "jsonb_typeof"
+
+
+def get_challenge_list_cache_keys(request, *args, **kwargs):
+    """Returns the response cache keys of the challenge list views"""
+    return ("", [CHALLENGE_LIST_CACHE_VERSION_KEY])
+
+
+def get_challenge_cache_keys(request, pk=None, challenge_pk=None):
+    """
+    Returns the response cache keys of the views showing a challenge,
+    which show more data to the challenge hosts. Edits of the host team
+    bump the versions, edits of other related rows (e.g. a username) are
+    served stale for up to RESPONSE_CACHE_TIMEOUT.
+    """
+    challenge_pk = challenge_pk or pk
+    variant = (
+        "host"
+        if is_user_a_host_of_challenge(request.user, challenge_pk)
+        else "public"
+    )
+    return (variant, [CHALLENGE_CACHE_VERSION_KEY.format(challenge_pk)])
+
+
+def invalidate_challenge_cached_responses(challenge_pks):
+    """
+    Bumps the versions of the cached challenge list and challenges once the
+    current transaction is committed
+    """
+    version_keys = [CHALLENGE_LIST_CACHE_VERSION_KEY] + [
+        CHALLENGE_CACHE_VERSION_KEY.format(pk) for pk in challenge_pks
+    ]
+    transaction.on_commit(lambda: invalidate_cache_version(*version_keys))
+
+
+def invalidate_leaderboard_cached_responses(challenge_phase_split_pks):
+    """
+    Bumps the versions of the cached leaderboards of the given splits once
+    the current transaction is committed
+    """
+    version_keys = [
+        LEADERBOARD_CACHE_VERSION_KEY.format(pk)
+        for pk in challenge_phase_split_pks
+    ]
+    if version_keys:
+        transaction.on_commit(
+            lambda: invalidate_cache_version(*version_keys)
+        )
+
+
+def get_leaderboard_cache_keys(request, challenge_phase_split_id, **kwargs):
+    """
+    Returns the response cache keys of the leaderboard views. Renames of
+    the participant teams and method name changes bump the versions,
+    edits of other related rows are served stale for up to
+    RESPONSE_CACHE_TIMEOUT.
+    """
+    variant = "public"
+    if not request.user.is_anonymous():
+        challenge_pk = (
+            ChallengePhaseSplit.objects.filter(pk=challenge_phase_split_id)
+            .values_list("challenge_phase__challenge", flat=True)
+            .first()
+        )
+        if challenge_pk is not None and is_user_a_host_of_challenge(
+            request.user, challenge_pk
+        ):
+            variant = "host"
+    return (
+        variant,
+        [LEADERBOARD_CACHE_VERSION_KEY.format(challenge_phase_split_id)],
+    )
+
+
+def get_banned_participant_team_pks(challenge):
+    """
+    Returns the set of participant team ids which have at least one member
+    whose email is in `challenge.banned_email_ids`
+
+    Arguments:
+        challenge {Challenge} -- challenge whose banned teams are returned
+    """
+    if not challenge.banned_email_ids:
+        return set()
+    cache_key = BANNED_PARTICIPANT_TEAMS_CACHE_KEY.format(challenge.pk)
+    banned_participant_team_pks = cache.get(cache_key)
+    if banned_participant_team_pks is None:
+        banned_participant_team_pks = set(
+            Participant.objects.filter(
+                user__email__in=challenge.banned_email_ids
+            )
+            .values_list("team", flat=True)
+            .distinct()
+        )
+        cache.set(
+            cache_key,
+            banned_participant_team_pks,
+            BANNED_PARTICIPANT_TEAMS_CACHE_TIMEOUT,
+        )
+    return banned_participant_team_pks
+
+
+def invalidate_banned_participant_teams(challenge_pk):
+    """Drops the cached banned participant teams of a challenge"""
+    cache.delete(BANNED_PARTICIPANT_TEAMS_CACHE_KEY.format(challenge_pk))
+
+
+# Recomputes `result_values` and `error_values` in the order of the labels
+UPDATE_LEADERBOARD_DATA_LABEL_VALUES_QUERY = """
+    UPDATE leaderboard_data
+    SET result_values = ARRAY(
+            SELECT CASE WHEN jsonb_typeof(result -> label) = 'number'
+                        THEN (result ->> label)::double precision END
+            FROM unnest(%s::text[]) WITH ORDINALITY AS labels(label, position)
+            ORDER BY position
+        ),
+        error_values = CASE WHEN error IS NULL THEN NULL ELSE ARRAY(
+            SELECT CASE WHEN jsonb_typeof(error -> ('error_' || label)) = 'number'
+                        THEN (error ->> ('error_' || label))::double precision END
+            FROM unnest(%s::text[]) WITH ORDINALITY AS labels(label, position)
+            ORDER BY position
+        ) END
+    WHERE leaderboard_id = %s
+"""
+
+
+def update_leaderboard_data_label_values(leaderboard):
+    """
+    Recomputes the label values of all the results of a leaderboard in the
+    database, e.g. after its schema has changed
+    """
+    labels = leaderboard.get_schema_value("labels", [])
+    with connection.cursor() as cursor:
+        cursor.execute(
+            UPDATE_LEADERBOARD_DATA_LABEL_VALUES_QUERY,
+            [labels, labels, leaderboard.pk],
+        )
+
+
+def get_leaderboard_metric_index_name(metric):
+    """Returns the name of the expression index of a leaderboard metric"""
+    metric_hash = hashlib.md5(metric.encode("utf-8")).hexdigest()[:16]
+    return "{}{}".format(LEADERBOARD_METRIC_INDEX_PREFIX, metric_hash)
+
+
+def get_active_leaderboard_metrics():
+    """
+    Returns the set of `default_order_by` metrics of the leaderboards used
+    by at least one challenge phase split
+    """
+    schemas = Leaderboard.objects.filter(
+        challengephasesplit__isnull=False
+    ).values_list("schema", flat=True)
+    return {
+        schema["default_order_by"]
+        for schema in schemas
+        if isinstance(schema, dict) and schema.get("default_order_by")
+    }
+
+
+def create_leaderboard_metric_index(metric):
+    """
+    Creates the partial expression index on
+    (challenge_phase_split_id, (result ->> metric)::float) of the numeric
+    results of `LeaderboardData` if it does not exist yet
+
+    Arguments:
+        metric {string} -- `default_order_by` key of a leaderboard schema
+    """
+    # Indexes can only be built concurrently outside of a transaction
+    concurrently = "" if connection.in_atomic_block else "CONCURRENTLY"
+    query = CREATE_LEADERBOARD_METRIC_INDEX_QUERY.format(
+        concurrently=concurrently,
+        name=get_leaderboard_metric_index_name(metric),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(query, [metric, metric, metric])
+
+
+def get_leaderboard_metric_indexes():
+    """
+    Returns a map of the names of the existing leaderboard metric indexes to
+    whether they are usable, i.e. valid and built with the numeric guard. A
+    concurrent build which failed leaves an invalid index behind.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT index_class.relname, pg_index.indisvalid, "
+            "pg_get_indexdef(pg_index.indexrelid) "
+            "FROM pg_index "
+            "INNER JOIN pg_class index_class "
+            "ON index_class.oid = pg_index.indexrelid "
+            "INNER JOIN pg_class table_class "
+            "ON table_class.oid = pg_index.indrelid "
+            "WHERE table_class.relname = %s AND index_class.relname LIKE %s",
+            [
+                LeaderboardData._meta.db_table,
+                "{}%".format(LEADERBOARD_METRIC_INDEX_PREFIX),
+            ],
+        )
+        return {
+            name: is_valid and LEADERBOARD_METRIC_INDEX_GUARD in definition
+            for name, is_valid, definition in cursor.fetchall()
+        }
+
+
+def drop_leaderboard_metric_index(name):
+    """Drops a leaderboard metric index by name"""
+    concurrently = "" if connection.in_atomic_block else "CONCURRENTLY"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "DROP INDEX {} IF EXISTS {}".format(concurrently, name)
+        )
+
 
 def get_file_content(file_path, mode):
     if os.path.isfile(file_path):
@@ -1,4 +1,3 @@
-import csv
 import logging
 import random
 import requests
@@ -16,7 +15,6 @@ from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
 from django.core.files.base import ContentFile
 from django.db import transaction
-from django.http import HttpResponse
 from django.utils import timezone
 
 from rest_framework import permissions, status
@@ -38,13 +36,17 @@ from allauth.account.models import EmailAddress
 from accounts.permissions import HasVerifiedEmail
 from accounts.serializers import UserDetailsSerializer
 from base.utils import (
+    cache_response,
     get_queue_name,
+    get_streaming_csv_response,
     get_url_from_hostname,
     paginated_queryset,
     send_email,
     send_slack_notification
 )
 from challenges.utils import (
+    get_challenge_cache_keys,
+    get_challenge_list_cache_keys,
     get_challenge_model,
     get_challenge_phase_model,
     get_challenge_phase_split_model,
@@ -57,12 +59,14 @@ from hosts.utils import (
     is_user_a_host_of_challenge,
     get_challenge_host_team_model,
 )
+from jobs.constants import submission_cursor_ordering
 from jobs.filters import SubmissionFilter
 from jobs.models import Submission
 from jobs.serializers import (
     SubmissionSerializer,
     ChallengeSubmissionManagementSerializer,
 )
+from jobs.utils import serialize_submissions_in_chunks
 from participants.models import Participant, ParticipantTeam
 from participants.utils import (
     get_participant_teams_for_user,
@@ -126,7 +130,9 @@ def challenge_list(request, challenge_host_team_pk):
         challenge = Challenge.objects.filter(
             creator=challenge_host_team, is_disabled=False
         ).order_by("-id")
-        paginator, result_page = paginated_queryset(challenge, request)
+        paginator, result_page = paginated_queryset(
+            challenge, request, cursor_ordering=("-id",)
+        )
         serializer = ChallengeSerializer(
             result_page, many=True, context={"request": request}
         )
@@ -354,6 +360,7 @@ def disable_challenge(request, challenge_pk):
 
 @api_view(["GET"])
 @throttle_classes([AnonRateThrottle])
+@cache_response(get_challenge_list_cache_keys)
 def get_all_challenges(request, challenge_time):
     """
     Returns the list of all challenges
@@ -379,7 +386,11 @@ def get_all_challenges(request, challenge_time):
     q_params["is_disabled"] = False
 
     challenge = Challenge.objects.filter(**q_params).order_by("-pk")
-    paginator, result_page = paginated_queryset(challenge, request)
+    paginator, result_page = paginated_queryset(
+        ChallengeSerializer.setup_eager_loading(challenge),
+        request,
+        cursor_ordering=("-id",),
+    )
     serializer = ChallengeSerializer(
         result_page, many=True, context={"request": request}
     )
@@ -389,6 +400,7 @@ def get_all_challenges(request, challenge_time):
 
 @api_view(["GET"])
 @throttle_classes([AnonRateThrottle])
+@cache_response(get_challenge_list_cache_keys)
 def get_featured_challenges(request):
     """
     Returns the list of featured challenges
@@ -399,7 +411,9 @@ def get_featured_challenges(request):
         approved_by_admin=True,
         is_disabled=False,
     ).order_by("-id")
-    paginator, result_page = paginated_queryset(challenge, request)
+    paginator, result_page = paginated_queryset(
+        ChallengeSerializer.setup_eager_loading(challenge), request
+    )
     serializer = ChallengeSerializer(
         result_page, many=True, context={"request": request}
     )
@@ -409,6 +423,7 @@ def get_featured_challenges(request):
 
 @api_view(["GET"])
 @throttle_classes([AnonRateThrottle])
+@cache_response(get_challenge_cache_keys)
 def get_challenge_by_pk(request, pk):
     """
     Returns a particular challenge by id
@@ -468,7 +483,11 @@ def get_challenges_based_on_teams(request):
         q_params["creator__id__in"] = host_team_ids
 
     challenge = Challenge.objects.filter(**q_params).order_by("id")
-    paginator, result_page = paginated_queryset(challenge, request)
+    paginator, result_page = paginated_queryset(
+        ChallengeSerializer.setup_eager_loading(challenge),
+        request,
+        cursor_ordering=("id",),
+    )
     serializer = ChallengeSerializer(
         result_page, many=True, context={"request": request}
     )
@@ -502,7 +521,9 @@ def challenge_phase_list(request, challenge_pk):
             challenge_phase = ChallengePhase.objects.filter(
                 challenge=challenge, is_public=True
             ).order_by("pk")
-        paginator, result_page = paginated_queryset(challenge_phase, request)
+        paginator, result_page = paginated_queryset(
+            challenge_phase, request, cursor_ordering=("id",)
+        )
         serializer = ChallengePhaseSerializer(result_page, many=True)
         response_data = serializer.data
         return paginator.get_paginated_response(response_data)
@@ -587,6 +608,7 @@ def challenge_phase_detail(request, challenge_pk, pk):
 
 @api_view(["GET"])
 @throttle_classes([AnonRateThrottle])
+@cache_response(get_challenge_cache_keys)
 def challenge_phase_split_list(request, challenge_pk):
     """
     Returns the list of Challenge Phase Splits for a particular challenge
@@ -1210,7 +1232,13 @@ def get_all_submissions_of_challenge(
             challenge_phase=challenge_phase
         ).order_by("-submitted_at")
         filtered_submissions = SubmissionFilter(request.GET, queryset=submissions)
-        paginator, result_page = paginated_queryset(filtered_submissions.qs, request)
+        paginator, result_page = paginated_queryset(
+            ChallengeSubmissionManagementSerializer.setup_eager_loading(
+                filtered_submissions.qs
+            ),
+            request,
+            cursor_ordering=submission_cursor_ordering,
+        )
         serializer = ChallengeSubmissionManagementSerializer(
             result_page, many=True, context={"request": request}
         )
@@ -1232,7 +1260,11 @@ def get_all_submissions_of_challenge(
             participant_team=participant_team_pk,
             challenge_phase=challenge_phase,
         ).order_by("-submitted_at")
-        paginator, result_page = paginated_queryset(submissions, request)
+        paginator, result_page = paginated_queryset(
+            SubmissionSerializer.setup_eager_loading(submissions),
+            request,
+            cursor_ordering=submission_cursor_ordering,
+        )
         serializer = SubmissionSerializer(
             result_page, many=True, context={"request": request}
         )
@@ -1279,16 +1311,9 @@ def download_all_submissions(
                 submissions = Submission.objects.filter(
                     challenge_phase__challenge=challenge
                 ).order_by("-submitted_at")
-                submissions = ChallengeSubmissionManagementSerializer(
-                    submissions, many=True, context={"request": request}
-                )
-                response = HttpResponse(content_type="text/csv")
-                response[
-                    "Content-Disposition"
-                ] = "attachment; filename=all_submissions.csv"
-                writer = csv.writer(response)
-                writer.writerow(
-                    [
+
+                def get_rows():
+                    yield [
                         "id",
                         "Team Name",
                         "Team Members",
@@ -1306,10 +1331,10 @@ def download_all_submissions(
                         "Submission Result File",
                         "Submission Metadata File",
                     ]
-                )
-                for submission in submissions.data:
-                    writer.writerow(
-                        [
+                    for submission in serialize_submissions_in_chunks(
+                        submissions, request
+                    ):
+                        yield [
                             submission["id"],
                             submission["participant_team"],
                             ",".join(
@@ -1340,8 +1365,10 @@ def download_all_submissions(
                             submission["submission_result_file"],
                             submission["submission_metadata_file"],
                         ]
-                    )
-                return response
+
+                return get_streaming_csv_response(
+                    get_rows(), "all_submissions.csv"
+                )
 
             elif has_user_participated_in_challenge(
                 user=request.user, challenge_id=challenge_pk
@@ -1357,16 +1384,9 @@ def download_all_submissions(
                     participant_team=participant_team_pk,
                     challenge_phase=challenge_phase,
                 ).order_by("-submitted_at")
-                submissions = ChallengeSubmissionManagementSerializer(
-                    submissions, many=True, context={"request": request}
-                )
-                response = HttpResponse(content_type="text/csv")
-                response[
-                    "Content-Disposition"
-                ] = "attachment; filename=all_submissions.csv"
-                writer = csv.writer(response)
-                writer.writerow(
-                    [
+
+                def get_rows():
+                    yield [
                         "Team Name",
                         "Method Name",
                         "Status",
@@ -1377,10 +1397,10 @@ def download_all_submissions(
                         "Stderr File",
                         "Submitted At",
                     ]
-                )
-                for submission in submissions.data:
-                    writer.writerow(
-                        [
+                    for submission in serialize_submissions_in_chunks(
+                        submissions, request
+                    ):
+                        yield [
                             submission["participant_team"],
                             submission["method_name"],
                             submission["status"],
@@ -1391,8 +1411,10 @@ def download_all_submissions(
                             submission["stderr_file"],
                             submission["created_at"],
                         ]
-                    )
-                return response
+
+                return get_streaming_csv_response(
+                    get_rows(), "all_submissions.csv"
+                )
             else:
                 response_data = {
                     "error": "You are neither host nor participant of the challenge!"
@@ -1425,45 +1447,47 @@ def download_all_submissions(
                 submissions = Submission.objects.filter(
                     challenge_phase__challenge=challenge
                 ).order_by('-submitted_at')
-                submissions = ChallengeSubmissionManagementSerializer(
-                    submissions, many=True, context={'request': request}
-                )
-                response = HttpResponse(content_type='text/csv')
-                response['Content-Disposition'] = 'attachment; filename=all_submissions.csv'
-                writer = csv.writer(response)
-                fields = [fields_to_export[field] for field in request.data]
-                fields.insert(0, 'id')
-                writer.writerow(fields)
-                for submission in submissions.data:
-                    row = [submission['id']]
-                    for field in request.data:
-                        if field == 'participant_team_members':
-                            row.append(
-                                ",".join(
-                                    username['username']
-                                    for username in submission['participant_team_members']
+                requested_fields = list(request.data)
+
+                def get_rows():
+                    fields = [fields_to_export[field] for field in requested_fields]
+                    fields.insert(0, 'id')
+                    yield fields
+                    for submission in serialize_submissions_in_chunks(
+                        submissions, request
+                    ):
+                        row = [submission['id']]
+                        for field in requested_fields:
+                            if field == 'participant_team_members':
+                                row.append(
+                                    ",".join(
+                                        username['username']
+                                        for username in submission['participant_team_members']
+                                    )
                                 )
-                            )
-                        elif field == 'participant_team_members_email':
-                            row.append(
-                                ",".join(
-                                    email['email']
-                                    for email in submission['participant_team_members']
+                            elif field == 'participant_team_members_email':
+                                row.append(
+                                    ",".join(
+                                        email['email']
+                                        for email in submission['participant_team_members']
+                                    )
                                 )
-                            )
-                        elif field == 'participant_team_members_affiliation':
-                            row.append(
-                                ",".join(
-                                    affiliation
-                                    for affiliation in submission['participant_team_members_affiliations']
+                            elif field == 'participant_team_members_affiliation':
+                                row.append(
+                                    ",".join(
+                                        affiliation
+                                        for affiliation in submission['participant_team_members_affiliations']
+                                    )
                                 )
-                            )
-                        elif field == 'created_at':
-                            row.append(submission['created_at'].strftime('%m/%d/%Y %H:%M:%S'))
-                        else:
-                            row.append(submission[field])
-                    writer.writerow(row)
-                return response
+                            elif field == 'created_at':
+                                row.append(submission['created_at'].strftime('%m/%d/%Y %H:%M:%S'))
+                            else:
+                                row.append(submission[field])
+                        yield row
+
+                return get_streaming_csv_response(
+                    get_rows(), 'all_submissions.csv'
+                )
 
             else:
                 response_data = {'error': 'Sorry, you do not belong to this Host Team!'}
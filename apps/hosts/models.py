@@ -1,7 +1,9 @@
 from __future__ import unicode_literals
 
 from django.db import models
+from django.db.models.signals import post_delete, post_save
 from django.contrib.auth.models import User
+from django.dispatch import receiver
 
 from base.models import TimeStampedModel
 
@@ -33,6 +35,23 @@ class ChallengeHostTeam(TimeStampedModel):
         db_table = "challenge_host_teams"
 
 
+@receiver(post_save, sender="hosts.ChallengeHostTeam")
+def invalidate_host_team_challenge_cached_responses(
+    sender, instance, created, **kwargs
+):
+    """The cached challenges show the name and url of their host team"""
+    from challenges.models import Challenge
+    from challenges.utils import invalidate_challenge_cached_responses
+
+    if created:
+        return
+    invalidate_challenge_cached_responses(
+        Challenge.objects.filter(creator=instance).values_list(
+            "pk", flat=True
+        )
+    )
+
+
 class ChallengeHost(TimeStampedModel):
 
     # permission options
@@ -76,3 +95,11 @@ class ChallengeHost(TimeStampedModel):
     class Meta:
         app_label = "hosts"
         db_table = "challenge_host"
+
+
+@receiver(post_save, sender="hosts.ChallengeHost")
+@receiver(post_delete, sender="hosts.ChallengeHost")
+def invalidate_challenge_host_authorization(sender, instance, **kwargs):
+    from accounts.utils import invalidate_authorization_context
+
+    invalidate_authorization_context([instance.user_id])
@@ -1,5 +1,5 @@
+from accounts.utils import get_authorization_context
 from base.utils import get_model_object
-from challenges.models import Challenge
 
 from .models import ChallengeHost, ChallengeHostTeam
 
@@ -13,12 +13,10 @@ def get_challenge_host_teams_for_user(user):
 
 def is_user_a_host_of_challenge(user, challenge_pk):
     """Returns boolean if the user is host of a challenge."""
-    if user.is_anonymous():
+    if user.is_anonymous() or challenge_pk is None:
         return False
-    challenge_host_teams = get_challenge_host_teams_for_user(user)
-    return Challenge.objects.filter(
-        pk=challenge_pk, creator_id__in=challenge_host_teams
-    ).exists()
+    context = get_authorization_context(user)
+    return int(challenge_pk) in context.hosted_challenge_pks
 
 
 def is_user_part_of_host_team(user, host_team):
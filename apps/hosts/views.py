@@ -39,7 +39,7 @@ def challenge_host_team_list(request):
             id__in=challenge_host_team_ids
         ).order_by("-id")
         paginator, result_page = paginated_queryset(
-            challenge_host_teams, request
+            challenge_host_teams, request, cursor_ordering=("-id",)
         )
         serializer = HostTeamDetailSerializer(result_page, many=True)
         response_data = serializer.data
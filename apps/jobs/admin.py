@@ -3,9 +3,15 @@ import logging
 from django.contrib import admin
 
 from base.admin import ImportExportTimeStampedAdmin
+from challenges.models import ChallengePhaseSplit
 
-from .models import Submission
+from .models import (
+    Submission,
+    rebuild_submission_quota,
+    rebuild_submission_rollup,
+)
 from .sender import publish_submission_message
+from .utils import rebuild_leaderboard_ranks
 
 
 logger = logging.getLogger(__name__)
@@ -56,8 +62,15 @@ class SubmissionAdmin(ImportExportTimeStampedAdmin):
     get_challenge_name_and_id.admin_order_field = "challenge_phase__challenge"
 
     def submit_job_to_worker(self, request, queryset):
-        for submission in queryset:
-            challenge_id = submission.challenge_phase.challenge.id
+        # The selection is read before the update, which may change the
+        # submissions matched by the admin filters
+        submissions = list(queryset.select_related("challenge_phase"))
+        submission_pks = [submission.pk for submission in submissions]
+        Submission.objects.filter(pk__in=submission_pks).update(
+            status=Submission.SUBMITTED
+        )
+        for submission in submissions:
+            challenge_id = submission.challenge_phase.challenge_id
             challenge_phase_id = submission.challenge_phase.id
             submission_id = submission.id
             logger.info(
@@ -68,6 +81,23 @@ class SubmissionAdmin(ImportExportTimeStampedAdmin):
             publish_submission_message(
                 challenge_id, challenge_phase_id, submission.id
             )
-            queryset.update(status=Submission.SUBMITTED)
+        # `update` bypasses `Submission.save`, so the quotas, the rollups and
+        # the leaderboard ranks are recomputed
+        quota_keys = {
+            (submission.participant_team_id, submission.challenge_phase_id)
+            for submission in submissions
+        }
+        for participant_team_pk, challenge_phase_pk in quota_keys:
+            rebuild_submission_quota(participant_team_pk, challenge_phase_pk)
+        challenge_phase_pks = {
+            submission.challenge_phase_id for submission in submissions
+        }
+        for challenge_phase_pk in challenge_phase_pks:
+            rebuild_submission_rollup(challenge_phase_pk)
+        challenge_phase_split_pks = ChallengePhaseSplit.objects.filter(
+            challenge_phase__in=challenge_phase_pks
+        ).values_list("pk", flat=True)
+        for challenge_phase_split_pk in challenge_phase_split_pks:
+            rebuild_leaderboard_ranks(challenge_phase_split_pk)
 
     submit_job_to_worker.short_description = "Run selected submissions"
@@ -1 +1,5 @@
 submission_status_to_exclude = ["failed", "cancelled"]
+
+# Ordering of the submission lists paginated with a cursor, the id breaks
+# the ties between submissions made at the same time
+submission_cursor_ordering = ("-submitted_at", "-id")
@@ -0,0 +1,27 @@
+from challenges.models import ChallengePhaseSplit
+from channels import Group
+
+from .utils import LEADERBOARD_GROUP_NAME
+
+
+def ws_connect_leaderboard(message, challenge_phase_split_id):
+    """
+    Subscribes a websocket client to the rank deltas of a public
+    challenge phase split leaderboard
+    """
+    is_public = ChallengePhaseSplit.objects.filter(
+        pk=challenge_phase_split_id, visibility=ChallengePhaseSplit.PUBLIC
+    ).exists()
+    if not is_public:
+        message.reply_channel.send({"close": True})
+        return
+    Group(LEADERBOARD_GROUP_NAME.format(challenge_phase_split_id)).add(
+        message.reply_channel
+    )
+    message.reply_channel.send({"accept": True})
+
+
+def ws_disconnect_leaderboard(message, challenge_phase_split_id):
+    Group(LEADERBOARD_GROUP_NAME.format(challenge_phase_split_id)).discard(
+        message.reply_channel
+    )
@@ -0,0 +1,157 @@
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from challenges.models import ChallengePhaseSplit
+from challenges.utils import (
+    create_leaderboard_metric_index,
+    drop_leaderboard_metric_index,
+    get_leaderboard_metric_index_name,
+    update_leaderboard_data_label_values,
+)
+from jobs.management.commands.benchmark_submission_queries import (
+    SEED_PARTICIPANT_TEAMS_QUERY,
+)
+from jobs.models import Submission
+from jobs.utils import get_leaderboard_ranking_query
+
+# Each seeded leaderboard entry has its own finished public submission, the
+# submissions are spread over the participant teams so that every team keeps
+# its best entry.
+SEED_LEADERBOARD_DATA_QUERY = """
+    WITH seeded_submissions AS (
+        INSERT INTO submission (
+            created_at, modified_at, participant_team_id, challenge_phase_id,
+            created_by_id, status, is_public, is_flagged, submission_number,
+            download_count, submitted_at, input_file, execution_time_limit,
+            method_name, method_description, publication_url, project_url,
+            is_baseline
+        )
+        SELECT NOW(), NOW(), (%(teams)s::int[])[1 + mod(i, %(teams_count)s)],
+               %(phase)s, %(user)s, %(status)s, TRUE, FALSE, i, 0, NOW(), '',
+               300, '', '', '', '', FALSE
+        FROM generate_series(1, %(rows)s) i
+        RETURNING id
+    )
+    INSERT INTO leaderboard_data (
+        created_at, modified_at, challenge_phase_split_id, submission_id,
+        leaderboard_id, result, error, result_values
+    )
+    SELECT NOW(), NOW(), %(split)s, seeded_submissions.id, %(leaderboard)s,
+           jsonb_build_object(%(metric)s, random() * 100), NULL, '{}'
+    FROM seeded_submissions
+"""
+
+
+class Command(BaseCommand):
+
+    help = (
+        "Prints the query plan of the leaderboard ranking query of a "
+        "challenge phase split without and with the metric expression index. "
+        "Everything runs in a transaction which is rolled back, but the "
+        "metric index is dropped and the leaderboard table is locked "
+        "meanwhile, so it must only be run against a scratch database. Pass "
+        "--force to run it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "challenge_phase_split", type=int, help="Challenge phase split id."
+        )
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=0,
+            help="Number of fake leaderboard rows to seed before explaining.",
+        )
+        parser.add_argument(
+            "--teams",
+            type=int,
+            default=1000,
+            help="Number of fake participant teams the seeded rows are "
+            "spread over.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Confirm that the database is a scratch database.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["force"]:
+            raise CommandError(
+                "This command drops the leaderboard metric index and must "
+                "only be run against a scratch database, pass --force to run "
+                "it."
+            )
+        try:
+            challenge_phase_split = ChallengePhaseSplit.objects.select_related(
+                "leaderboard", "challenge_phase__challenge"
+            ).get(pk=options["challenge_phase_split"])
+        except ChallengePhaseSplit.DoesNotExist:
+            raise CommandError("Challenge phase split does not exist.")
+
+        ranking_query = get_leaderboard_ranking_query(challenge_phase_split)
+        if ranking_query is None:
+            raise CommandError("Leaderboard schema has no default_order_by.")
+        query, params = ranking_query
+        metric = challenge_phase_split.leaderboard.schema["default_order_by"]
+
+        with transaction.atomic():
+            if options["rows"]:
+                self.seed(
+                    challenge_phase_split,
+                    metric,
+                    options["rows"],
+                    options["teams"],
+                )
+
+            drop_leaderboard_metric_index(
+                get_leaderboard_metric_index_name(metric)
+            )
+            self.explain("Without index", query, params)
+
+            create_leaderboard_metric_index(metric)
+            self.explain("With index", query, params)
+
+            transaction.set_rollback(True)
+
+    def seed(self, challenge_phase_split, metric, rows, teams):
+        # The submissions are created by a participant, since the entries of
+        # the challenge hosts are left out of the public leaderboards
+        user_pk = (
+            Submission.objects.filter(
+                challenge_phase=challenge_phase_split.challenge_phase
+            )
+            .values_list("created_by", flat=True)
+            .first()
+        )
+        if user_pk is None:
+            raise CommandError("Seeding needs at least one submission.")
+        with connection.cursor() as cursor:
+            cursor.execute(SEED_PARTICIPANT_TEAMS_QUERY, [user_pk, teams])
+            team_pks = [row[0] for row in cursor.fetchall()]
+            cursor.execute(
+                SEED_LEADERBOARD_DATA_QUERY,
+                {
+                    "teams": team_pks,
+                    "teams_count": len(team_pks),
+                    "phase": challenge_phase_split.challenge_phase_id,
+                    "user": user_pk,
+                    "status": Submission.FINISHED,
+                    "rows": rows,
+                    "split": challenge_phase_split.pk,
+                    "leaderboard": challenge_phase_split.leaderboard_id,
+                    "metric": metric,
+                },
+            )
+        update_leaderboard_data_label_values(challenge_phase_split.leaderboard)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE submission")
+            cursor.execute("ANALYZE leaderboard_data")
+
+    def explain(self, title, query, params):
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN ANALYZE {}".format(query), params)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+        self.stdout.write(self.style.SUCCESS(title))
+        self.stdout.write(plan)
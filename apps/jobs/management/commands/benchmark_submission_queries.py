@@ -0,0 +1,251 @@
+import time
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from challenges.models import ChallengePhase
+from jobs.models import Submission, get_submission_quota_counts
+from jobs.utils import get_submission_counts_of_phases
+
+SEED_PARTICIPANT_TEAMS_QUERY = """
+    INSERT INTO participant_team (
+        created_at, modified_at, team_name, created_by_id, team_url
+    )
+    SELECT NOW(), NOW(), 'benchmark-' || md5(random()::text || i), %s, ''
+    FROM generate_series(1, %s) i
+    RETURNING id
+"""
+
+# Submissions are spread over the participant teams and the phases of the
+# challenge during the last 90 days. Statuses are drawn from a list weighted
+# like a live challenge where most submissions have finished.
+SEED_SUBMISSIONS_QUERY = """
+    INSERT INTO submission (
+        created_at, modified_at, participant_team_id, challenge_phase_id,
+        created_by_id, status, is_public, is_flagged, submission_number,
+        download_count, submitted_at, input_file, execution_time_limit,
+        method_name, method_description, publication_url, project_url,
+        is_baseline
+    )
+    SELECT seed.submitted_at, seed.submitted_at,
+           (%(teams)s::int[])[1 + mod(seed.i, %(teams_count)s)],
+           (%(phases)s::int[])[1 + mod(seed.i, %(phases_count)s)],
+           %(user)s,
+           (%(statuses)s::text[])[1 + floor(random() * %(statuses_count)s)::int],
+           FALSE, FALSE, seed.i, 0, seed.submitted_at, '', 300, '', '', '',
+           '', FALSE
+    FROM (
+        SELECT i, NOW() - random() * INTERVAL '90 days' AS submitted_at
+        FROM generate_series(1, %(rows)s) i
+    ) seed
+"""
+
+SEED_SUBMISSION_STATUSES = (
+    [Submission.FINISHED] * 14
+    + [Submission.FAILED] * 4
+    + [Submission.CANCELLED, Submission.RUNNING]
+)
+
+
+def get_submission_composite_indexes():
+    """Returns the definitions of the multi-column indexes of submissions"""
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(
+            cursor, Submission._meta.db_table
+        )
+        names = [
+            name
+            for name, constraint in constraints.items()
+            if constraint["index"]
+            and not constraint["unique"]
+            and len(constraint["columns"]) > 1
+        ]
+        cursor.execute(
+            "SELECT indexname, indexdef FROM pg_indexes "
+            "WHERE tablename = %s AND indexname = ANY(%s)",
+            [Submission._meta.db_table, names],
+        )
+        return cursor.fetchall()
+
+
+class Command(BaseCommand):
+
+    help = (
+        "Reports the latency of the submission queries of the submit path "
+        "and the quota endpoints of a challenge phase without and with the "
+        "composite submission indexes. Everything runs in a transaction "
+        "which is rolled back, but the indexes of the submission table are "
+        "dropped and the table is locked meanwhile, so it must only be run "
+        "against a scratch database. Pass --force to run it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "challenge_phase", type=int, help="Challenge phase id."
+        )
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=0,
+            help="Number of fake submissions to seed before measuring.",
+        )
+        parser.add_argument(
+            "--teams",
+            type=int,
+            default=1000,
+            help="Number of fake participant teams the seeded submissions "
+            "are spread over.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Number of times each query is run, the median is reported.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Confirm that the database is a scratch database.",
+        )
+
+    def handle(self, *args, **options):
+        if not options["force"]:
+            raise CommandError(
+                "This command drops the submission indexes and must only be "
+                "run against a scratch database, pass --force to run it."
+            )
+        try:
+            challenge_phase = ChallengePhase.objects.select_related(
+                "challenge__creator"
+            ).get(pk=options["challenge_phase"])
+        except ChallengePhase.DoesNotExist:
+            raise CommandError("Challenge phase does not exist.")
+
+        with transaction.atomic():
+            if options["rows"]:
+                self.seed(challenge_phase, options["rows"], options["teams"])
+
+            participant_team_pk = (
+                Submission.objects.filter(challenge_phase=challenge_phase)
+                .values_list("participant_team", flat=True)
+                .first()
+            )
+            if participant_team_pk is None:
+                raise CommandError(
+                    "Measuring needs at least one submission, use --rows."
+                )
+            queries = self.get_queries(challenge_phase, participant_team_pk)
+
+            indexes = get_submission_composite_indexes()
+            with connection.cursor() as cursor:
+                for name, _ in indexes:
+                    cursor.execute('DROP INDEX "{}"'.format(name))
+                cursor.execute("ANALYZE submission")
+            before = self.measure(queries, options["repeat"])
+
+            with connection.cursor() as cursor:
+                for _, definition in indexes:
+                    cursor.execute(definition)
+                cursor.execute("ANALYZE submission")
+            after = self.measure(queries, options["repeat"])
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Median latency over {} runs with {} composite indexes "
+                "({} seeded submissions)".format(
+                    options["repeat"], len(indexes), options["rows"]
+                )
+            )
+        )
+        for title, _ in queries:
+            self.stdout.write(
+                "{:<40} before: {:>9.2f} ms  after: {:>9.2f} ms".format(
+                    title, before[title], after[title]
+                )
+            )
+
+    def seed(self, challenge_phase, rows, teams):
+        challenge = challenge_phase.challenge
+        user_pk = challenge.creator.created_by_id
+        with connection.cursor() as cursor:
+            cursor.execute(SEED_PARTICIPANT_TEAMS_QUERY, [user_pk, teams])
+            team_pks = [row[0] for row in cursor.fetchall()]
+            phase_pks = list(
+                ChallengePhase.objects.filter(challenge=challenge).values_list(
+                    "pk", flat=True
+                )
+            )
+            cursor.execute(
+                SEED_SUBMISSIONS_QUERY,
+                {
+                    "teams": team_pks,
+                    "teams_count": len(team_pks),
+                    "phases": phase_pks,
+                    "phases_count": len(phase_pks),
+                    "user": user_pk,
+                    "statuses": SEED_SUBMISSION_STATUSES,
+                    "statuses_count": len(SEED_SUBMISSION_STATUSES),
+                    "rows": rows,
+                },
+            )
+
+    def get_queries(self, challenge_phase, participant_team_pk):
+        submissions = Submission.objects.filter(
+            participant_team=participant_team_pk,
+            challenge_phase=challenge_phase,
+        )
+        return [
+            (
+                "Submission quota counts",
+                lambda: get_submission_quota_counts(
+                    participant_team_pk, challenge_phase.pk
+                ),
+            ),
+            (
+                "Remaining submission counts",
+                lambda: get_submission_counts_of_phases(
+                    participant_team_pk, [challenge_phase.pk]
+                ),
+            ),
+            (
+                "Submissions in progress",
+                lambda: submissions.filter(
+                    status__in=[
+                        Submission.SUBMITTED,
+                        Submission.SUBMITTING,
+                        Submission.RUNNING,
+                    ]
+                ).count(),
+            ),
+            (
+                "Submissions of a participant team",
+                lambda: list(
+                    submissions.order_by("-submitted_at").values_list(
+                        "pk", flat=True
+                    )[:100]
+                ),
+            ),
+            (
+                "Running submissions of the challenge",
+                lambda: list(
+                    Submission.objects.filter(
+                        challenge_phase__challenge=challenge_phase.challenge_id,
+                        status=Submission.RUNNING,
+                    ).values_list("pk", flat=True)
+                ),
+            ),
+        ]
+
+    def measure(self, queries, repeat):
+        latencies = {}
+        for title, query in queries:
+            timings = []
+            for _ in range(max(repeat, 1)):
+                start = time.perf_counter()
+                query()
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            latencies[title] = timings[len(timings) // 2]
+        return latencies
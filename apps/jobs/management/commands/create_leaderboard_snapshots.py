@@ -0,0 +1,43 @@
+from django.core.management import BaseCommand
+from django.utils import timezone
+
+from challenges.models import ChallengePhaseSplit
+from jobs.utils import create_leaderboard_snapshot
+
+
+class Command(BaseCommand):
+
+    help = (
+        "Creates the leaderboard snapshots of the challenge phase splits whose "
+        "phase has ended and which have no snapshot yet."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--challenge-phase-split",
+            type=int,
+            help="Create or refresh the snapshot of this challenge phase split.",
+        )
+
+    def handle(self, *args, **options):
+        if options["challenge_phase_split"]:
+            challenge_phase_splits = ChallengePhaseSplit.objects.filter(
+                pk=options["challenge_phase_split"]
+            )
+        else:
+            challenge_phase_splits = ChallengePhaseSplit.objects.filter(
+                challenge_phase__end_date__lt=timezone.now(),
+                snapshot__isnull=True,
+            )
+        challenge_phase_splits = challenge_phase_splits.select_related(
+            "leaderboard"
+        )
+        count = 0
+        for challenge_phase_split in challenge_phase_splits:
+            if "default_order_by" not in challenge_phase_split.leaderboard.schema:
+                continue
+            create_leaderboard_snapshot(challenge_phase_split)
+            count += 1
+        self.stdout.write(
+            self.style.SUCCESS("Created {} leaderboard snapshots.".format(count))
+        )
@@ -0,0 +1,44 @@
+from django.core.management import BaseCommand
+
+from challenges.models import ChallengePhaseSplit
+from jobs.utils import rebuild_leaderboard_ranks
+
+
+class Command(BaseCommand):
+
+    help = "Rebuilds the materialized leaderboards of challenge phase splits."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--challenge",
+            type=int,
+            help="Only rebuild the leaderboards of this challenge.",
+        )
+        parser.add_argument(
+            "--challenge-phase-split",
+            type=int,
+            help="Only rebuild the leaderboard of this challenge phase split.",
+        )
+
+    def handle(self, *args, **options):
+        challenge_phase_splits = ChallengePhaseSplit.objects.all()
+        if options["challenge"]:
+            challenge_phase_splits = challenge_phase_splits.filter(
+                challenge_phase__challenge=options["challenge"]
+            )
+        if options["challenge_phase_split"]:
+            challenge_phase_splits = challenge_phase_splits.filter(
+                pk=options["challenge_phase_split"]
+            )
+        challenge_phase_split_pks = challenge_phase_splits.values_list(
+            "pk", flat=True
+        )
+        for challenge_phase_split_pk in challenge_phase_split_pks:
+            rebuild_leaderboard_ranks(challenge_phase_split_pk)
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Rebuilt {} leaderboards.".format(
+                    len(challenge_phase_split_pks)
+                )
+            )
+        )
@@ -0,0 +1,36 @@
+from django.core.management import BaseCommand
+
+from jobs.models import Submission, rebuild_submission_quota
+
+
+class Command(BaseCommand):
+
+    help = "Recomputes the submission quota counters from the submissions."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--challenge",
+            type=int,
+            help="Only rebuild the submission quotas of this challenge.",
+        )
+
+    def handle(self, *args, **options):
+        submissions = Submission.objects.all()
+        if options["challenge"]:
+            submissions = submissions.filter(
+                challenge_phase__challenge=options["challenge"]
+            )
+        quota_keys = (
+            submissions.order_by()
+            .values_list("participant_team", "challenge_phase")
+            .distinct()
+        )
+        count = 0
+        for participant_team_pk, challenge_phase_pk in quota_keys:
+            rebuild_submission_quota(participant_team_pk, challenge_phase_pk)
+            count += 1
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Rebuilt {} submission quotas.".format(count)
+            )
+        )
@@ -0,0 +1,36 @@
+from django.core.management import BaseCommand
+
+from challenges.models import ChallengePhase
+from jobs.models import rebuild_submission_rollup
+
+
+class Command(BaseCommand):
+
+    help = "Recomputes the hourly submission rollups from the submissions."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--challenge",
+            type=int,
+            help="Only rebuild the submission rollups of this challenge.",
+        )
+
+    def handle(self, *args, **options):
+        challenge_phases = ChallengePhase.objects.all()
+        if options["challenge"]:
+            challenge_phases = challenge_phases.filter(
+                challenge=options["challenge"]
+            )
+        count = 0
+        for challenge_phase_pk in challenge_phases.values_list(
+            "pk", flat=True
+        ):
+            rebuild_submission_rollup(challenge_phase_pk)
+            count += 1
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Rebuilt the submission rollups of {} challenge phases.".format(
+                    count
+                )
+            )
+        )
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.20 on 2026-10-18 15:02
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('participants', '0012_remove_docker_repository_uri_from_team'),
+        ('challenges', '0060_add_leaderboard_snapshot_model'),
+        ('jobs', '0012_add_baseline_submission'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubmissionQuota',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('modified_at', models.DateTimeField(auto_now=True)),
+                ('submission_number', models.PositiveIntegerField(default=0)),
+                ('excluded_count', models.IntegerField(default=0)),
+                ('daily_count', models.IntegerField(default=0)),
+                ('daily_bucket', models.DateField(blank=True, null=True)),
+                ('monthly_count', models.IntegerField(default=0)),
+                ('monthly_bucket', models.DateField(blank=True, null=True)),
+                ('challenge_phase', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='submission_quotas', to='challenges.ChallengePhase')),
+                ('participant_team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='submission_quotas', to='participants.ParticipantTeam')),
+            ],
+            options={
+                'db_table': 'submission_quota',
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='submissionquota',
+            unique_together=set([('participant_team', 'challenge_phase')]),
+        ),
+    ]
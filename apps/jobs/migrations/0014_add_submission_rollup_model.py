@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.20 on 2026-10-18 16:45
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0060_add_leaderboard_snapshot_model'),
+        ('jobs', '0013_add_submission_quota_model'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubmissionRollup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('status', models.CharField(max_length=30)),
+                ('count', models.IntegerField(default=0)),
+                ('challenge_phase', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='submission_rollups', to='challenges.ChallengePhase')),
+            ],
+            options={
+                'db_table': 'submission_rollup',
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='submissionrollup',
+            unique_together=set([('challenge_phase', 'hour', 'status')]),
+        ),
+        migrations.RunSQL(
+            """
+            INSERT INTO submission_rollup (challenge_phase_id, hour, status, count)
+            SELECT challenge_phase_id, date_trunc('hour', submitted_at), status,
+                COUNT(*)
+            FROM submission
+            GROUP BY 1, 2, 3
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.20 on 2026-10-18 17:50
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0015_add_submission_phase_submitted_at_index'),
+    ]
+
+    operations = [
+        migrations.AlterIndexTogether(
+            name='submission',
+            index_together=set([('challenge_phase', 'submitted_at'), ('challenge_phase', 'status'), ('participant_team', 'challenge_phase', 'status'), ('participant_team', 'challenge_phase', 'submitted_at')]),
+        ),
+    ]
@@ -3,17 +3,22 @@ from __future__ import unicode_literals
 import logging
 
 from django.contrib.auth.models import User
-from django.db import models
-from django.db.models import Max
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import Case, Count, F, Max, Q, When
 from rest_framework.exceptions import PermissionDenied
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 
 
 from base.models import TimeStampedModel
 from base.utils import RandomFileName
-from challenges.models import ChallengePhase
+from challenges.models import (
+    Challenge,
+    ChallengePhase,
+    ChallengePhaseSplit,
+    LeaderboardData,
+)
 from jobs.constants import submission_status_to_exclude
 from participants.models import ParticipantTeam
 
@@ -41,6 +46,12 @@ def save_file(sender, instance, created, **kwargs):
 
 class Submission(TimeStampedModel):
 
+    def __init__(self, *args, **kwargs):
+        super(Submission, self).__init__(*args, **kwargs)
+        self._original_leaderboard_fields = self.get_leaderboard_fields()
+        self._original_status = self.__dict__.get("status")
+        self._original_method_name = self.__dict__.get("method_name")
+
     SUBMITTED = "submitted"
     RUNNING = "running"
     FAILED = "failed"
@@ -114,6 +125,23 @@ class Submission(TimeStampedModel):
     class Meta:
         app_label = "jobs"
         db_table = "submission"
+        index_together = (
+            ("challenge_phase", "submitted_at"),
+            ("challenge_phase", "status"),
+            ("participant_team", "challenge_phase", "status"),
+            ("participant_team", "challenge_phase", "submitted_at"),
+        )
+
+    # Fields deciding whether the submission is shown on the leaderboard
+    LEADERBOARD_FIELDS = ("status", "is_public", "is_flagged", "is_baseline")
+
+    def get_leaderboard_fields(self):
+        """Returns the values of the fields in `LEADERBOARD_FIELDS`"""
+        # Deferred fields are not read to avoid a query per instance
+        return {
+            field: self.__dict__.get(field)
+            for field in self.LEADERBOARD_FIELDS
+        }
 
     @property
     def execution_time(self):
@@ -129,113 +157,496 @@ class Submission(TimeStampedModel):
     def save(self, *args, **kwargs):
 
         if not self.pk:
-            sub_num = Submission.objects.filter(
-                challenge_phase=self.challenge_phase,
-                participant_team=self.participant_team,
-            ).aggregate(Max("submission_number"))["submission_number__max"]
-            if sub_num:
-                self.submission_number = sub_num + 1
-            else:
-                self.submission_number = 1
-
-            submissions = Submission.objects.filter(
-                challenge_phase=self.challenge_phase,
-                participant_team=self.participant_team,
-            )
-
-            num_submissions_to_ignore = submissions.filter(
-                status__in=submission_status_to_exclude
-            ).count()
-
-            successful_count = (
-                self.submission_number - num_submissions_to_ignore
-            )
-
-            if successful_count > self.challenge_phase.max_submissions:
-                logger.info(
-                    "Checking to see if the successful_count {0} is greater than maximum allowed {1}".format(
-                        successful_count, self.challenge_phase.max_submissions
-                    )
+            with transaction.atomic():
+                submission_instance = self.save_new_submission(*args, **kwargs)
+        else:
+            previous_status = self._original_status
+            submission_instance = super(Submission, self).save(*args, **kwargs)
+            status = self.__dict__.get("status")
+            if previous_status is not None and status is not None:
+                update_submission_quota_on_status_change(
+                    self, previous_status, status
                 )
-
-                logger.info(
-                    "The submission request is submitted by user {0} from participant_team {1} ".format(
-                        self.created_by.pk, self.participant_team.pk
-                    )
+                update_submission_rollup_on_status_change(
+                    self, previous_status, status
                 )
+        self._original_status = self.__dict__.get("status")
+        return submission_instance
 
-                raise PermissionDenied(
-                    {
-                        "error": "The maximum number of submissions has been reached"
-                    }
-                )
-            else:
-                logger.info(
-                    "Submission is below for user {0} form participant_team {1} for challenge_phase {2}".format(
-                        self.created_by.pk,
-                        self.participant_team.pk,
-                        self.challenge_phase.pk,
-                    )
+    def save_new_submission(self, *args, **kwargs):
+        # The quota row of the team is locked so that concurrent submissions
+        # are numbered and counted one after the other
+        quota = get_locked_submission_quota(
+            self.participant_team_id, self.challenge_phase_id
+        )
+        quota.roll_buckets(timezone.now())
+
+        self.submission_number = quota.submission_number + 1
+        successful_count = self.submission_number - quota.excluded_count
+
+        if successful_count > self.challenge_phase.max_submissions:
+            logger.info(
+                "Checking to see if the successful_count {0} is greater than maximum allowed {1}".format(
+                    successful_count, self.challenge_phase.max_submissions
                 )
-
-            total_submissions_done = Submission.objects.filter(
-                challenge_phase__challenge=self.challenge_phase.challenge,
-                participant_team=self.participant_team,
-                challenge_phase=self.challenge_phase,
             )
 
-            submissions_done_today_count = (
-                total_submissions_done.filter(
-                    submitted_at__gte=timezone.now().replace(
-                        hour=0, minute=0, second=0, microsecond=0
-                    )
+            logger.info(
+                "The submission request is submitted by user {0} from participant_team {1} ".format(
+                    self.created_by.pk, self.participant_team.pk
                 )
-                .exclude(status__in=submission_status_to_exclude)
-                .count()
             )
 
-            submissions_done_in_month_count = (
-                total_submissions_done.filter(
-                    submitted_at__gte=timezone.now().replace(
-                        day=1, hour=0, minute=0, second=0, microsecond=0
-                    )
-                )
-                .exclude(status__in=submission_status_to_exclude)
-                .count()
+            raise PermissionDenied(
+                {"error": "The maximum number of submissions has been reached"}
             )
-
-            if (
-                self.challenge_phase.max_submissions_per_month
-                - submissions_done_in_month_count
-                == 0
-            ):
-                logger.info(
-                    "Permission Denied: The maximum number of submission for this month has been reached"
-                )
-                raise PermissionDenied(
-                    {
-                        "error": "The maximum number of submission for this month has been reached"
-                    }
-                )
-            if (
-                self.challenge_phase.max_submissions_per_day
-                - submissions_done_today_count
-                == 0
-            ):
-                logger.info(
-                    "Permission Denied: The maximum number of submission for today has been reached"
-                )
-                raise PermissionDenied(
-                    {
-                        "error": "The maximum number of submission for today has been reached"
-                    }
+        else:
+            logger.info(
+                "Submission is below for user {0} form participant_team {1} for challenge_phase {2}".format(
+                    self.created_by.pk,
+                    self.participant_team.pk,
+                    self.challenge_phase.pk,
                 )
+            )
 
-            self.is_public = (
-                True if self.challenge_phase.is_submission_public else False
+        if (
+            self.challenge_phase.max_submissions_per_month
+            - quota.monthly_count
+            == 0
+        ):
+            logger.info(
+                "Permission Denied: The maximum number of submission for this month has been reached"
+            )
+            raise PermissionDenied(
+                {
+                    "error": "The maximum number of submission for this month has been reached"
+                }
+            )
+        if (
+            self.challenge_phase.max_submissions_per_day - quota.daily_count
+            == 0
+        ):
+            logger.info(
+                "Permission Denied: The maximum number of submission for today has been reached"
             )
+            raise PermissionDenied(
+                {
+                    "error": "The maximum number of submission for today has been reached"
+                }
+            )
+
+        self.is_public = (
+            True if self.challenge_phase.is_submission_public else False
+        )
+
+        self.status = Submission.SUBMITTED
+        # The submission is already counted when it is saved again on create
+        self._original_status = self.status
 
-            self.status = Submission.SUBMITTED
+        quota.submission_number = self.submission_number
+        quota.daily_count += 1
+        quota.monthly_count += 1
+        quota.save()
 
         submission_instance = super(Submission, self).save(*args, **kwargs)
+        increment_submission_rollup(
+            self.challenge_phase_id, self.submitted_at, self.status
+        )
         return submission_instance
+
+
+class SubmissionQuota(TimeStampedModel):
+    """
+    Submission counters of a participant team for a challenge phase. They
+    are used to enforce the submission limits without counting submissions.
+    """
+
+    participant_team = models.ForeignKey(
+        ParticipantTeam, related_name="submission_quotas"
+    )
+    challenge_phase = models.ForeignKey(
+        ChallengePhase, related_name="submission_quotas"
+    )
+    # Number of the last submission of the team
+    submission_number = models.PositiveIntegerField(default=0)
+    # Number of failed and cancelled submissions
+    excluded_count = models.IntegerField(default=0)
+    # Number of the submissions which are not excluded made on `daily_bucket`
+    daily_count = models.IntegerField(default=0)
+    daily_bucket = models.DateField(null=True, blank=True)
+    # Number of the submissions which are not excluded made since `monthly_bucket`
+    monthly_count = models.IntegerField(default=0)
+    monthly_bucket = models.DateField(null=True, blank=True)
+
+    def __str__(self):
+        return "{0} : {1}".format(self.participant_team, self.challenge_phase)
+
+    class Meta:
+        app_label = "jobs"
+        db_table = "submission_quota"
+        unique_together = ("participant_team", "challenge_phase")
+
+    def roll_buckets(self, now):
+        """Resets the daily and monthly counters when a new period starts"""
+        today = now.date()
+        if self.daily_bucket != today:
+            self.daily_count = 0
+            self.daily_bucket = today
+        if self.monthly_bucket != today.replace(day=1):
+            self.monthly_count = 0
+            self.monthly_bucket = today.replace(day=1)
+
+
+def get_submission_quota_counts(participant_team_pk, challenge_phase_pk):
+    """
+    Counts the submissions of a participant team for a challenge phase and
+    returns the values of the fields of its `SubmissionQuota`
+    """
+    now = timezone.now()
+    day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    month_start = day_start.replace(day=1)
+    is_counted = ~Q(status__in=submission_status_to_exclude)
+    counts = Submission.objects.filter(
+        participant_team=participant_team_pk,
+        challenge_phase=challenge_phase_pk,
+    ).aggregate(
+        submission_number=Max("submission_number"),
+        excluded_count=Count(
+            Case(When(status__in=submission_status_to_exclude, then=1))
+        ),
+        daily_count=Count(
+            Case(When(is_counted & Q(submitted_at__gte=day_start), then=1))
+        ),
+        monthly_count=Count(
+            Case(When(is_counted & Q(submitted_at__gte=month_start), then=1))
+        ),
+    )
+    counts["submission_number"] = counts["submission_number"] or 0
+    counts["daily_bucket"] = day_start.date()
+    counts["monthly_bucket"] = month_start.date()
+    return counts
+
+
+def get_locked_submission_quota(participant_team_pk, challenge_phase_pk):
+    """
+    Returns the `SubmissionQuota` of a participant team for a challenge
+    phase locked until the end of the transaction. It is created from the
+    existing submissions when missing.
+    """
+    quotas = SubmissionQuota.objects.select_for_update()
+    lookup = {
+        "participant_team_id": participant_team_pk,
+        "challenge_phase_id": challenge_phase_pk,
+    }
+    try:
+        return quotas.get(**lookup)
+    except SubmissionQuota.DoesNotExist:
+        pass
+
+    # The submissions are only counted for the first submission since the
+    # quotas were introduced
+    counts = get_submission_quota_counts(
+        participant_team_pk, challenge_phase_pk
+    )
+    try:
+        with transaction.atomic():
+            return SubmissionQuota.objects.create(**dict(lookup, **counts))
+    except IntegrityError:
+        # A concurrent submission created the quota first
+        return quotas.get(**lookup)
+
+
+def rebuild_submission_quota(participant_team_pk, challenge_phase_pk):
+    """Recomputes the `SubmissionQuota` of a team from its submissions"""
+    SubmissionQuota.objects.update_or_create(
+        participant_team_id=participant_team_pk,
+        challenge_phase_id=challenge_phase_pk,
+        defaults=get_submission_quota_counts(
+            participant_team_pk, challenge_phase_pk
+        ),
+    )
+
+
+def update_submission_quota_on_status_change(
+    submission, previous_status, status
+):
+    """
+    Updates the counters of a `SubmissionQuota` atomically when a
+    submission becomes failed or cancelled, or is re-run
+    """
+    was_counted = previous_status not in submission_status_to_exclude
+    is_counted = status not in submission_status_to_exclude
+    if was_counted == is_counted:
+        return
+    delta = 1 if is_counted else -1
+    submitted_on = submission.submitted_at.date()
+    SubmissionQuota.objects.filter(
+        participant_team=submission.participant_team_id,
+        challenge_phase=submission.challenge_phase_id,
+    ).update(
+        excluded_count=F("excluded_count") - delta,
+        daily_count=Case(
+            When(daily_bucket=submitted_on, then=F("daily_count") + delta),
+            default=F("daily_count"),
+        ),
+        monthly_count=Case(
+            When(
+                monthly_bucket=submitted_on.replace(day=1),
+                then=F("monthly_count") + delta,
+            ),
+            default=F("monthly_count"),
+        ),
+    )
+
+
+class SubmissionRollup(models.Model):
+    """
+    Number of the submissions of a challenge phase with a status, per hour
+    of submission. It is maintained as submissions are created, change
+    status or are deleted, so that the analytics do not scan submissions.
+    """
+
+    challenge_phase = models.ForeignKey(
+        ChallengePhase, related_name="submission_rollups"
+    )
+    hour = models.DateTimeField()
+    status = models.CharField(max_length=30)
+    count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return "{0} : {1} : {2}".format(
+            self.challenge_phase, self.hour, self.status
+        )
+
+    class Meta:
+        app_label = "jobs"
+        db_table = "submission_rollup"
+        unique_together = ("challenge_phase", "hour", "status")
+
+
+INCREMENT_SUBMISSION_ROLLUP_QUERY = """
+    INSERT INTO submission_rollup (challenge_phase_id, hour, status, count)
+    VALUES (%s, %s, %s, 1)
+    ON CONFLICT (challenge_phase_id, hour, status)
+    DO UPDATE SET count = submission_rollup.count + 1
+"""
+
+REBUILD_SUBMISSION_ROLLUP_QUERY = """
+    INSERT INTO submission_rollup (challenge_phase_id, hour, status, count)
+    SELECT challenge_phase_id, date_trunc('hour', submitted_at), status,
+        COUNT(*)
+    FROM submission
+    WHERE challenge_phase_id = %s
+    GROUP BY 1, 2, 3
+"""
+
+
+def get_submission_rollup_hour(submitted_at):
+    return submitted_at.replace(minute=0, second=0, microsecond=0)
+
+
+def increment_submission_rollup(challenge_phase_pk, submitted_at, status):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            INCREMENT_SUBMISSION_ROLLUP_QUERY,
+            [
+                challenge_phase_pk,
+                get_submission_rollup_hour(submitted_at),
+                status,
+            ],
+        )
+
+
+def decrement_submission_rollup(challenge_phase_pk, submitted_at, status):
+    # The row is not created here as its phase may be being deleted
+    SubmissionRollup.objects.filter(
+        challenge_phase=challenge_phase_pk,
+        hour=get_submission_rollup_hour(submitted_at),
+        status=status,
+    ).update(count=F("count") - 1)
+
+
+def update_submission_rollup_on_status_change(
+    submission, previous_status, status
+):
+    if previous_status == status:
+        return
+    decrement_submission_rollup(
+        submission.challenge_phase_id, submission.submitted_at, previous_status
+    )
+    increment_submission_rollup(
+        submission.challenge_phase_id, submission.submitted_at, status
+    )
+
+
+def rebuild_submission_rollup(challenge_phase_pk):
+    """Recomputes the `SubmissionRollup` rows of a phase from its submissions"""
+    with transaction.atomic():
+        SubmissionRollup.objects.filter(
+            challenge_phase=challenge_phase_pk
+        ).delete()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                REBUILD_SUBMISSION_ROLLUP_QUERY, [challenge_phase_pk]
+            )
+
+
+@receiver(post_save, sender="jobs.Submission")
+def update_leaderboard_on_submission_change(sender, instance, created, **kwargs):
+    """
+    Updates the materialized leaderboards when the status, visibility,
+    baseline or flagged state of a submission changes
+    """
+    from .utils import update_leaderboard_ranks_for_submission
+
+    leaderboard_fields = instance.get_leaderboard_fields()
+    has_changed = leaderboard_fields != instance._original_leaderboard_fields
+    instance._original_leaderboard_fields = leaderboard_fields
+    if not created and has_changed:
+        update_leaderboard_ranks_for_submission(instance)
+
+
+@receiver(post_save, sender="jobs.Submission")
+def invalidate_leaderboard_on_method_name_change(
+    sender, instance, created, **kwargs
+):
+    """The cached leaderboards show the method name of the submissions"""
+    from challenges.utils import invalidate_leaderboard_cached_responses
+
+    method_name = instance.__dict__.get("method_name")
+    has_changed = method_name != instance._original_method_name
+    instance._original_method_name = method_name
+    if not created and has_changed:
+        invalidate_leaderboard_cached_responses(
+            LeaderboardData.objects.filter(submission=instance)
+            .values_list("challenge_phase_split", flat=True)
+            .distinct()
+        )
+
+
+@receiver(post_save, sender="challenges.LeaderboardData")
+@receiver(post_delete, sender="challenges.LeaderboardData")
+def update_leaderboard_on_leaderboard_data_change(sender, instance, **kwargs):
+    from .utils import update_leaderboard_rank_for_team
+
+    participant_team_pk = (
+        Submission.objects.filter(pk=instance.submission_id)
+        .values_list("participant_team", flat=True)
+        .first()
+    )
+    if participant_team_pk is not None:
+        update_leaderboard_rank_for_team(
+            instance.challenge_phase_split_id, participant_team_pk
+        )
+
+
+@receiver(post_save, sender="challenges.ChallengePhaseSplit")
+def rebuild_leaderboard_on_challenge_phase_split_change(
+    sender, instance, **kwargs
+):
+    from .utils import rebuild_leaderboard_ranks
+
+    rebuild_leaderboard_ranks(instance.pk)
+
+
+@receiver(post_save, sender="challenges.Leaderboard")
+def rebuild_leaderboard_on_schema_change(sender, instance, created, **kwargs):
+    """The leaderboards are ranked by the `default_order_by` metric"""
+    from .utils import rebuild_leaderboard_ranks
+
+    default_order_by = instance.get_schema_value("default_order_by")
+    has_changed = default_order_by != instance._original_default_order_by
+    instance._original_default_order_by = default_order_by
+    if created or not has_changed:
+        return
+    for challenge_phase_split in ChallengePhaseSplit.objects.filter(
+        leaderboard=instance
+    ):
+        rebuild_leaderboard_ranks(challenge_phase_split.pk)
+
+
+@receiver(post_save, sender="challenges.ChallengePhase")
+def rebuild_leaderboard_on_challenge_phase_change(
+    sender, instance, created, **kwargs
+):
+    """
+    Host team submissions are only hidden on public phases, so the
+    leaderboards are rebuilt when the phase visibility changes
+    """
+    from .utils import rebuild_leaderboard_ranks
+
+    is_public_changed = instance._original_is_public != instance.is_public
+    instance._original_is_public = instance.is_public
+    if created or not is_public_changed:
+        return
+    for challenge_phase_split in ChallengePhaseSplit.objects.filter(
+        challenge_phase=instance
+    ):
+        rebuild_leaderboard_ranks(challenge_phase_split.pk)
+
+
+@receiver(post_save, sender="challenges.Challenge")
+def rebuild_leaderboard_on_banned_email_ids_change(
+    sender, instance, created, **kwargs
+):
+    from challenges.utils import invalidate_banned_participant_teams
+    from .utils import rebuild_leaderboard_ranks
+
+    banned_email_ids_changed = (
+        instance._original_banned_email_ids != instance.banned_email_ids
+    )
+    instance._original_banned_email_ids = instance.banned_email_ids
+    if created or not banned_email_ids_changed:
+        return
+    invalidate_banned_participant_teams(instance.pk)
+    for challenge_phase_split in ChallengePhaseSplit.objects.filter(
+        challenge_phase__challenge=instance
+    ):
+        rebuild_leaderboard_ranks(challenge_phase_split.pk)
+
+
+@receiver(post_save, sender="participants.Participant")
+@receiver(post_delete, sender="participants.Participant")
+def update_leaderboard_on_team_membership_change(sender, instance, **kwargs):
+    """
+    A team is banned from a challenge as soon as one of its members is, so
+    the banned teams and the leaderboards of the challenges which banned
+    the member are refreshed when the member joins or leaves a team
+    """
+    from challenges.utils import invalidate_banned_participant_teams
+    from .utils import update_leaderboard_rank_for_team
+
+    if instance.team_id is None:
+        return
+    challenges = Challenge.objects.filter(
+        banned_email_ids__contains=[instance.user.email]
+    )
+    for challenge in challenges:
+        invalidate_banned_participant_teams(challenge.pk)
+        challenge_phase_split_pks = ChallengePhaseSplit.objects.filter(
+            challenge_phase__challenge=challenge
+        ).values_list("pk", flat=True)
+        for challenge_phase_split_pk in challenge_phase_split_pks:
+            update_leaderboard_rank_for_team(
+                challenge_phase_split_pk, instance.team_id
+            )
+
+
+@receiver(post_delete, sender="jobs.Submission")
+def update_submission_quota_on_submission_delete(sender, instance, **kwargs):
+    # The quota is not created here as its team or phase may be deleted too
+    SubmissionQuota.objects.filter(
+        participant_team=instance.participant_team_id,
+        challenge_phase=instance.challenge_phase_id,
+    ).update(
+        **get_submission_quota_counts(
+            instance.participant_team_id, instance.challenge_phase_id
+        )
+    )
+
+
+@receiver(post_delete, sender="jobs.Submission")
+def update_submission_rollup_on_submission_delete(sender, instance, **kwargs):
+    decrement_submission_rollup(
+        instance.challenge_phase_id, instance.submitted_at, instance.status
+    )
@@ -1,9 +1,11 @@
-from django.contrib.auth.models import User
+from collections import OrderedDict
+
+from django.db.models import Prefetch
 
 from rest_framework import serializers
 
 from challenges.models import ChallengePhase, LeaderboardData
-from participants.models import Participant, ParticipantTeam
+from participants.models import Participant
 
 from .models import Submission
 
@@ -52,6 +54,11 @@ class SubmissionSerializer(serializers.ModelSerializer):
             "is_baseline",
         )
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Loads the participant teams of a page of submissions"""
+        return queryset.select_related("participant_team")
+
     def get_participant_team_name(self, obj):
         return obj.participant_team.team_name
 
@@ -119,6 +126,20 @@ class ChallengeSubmissionManagementSerializer(serializers.ModelSerializer):
             "participant_team_members",
         )
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Loads the teams, members and profiles of a page of submissions"""
+        return queryset.select_related(
+            "participant_team", "challenge_phase", "created_by"
+        ).prefetch_related(
+            Prefetch(
+                "participant_team__participants",
+                queryset=Participant.objects.select_related(
+                    "user__profile"
+                ).order_by("user_id"),
+            )
+        )
+
     def get_participant_team(self, obj):
         return obj.participant_team.team_name
 
@@ -128,56 +149,29 @@ class ChallengeSubmissionManagementSerializer(serializers.ModelSerializer):
     def get_created_by(self, obj):
         return obj.created_by.username
 
+    def get_participant_team_users(self, obj):
+        users = OrderedDict()
+        for participant in obj.participant_team.participants.all():
+            users.setdefault(participant.user_id, participant.user)
+        return list(users.values())
+
     def get_participant_team_members_email_ids(self, obj):
-        try:
-            participant_team = ParticipantTeam.objects.get(
-                team_name=obj.participant_team.team_name
-            )
-        except ParticipantTeam.DoesNotExist:
-            return "Participant team does not exist"
-
-        participant_ids = Participant.objects.filter(
-            team=participant_team
-        ).values_list("user_id", flat=True)
-        return list(
-            User.objects.filter(id__in=participant_ids).values_list(
-                "email", flat=True
-            )
-        )
+        return [user.email for user in self.get_participant_team_users(obj)]
 
     def get_created_at(self, obj):
         return obj.created_at
 
     def get_participant_team_members(self, obj):
-        try:
-            participant_team = ParticipantTeam.objects.get(
-                team_name=obj.participant_team.team_name
-            )
-        except ParticipantTeam.DoesNotExist:
-            return "Participant team does not exist"
-
-        participant_ids = Participant.objects.filter(
-            team=participant_team
-        ).values_list("user_id", flat=True)
-        return list(
-            User.objects.filter(id__in=participant_ids).values(
-                "username", "email"
-            )
-        )
+        return [
+            {"username": user.username, "email": user.email}
+            for user in self.get_participant_team_users(obj)
+        ]
 
     def get_participant_team_members_affiliations(self, obj):
-        try:
-            participant_team = ParticipantTeam.objects.get(
-                team_name=obj.participant_team.team_name
-            )
-        except ParticipantTeam.DoesNotExist:
-            return "Participant team does not exist"
-
-        participant_ids = Participant.objects.filter(
-            team=participant_team
-        ).values_list("user_id", flat=True)
-        users = User.objects.filter(id__in=participant_ids)
-        return [user.profile.affiliation for user in users]
+        return [
+            user.profile.affiliation
+            for user in self.get_participant_team_users(obj)
+        ]
 
 
 class SubmissionCount(object):
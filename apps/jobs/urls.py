@@ -29,6 +29,12 @@ urlpatterns = [
         views.leaderboard,
         name="leaderboard",
     ),
+    url(
+        r"^challenge_phase_split/(?P<challenge_phase_split_id>[0-9]+)/"
+        r"participant_team/(?P<participant_team_pk>[0-9]+)/rank/$",
+        views.get_leaderboard_rank_of_participant_team,
+        name="get_leaderboard_rank_of_participant_team",
+    ),
     url(
         r"^submission/(?P<submission_id>[0-9]+)$",
         views.get_submission_by_pk,
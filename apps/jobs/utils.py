@@ -1,19 +1,219 @@
 import os
+import gzip
+import json
+import logging
 import tempfile
 import urllib.request
 import datetime
 import requests
 
-from base.utils import get_model_object
-from challenges.utils import get_challenge_model, get_challenge_phase_model
+from base.utils import (
+    get_cache_versions,
+    get_model_object,
+    invalidate_cache_version,
+    queryset_in_chunks,
+)
+from challenges.models import (
+    LEADERBOARD_CACHE_VERSION_KEY,
+    ChallengePhaseSplit,
+    LeaderboardData,
+    LeaderboardRank,
+    LeaderboardSnapshot,
+    get_numeric_label_value,
+)
+from challenges.utils import (
+    get_banned_participant_team_pks,
+    get_challenge_model,
+    get_challenge_phase_model,
+)
+from channels import DEFAULT_CHANNEL_LAYER, Group
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.db.models import Case, Count, F, Subquery, When
+from django.db.models.expressions import RawSQL
 from django.utils import timezone
 from participants.utils import get_participant_team_id_of_user_for_a_challenge
 from rest_framework import status
+from rest_framework.utils.encoders import JSONEncoder
 from .constants import submission_status_to_exclude
 from .models import Submission
+from .serializers import ChallengeSubmissionManagementSerializer
 
 get_submission_model = get_model_object(Submission)
 
+logger = logging.getLogger(__name__)
+
+LEADERBOARD_GROUP_NAME = "leaderboard_{}"
+
+# Parsed entries of a leaderboard snapshot sorted on a label, snapshots are
+# never modified so they are cached for a day
+LEADERBOARD_SNAPSHOT_CACHE_KEY = "leaderboard_snapshot_{}_entries_{}"
+LEADERBOARD_SNAPSHOT_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Top entries of a leaderboard as of the last rank update, with the version
+# of the leaderboard they were read at
+LEADERBOARD_TOP_ENTRIES_CACHE_KEY = "challenge_phase_split_{}_top_entries"
+
+# Default and maximum number of entries returned above and below a team
+LEADERBOARD_RANK_NEIGHBORS = 5
+LEADERBOARD_RANK_MAX_NEIGHBORS = 50
+
+# Orders the materialized entries of a split by score, then by error in the
+# opposite direction and finally by the most recent leaderboard data entry,
+# which is the order in which the leaderboard has always been displayed.
+UPDATE_LEADERBOARD_RANKS_QUERY = """
+    UPDATE leaderboard_rank SET rank = ranked.position
+    FROM (
+        SELECT leaderboard_rank.id, ROW_NUMBER() OVER (
+            ORDER BY leaderboard_rank.score {score_order},
+                     leaderboard_rank.score_error {error_order},
+                     leaderboard_data.created_at DESC
+        ) AS position
+        FROM leaderboard_rank
+        INNER JOIN leaderboard_data
+            ON leaderboard_data.id = leaderboard_rank.leaderboard_data_id
+        WHERE leaderboard_rank.challenge_phase_split_id = %s
+    ) AS ranked
+    WHERE leaderboard_rank.id = ranked.id
+        AND leaderboard_rank.rank <> ranked.position
+"""
+
+# Ranks the leaderboard data of a split in the database. The metric is cast
+# once, `DISTINCT ON` keeps the best entry of each participant team and
+# every baseline entry is kept as well. The score expression and the
+# `jsonb_typeof` predicate match the partial expression index on the metric.
+LEADERBOARD_RANKING_QUERY = """
+    WITH entries AS (
+        SELECT leaderboard_data.id AS leaderboard_data_id,
+               leaderboard_data.created_at,
+               submission.participant_team_id,
+               submission.is_baseline,
+               CASE WHEN jsonb_typeof(leaderboard_data.result -> %s) = 'number'
+                    THEN (leaderboard_data.result ->> %s)::double precision
+               END AS score,
+               COALESCE(
+                   CASE WHEN jsonb_typeof(leaderboard_data.error -> %s) = 'number'
+                        THEN (leaderboard_data.error ->> %s)::double precision
+                   END, 0
+               ) AS score_error
+        FROM leaderboard_data
+        INNER JOIN submission
+            ON submission.id = leaderboard_data.submission_id
+        INNER JOIN auth_user
+            ON auth_user.id = submission.created_by_id
+        WHERE leaderboard_data.challenge_phase_split_id = %s
+            AND jsonb_typeof(leaderboard_data.result -> %s) = 'number'
+            AND submission.status = %s
+            AND NOT submission.is_flagged
+            {filters}
+    ),
+    best_entries AS (
+        SELECT DISTINCT ON (participant_team_id) *
+        FROM entries
+        WHERE NOT is_baseline AND score IS NOT NULL
+        ORDER BY participant_team_id, score {score_order},
+                 score_error {error_order}, created_at DESC
+    )
+    SELECT leaderboard_data_id, participant_team_id, is_baseline, score,
+           score_error, ROW_NUMBER() OVER (
+               ORDER BY score {score_order}, score_error {error_order},
+                        created_at DESC
+           ) AS rank
+    FROM (
+        SELECT * FROM best_entries
+        UNION ALL
+        SELECT * FROM entries WHERE is_baseline AND score IS NOT NULL
+    ) AS ranked_entries
+    ORDER BY rank
+"""
+
+INSERT_LEADERBOARD_RANKS_QUERY = """
+    INSERT INTO leaderboard_rank (
+        created_at, modified_at, challenge_phase_split_id,
+        leaderboard_data_id, participant_team_id, is_baseline, score,
+        score_error, rank
+    )
+    SELECT NOW(), NOW(), %s, leaderboard_data_id, participant_team_id,
+           is_baseline, score, score_error, rank
+    FROM ({ranking_query}) AS ranking
+"""
+
+
+def get_leaderboard_order(challenge_phase_split):
+    """
+    Returns the SQL sort directions of the score and of the score error
+    of a challenge phase split leaderboard
+    """
+    if challenge_phase_split.is_leaderboard_order_descending:
+        return "DESC", "ASC"
+    return "ASC", "DESC"
+
+
+def get_submission_counts_of_phases(participant_team_pk, challenge_phase_pks):
+    """
+    Returns the number of successful submissions of a participant team in
+    total, this month and today for each challenge phase, counted with a
+    single query grouped by challenge phase
+
+    Arguments:
+        participant_team_pk {int} -- participant team whose submissions are counted
+        challenge_phase_pks {list} -- challenge phases to count the submissions of
+
+    Returns:
+        dict -- `(total, this month, today)` counts keyed by challenge phase id
+    """
+    today = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    this_month = today.replace(day=1)
+    submission_counts = (
+        Submission.objects.filter(
+            challenge_phase__in=challenge_phase_pks,
+            participant_team=participant_team_pk,
+        )
+        .exclude(status__in=submission_status_to_exclude)
+        .order_by()
+        .values("challenge_phase")
+        .annotate(
+            total_count=Count("id"),
+            this_month_count=Count(
+                Case(When(submitted_at__gte=this_month, then=1))
+            ),
+            today_count=Count(Case(When(submitted_at__gte=today, then=1))),
+        )
+    )
+    counts = {pk: (0, 0, 0) for pk in challenge_phase_pks}
+    for submission_count in submission_counts:
+        counts[submission_count["challenge_phase"]] = (
+            submission_count["total_count"],
+            submission_count["this_month_count"],
+            submission_count["today_count"],
+        )
+    return counts
+
+
+def get_remaining_submissions_for_phases(participant_team_pk, challenge_phases):
+    """
+    Returns the number of remaining submissions that a participant team can
+    do daily, monthly and in total to each of the challenge phases
+
+    Returns:
+        list -- `(challenge_phase, remaining submissions data)` tuples
+    """
+    counts = get_submission_counts_of_phases(
+        participant_team_pk,
+        [challenge_phase.pk for challenge_phase in challenge_phases],
+    )
+    return [
+        (
+            challenge_phase,
+            get_remaining_submission_limits(
+                challenge_phase, *counts[challenge_phase.pk]
+            ),
+        )
+        for challenge_phase in challenge_phases
+    ]
+
 
 def get_remaining_submission_for_a_phase(
     user, challenge_phase_pk, challenge_pk
@@ -35,32 +235,28 @@ def get_remaining_submission_for_a_phase(
         response_data = {"error": "You haven't participated in the challenge"}
         return response_data, status.HTTP_403_FORBIDDEN
 
-    max_submissions_count = challenge_phase.max_submissions
-    max_submissions_per_month_count = challenge_phase.max_submissions_per_month
-    max_submissions_per_day_count = challenge_phase.max_submissions_per_day
-
-    submissions_done = Submission.objects.filter(
-        challenge_phase__challenge=challenge_pk,
-        challenge_phase=challenge_phase_pk,
-        participant_team=participant_team_pk,
-    ).exclude(status__in=submission_status_to_exclude)
-
-    submissions_done_this_month = submissions_done.filter(
-        submitted_at__gte=timezone.now().replace(
-            day=1, hour=0, minute=0, second=0, microsecond=0
-        )
+    counts = get_submission_counts_of_phases(
+        participant_team_pk, [challenge_phase.pk]
     )
-
-    # Get the submissions_done_today by midnight time of the day
-    submissions_done_today = submissions_done.filter(
-        submitted_at__gte=timezone.now().replace(
-            hour=0, minute=0, second=0, microsecond=0
-        )
+    response_data = get_remaining_submission_limits(
+        challenge_phase, *counts[challenge_phase.pk]
     )
+    return response_data, status.HTTP_200_OK
 
-    submissions_done_count = submissions_done.count()
-    submissions_done_this_month_count = submissions_done_this_month.count()
-    submissions_done_today_count = submissions_done_today.count()
+
+def get_remaining_submission_limits(
+    challenge_phase,
+    submissions_done_count,
+    submissions_done_this_month_count,
+    submissions_done_today_count,
+):
+    """
+    Returns the remaining submissions or the exhausted limit message of a
+    challenge phase given the submissions already done
+    """
+    max_submissions_count = challenge_phase.max_submissions
+    max_submissions_per_month_count = challenge_phase.max_submissions_per_month
+    max_submissions_per_day_count = challenge_phase.max_submissions_per_day
 
     # Check for maximum submission limit
     if submissions_done_count >= max_submissions_count:
@@ -68,7 +264,7 @@ def get_remaining_submission_for_a_phase(
             "message": "You have exhausted maximum submission limit!",
             "submission_limit_exceeded": True,
         }
-        return response_data, status.HTTP_200_OK
+        return response_data
 
     # Check for monthy submission limit
     elif submissions_done_this_month_count >= max_submissions_per_month_count:
@@ -91,7 +287,7 @@ def get_remaining_submission_for_a_phase(
                 "message": "You have exhausted this month's submission limit!",
                 "remaining_time": remaining_time,
             }
-        return response_data, status.HTTP_200_OK
+        return response_data
 
     # Checks if #today's successful submission is greater than or equal to max submission per day
     elif submissions_done_today_count >= max_submissions_per_day_count:
@@ -105,7 +301,7 @@ def get_remaining_submission_for_a_phase(
             "message": "You have exhausted today's submission limit!",
             "remaining_time": remaining_time,
         }
-        return response_data, status.HTTP_200_OK
+        return response_data
 
     else:
         # calculate the remaining submissions from total submissions.
@@ -134,7 +330,7 @@ def get_remaining_submission_for_a_phase(
             "remaining_submissions_today_count": remaining_submissions_today_count,
             "remaining_submissions_count": remaining_submission_count,
         }
-        return response_data, status.HTTP_200_OK
+        return response_data
 
 
 def is_url_valid(url):
@@ -168,3 +364,561 @@ def get_file_from_url(url):
     file_obj['name'] = file_name
     file_obj['temp_dir_path'] = BASE_TEMP_DIR
     return file_obj
+
+
+def get_leaderboard_ranking_query(
+    challenge_phase_split, participant_team_pk=None
+):
+    """
+    Returns the SQL query and its parameters ranking the entries shown on
+    the leaderboard of a challenge phase split, i.e. the best entry of each
+    participant team and every baseline entry, or None when the
+    leaderboard schema has no `default_order_by` key
+
+    Arguments:
+        challenge_phase_split {ChallengePhaseSplit} -- split of the leaderboard
+        participant_team_pk {int} -- only rank the entries of this team
+    """
+    default_order_by = challenge_phase_split.leaderboard.get_schema_value(
+        "default_order_by"
+    )
+    if default_order_by is None:
+        return None
+
+    challenge_phase = challenge_phase_split.challenge_phase
+    challenge = challenge_phase.challenge
+
+    params = [
+        default_order_by,
+        default_order_by,
+        "error_{0}".format(default_order_by),
+        "error_{0}".format(default_order_by),
+        challenge_phase_split.pk,
+        default_order_by,
+        Submission.FINISHED,
+    ]
+    filters = []
+    # Exclude the submissions from challenge host team to be displayed on the leaderboard of public phases
+    if challenge_phase.is_public:
+        filters.append(
+            "AND (submission.is_baseline OR NOT auth_user.email = ANY(%s))"
+        )
+        params.append(challenge.creator.get_all_challenge_host_email())
+    if challenge_phase_split.visibility == ChallengePhaseSplit.PUBLIC:
+        filters.append("AND submission.is_public")
+    banned_participant_team_pks = get_banned_participant_team_pks(challenge)
+    if banned_participant_team_pks:
+        filters.append("AND NOT submission.participant_team_id = ANY(%s)")
+        params.append(list(banned_participant_team_pks))
+    if participant_team_pk is not None:
+        filters.append("AND submission.participant_team_id = %s")
+        params.append(participant_team_pk)
+
+    score_order, error_order = get_leaderboard_order(challenge_phase_split)
+    query = LEADERBOARD_RANKING_QUERY.format(
+        filters="\n            ".join(filters),
+        score_order=score_order,
+        error_order=error_order,
+    )
+    return query, params
+
+
+def insert_leaderboard_ranks(challenge_phase_split, participant_team_pk=None):
+    """
+    Ranks the leaderboard entries of a challenge phase split in the
+    database and stores them in the `LeaderboardRank` table
+    """
+    ranking_query = get_leaderboard_ranking_query(
+        challenge_phase_split, participant_team_pk=participant_team_pk
+    )
+    if ranking_query is None:
+        return
+    query, params = ranking_query
+    with connection.cursor() as cursor:
+        cursor.execute(
+            INSERT_LEADERBOARD_RANKS_QUERY.format(ranking_query=query),
+            [challenge_phase_split.pk] + params,
+        )
+
+
+def update_leaderboard_ranks(challenge_phase_split):
+    """
+    Renumbers the materialized leaderboard entries of a challenge phase
+    split in the database. Only the rows whose rank changed are written.
+    """
+    score_order, error_order = get_leaderboard_order(challenge_phase_split)
+    query = UPDATE_LEADERBOARD_RANKS_QUERY.format(
+        score_order=score_order, error_order=error_order
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(query, [challenge_phase_split.pk])
+    version_key = LEADERBOARD_CACHE_VERSION_KEY.format(challenge_phase_split.pk)
+    transaction.on_commit(lambda: invalidate_cache_version(version_key))
+
+
+def rebuild_leaderboard_ranks(challenge_phase_split_pk):
+    """
+    Recomputes the whole materialized leaderboard of a challenge phase split
+    """
+    with transaction.atomic():
+        try:
+            # Lock the split so that concurrent updates are serialized
+            challenge_phase_split = ChallengePhaseSplit.objects.select_for_update().get(
+                pk=challenge_phase_split_pk
+            )
+        except ChallengePhaseSplit.DoesNotExist:
+            return
+        LeaderboardRank.objects.filter(
+            challenge_phase_split=challenge_phase_split
+        ).delete()
+        delete_leaderboard_snapshot(challenge_phase_split)
+        # The ranks are computed by the ranking query itself
+        insert_leaderboard_ranks(challenge_phase_split)
+        version_key = LEADERBOARD_CACHE_VERSION_KEY.format(
+            challenge_phase_split.pk
+        )
+        transaction.on_commit(lambda: invalidate_cache_version(version_key))
+
+
+def update_leaderboard_rank_for_team(
+    challenge_phase_split_pk, participant_team_pk
+):
+    """
+    Incrementally updates the materialized leaderboard of a challenge phase
+    split after the entries of one participant team have changed
+    """
+    with transaction.atomic():
+        try:
+            challenge_phase_split = ChallengePhaseSplit.objects.select_for_update().get(
+                pk=challenge_phase_split_pk
+            )
+        except ChallengePhaseSplit.DoesNotExist:
+            return
+        previous_top_entries = get_cached_leaderboard_top_entries(
+            challenge_phase_split
+        )
+        LeaderboardRank.objects.filter(
+            challenge_phase_split=challenge_phase_split,
+            participant_team=participant_team_pk,
+        ).delete()
+        delete_leaderboard_snapshot(challenge_phase_split)
+        insert_leaderboard_ranks(
+            challenge_phase_split, participant_team_pk=participant_team_pk
+        )
+        update_leaderboard_ranks(challenge_phase_split)
+        top_entries = get_leaderboard_top_entries(challenge_phase_split)
+        delta = get_leaderboard_rank_delta(
+            challenge_phase_split, previous_top_entries, top_entries
+        )
+        if top_entries:
+            # Runs after the leaderboard version is bumped by the rank update
+            transaction.on_commit(
+                lambda: cache_leaderboard_top_entries(
+                    challenge_phase_split.pk, top_entries
+                )
+            )
+        if delta is not None:
+            transaction.on_commit(
+                lambda: send_leaderboard_rank_delta(
+                    challenge_phase_split.pk, delta
+                )
+            )
+
+
+def update_leaderboard_ranks_for_submission(submission):
+    """
+    Updates the materialized leaderboards of all the challenge phase splits
+    having results for a submission
+    """
+    challenge_phase_split_pks = (
+        LeaderboardData.objects.filter(submission=submission)
+        .values_list("challenge_phase_split", flat=True)
+        .distinct()
+    )
+    for challenge_phase_split_pk in challenge_phase_split_pks:
+        update_leaderboard_rank_for_team(
+            challenge_phase_split_pk, submission.participant_team_id
+        )
+
+
+def get_leaderboard_top_entries(challenge_phase_split):
+    """
+    Returns the top `LEADERBOARD_PUSH_TOP_N` materialized entries of a
+    public challenge phase split leaderboard keyed by leaderboard data id.
+    Nothing is pushed for the leaderboards which are not public, or when no
+    channel layer is configured.
+    """
+    if (
+        DEFAULT_CHANNEL_LAYER not in settings.CHANNEL_LAYERS
+        or challenge_phase_split.visibility != ChallengePhaseSplit.PUBLIC
+    ):
+        return {}
+    entries = (
+        LeaderboardRank.objects.filter(
+            challenge_phase_split=challenge_phase_split,
+            rank__lte=settings.LEADERBOARD_PUSH_TOP_N,
+        )
+        .order_by("rank")
+        .values(
+            "leaderboard_data",
+            "participant_team",
+            "participant_team__team_name",
+            "is_baseline",
+            "score",
+            "rank",
+        )
+    )
+    return {entry["leaderboard_data"]: entry for entry in entries}
+
+
+def get_cached_leaderboard_top_entries(challenge_phase_split):
+    """
+    Returns the top entries of a leaderboard cached by the last rank update,
+    or reads them when the leaderboard changed since then
+    """
+    version_key = LEADERBOARD_CACHE_VERSION_KEY.format(challenge_phase_split.pk)
+    cached = cache.get(
+        LEADERBOARD_TOP_ENTRIES_CACHE_KEY.format(challenge_phase_split.pk)
+    )
+    if cached is not None and cached[0] == cache.get(version_key):
+        return cached[1]
+    return get_leaderboard_top_entries(challenge_phase_split)
+
+
+def cache_leaderboard_top_entries(challenge_phase_split_pk, top_entries):
+    version_key = LEADERBOARD_CACHE_VERSION_KEY.format(challenge_phase_split_pk)
+    version = get_cache_versions([version_key])[0]
+    cache.set(
+        LEADERBOARD_TOP_ENTRIES_CACHE_KEY.format(challenge_phase_split_pk),
+        (version, top_entries),
+        None,
+    )
+
+
+def get_leaderboard_rank_delta(
+    challenge_phase_split, previous_top_entries, top_entries
+):
+    """
+    Returns the changes of the top of a leaderboard, i.e. the entries which
+    entered it or whose rank changed and the entries displaced out of it, or
+    None when the top of the leaderboard did not change
+
+    Arguments:
+        challenge_phase_split {ChallengePhaseSplit} -- split of the leaderboard
+        previous_top_entries {dict} -- top entries before the update
+        top_entries {dict} -- top entries after the update
+    """
+    entries = []
+    for pk, entry in top_entries.items():
+        previous_entry = previous_top_entries.get(pk)
+        previous_rank = previous_entry["rank"] if previous_entry else None
+        if previous_rank != entry["rank"]:
+            entries.append(
+                get_leaderboard_delta_entry(
+                    entry, entry["rank"], previous_rank
+                )
+            )
+    # The displaced entries are no longer in the top of the leaderboard
+    displaced_entries = [
+        get_leaderboard_delta_entry(entry, None, entry["rank"])
+        for pk, entry in previous_top_entries.items()
+        if pk not in top_entries
+    ]
+    if not entries and not displaced_entries:
+        return None
+    return {
+        "challenge_phase_split": challenge_phase_split.pk,
+        "entries": sorted(entries, key=lambda entry: entry["rank"]),
+        "displaced": sorted(
+            displaced_entries, key=lambda entry: entry["previous_rank"]
+        ),
+    }
+
+
+def get_leaderboard_delta_entry(entry, rank, previous_rank):
+    return {
+        "id": entry["leaderboard_data"],
+        "participant_team": entry["participant_team"],
+        "participant_team_name": entry["participant_team__team_name"],
+        "is_baseline": entry["is_baseline"],
+        "score": entry["score"],
+        "rank": rank,
+        "previous_rank": previous_rank,
+    }
+
+
+def send_leaderboard_rank_delta(challenge_phase_split_pk, delta):
+    """
+    Pushes a leaderboard rank delta to the websocket clients following the
+    leaderboard of a challenge phase split. The push is best-effort, the
+    clients still get the ranks from the API when the layer is unavailable.
+    """
+    try:
+        Group(LEADERBOARD_GROUP_NAME.format(challenge_phase_split_pk)).send(
+            {"text": json.dumps(delta)}, immediately=True
+        )
+    except Exception:
+        logger.exception(
+            "Failed to push the leaderboard rank delta of challenge phase "
+            "split {}".format(challenge_phase_split_pk)
+        )
+
+
+def get_leaderboard_data(challenge_phase_split, order_by=None):
+    """
+    Returns the ranked entries of the leaderboard of a challenge phase split
+
+    Arguments:
+        challenge_phase_split {ChallengePhaseSplit} -- split of the leaderboard
+        order_by {string} -- leaderboard label used to sort the entries
+    """
+    # The entries are ranked when the leaderboard data or the submissions
+    # change (see `update_leaderboard_rank_for_team`)
+    leaderboard_data = LeaderboardData.objects.filter(
+        rank__challenge_phase_split=challenge_phase_split
+    )
+    if order_by is None:
+        leaderboard_data = leaderboard_data.order_by("rank__rank")
+    else:
+        # Any label is sorted on its precomputed value in `result_values`
+        leaderboard_labels = challenge_phase_split.leaderboard.schema["labels"]
+        sort_value = RawSQL(
+            "leaderboard_data.result_values[%s]",
+            (leaderboard_labels.index(order_by) + 1,),
+        )
+        if challenge_phase_split.is_leaderboard_order_descending:
+            sort_value = sort_value.desc(nulls_last=True)
+        else:
+            sort_value = sort_value.asc(nulls_last=True)
+        leaderboard_data = leaderboard_data.order_by(
+            sort_value, "rank__rank"
+        )
+    return leaderboard_data.annotate(
+        filtering_score=F("rank__score"),
+        filtering_error=F("rank__score_error"),
+    ).values(
+        "id",
+        "submission__participant_team",
+        "submission__participant_team__team_name",
+        "submission__participant_team__team_url",
+        "submission__is_baseline",
+        "challenge_phase_split",
+        "result",
+        "error",
+        "filtering_score",
+        "filtering_error",
+        "leaderboard__schema",
+        "submission__submitted_at",
+        "submission__method_name",
+    )
+
+
+def format_leaderboard_entry(item):
+    """
+    Returns a leaderboard entry in the format of the leaderboard API, i.e.
+    with the result and error values as submitted, in the order of the
+    leaderboard labels
+    """
+    schema = item["leaderboard__schema"]
+    labels = schema.get("labels", []) if isinstance(schema, dict) else []
+    result = item["result"] if isinstance(item["result"], dict) else {}
+    item["result"] = [result.get(label) for label in labels]
+    if item["error"] is not None:
+        error = item["error"] if isinstance(item["error"], dict) else {}
+        item["error"] = [
+            error.get("error_{0}".format(label)) for label in labels
+        ]
+    return item
+
+
+def sort_leaderboard_entries(entries, label_index, descending):
+    """
+    Sorts formatted leaderboard entries on the value of a label. Entries
+    without a value come last and ties keep their rank order.
+    """
+    def get_sort_key(entry):
+        value = get_numeric_label_value(entry["result"][label_index])
+        if value is None:
+            return (True, 0)
+        return (False, -value if descending else value)
+
+    return sorted(entries, key=get_sort_key)
+
+
+def create_leaderboard_snapshot(challenge_phase_split):
+    """
+    Stores the ranked leaderboard of a challenge phase split as a gzipped
+    JSON file, which is served by the leaderboard API from then on
+    """
+    entries = [
+        format_leaderboard_entry(item)
+        for item in get_leaderboard_data(challenge_phase_split)
+    ]
+    content = gzip.compress(
+        json.dumps(entries, cls=JSONEncoder).encode("utf-8")
+    )
+    with transaction.atomic():
+        delete_leaderboard_snapshot(challenge_phase_split)
+        snapshot = LeaderboardSnapshot.objects.create(
+            challenge_phase_split=challenge_phase_split,
+            snapshot_file=ContentFile(content, name="leaderboard.json.gz"),
+            entries_count=len(entries),
+        )
+    version_key = LEADERBOARD_CACHE_VERSION_KEY.format(challenge_phase_split.pk)
+    transaction.on_commit(lambda: invalidate_cache_version(version_key))
+    return snapshot
+
+
+def load_leaderboard_snapshot(snapshot):
+    """Returns the leaderboard entries stored in a snapshot"""
+    snapshot_file = snapshot.snapshot_file
+    with snapshot_file.storage.open(snapshot_file.name, "rb") as content:
+        return json.loads(gzip.decompress(content.read()).decode("utf-8"))
+
+
+def get_leaderboard_snapshot_entries(snapshot, order_by=None):
+    """
+    Returns the entries of a leaderboard snapshot, sorted on the label
+    `order_by` if given. The parsed and sorted entries are cached, so the
+    snapshot file is only downloaded and sorted once per label.
+    """
+    cache_key = LEADERBOARD_SNAPSHOT_CACHE_KEY.format(snapshot.pk, order_by)
+    entries = cache.get(cache_key)
+    if entries is not None:
+        return entries
+
+    entries = load_leaderboard_snapshot(snapshot)
+    if order_by is not None:
+        challenge_phase_split = snapshot.challenge_phase_split
+        entries = sort_leaderboard_entries(
+            entries,
+            challenge_phase_split.leaderboard.schema["labels"].index(order_by),
+            challenge_phase_split.is_leaderboard_order_descending,
+        )
+    cache.set(cache_key, entries, LEADERBOARD_SNAPSHOT_CACHE_TIMEOUT)
+    return entries
+
+
+def delete_leaderboard_snapshot(challenge_phase_split):
+    """
+    Deletes the snapshot of a leaderboard, e.g. once its ranks have changed.
+    The file is removed from the storage after the transaction is committed.
+    """
+    snapshot = LeaderboardSnapshot.objects.filter(
+        challenge_phase_split=challenge_phase_split
+    ).first()
+    if snapshot is None:
+        return
+    snapshot.delete()
+    snapshot_file = snapshot.snapshot_file
+    transaction.on_commit(lambda: snapshot_file.delete(save=False))
+
+
+def get_leaderboard_rank_of_team(
+    challenge_phase_split, participant_team_pk, neighbors
+):
+    """
+    Returns the best entry of a participant team on the leaderboard of a
+    challenge phase split with its rank and the `neighbors` entries ranked
+    right above and below it, or None if the team is not on the leaderboard
+
+    Arguments:
+        challenge_phase_split {ChallengePhaseSplit} -- split of the leaderboard
+        participant_team_pk {int} -- participant team whose rank is returned
+        neighbors {int} -- number of entries returned above and below
+    """
+    team_rank = (
+        LeaderboardRank.objects.filter(
+            challenge_phase_split=challenge_phase_split,
+            participant_team=participant_team_pk,
+            is_baseline=False,
+        )
+        .order_by("rank")
+        .values("rank")[:1]
+    )
+    # The rank of the team and its neighborhood are read in one statement,
+    # i.e. from the same snapshot of a leaderboard which may be renumbered
+    # concurrently, using the (split, rank) index
+    entries = []
+    rank = None
+    for item in (
+        get_leaderboard_data(challenge_phase_split)
+        .annotate(
+            leaderboard_rank=F("rank__rank"), team_rank=Subquery(team_rank)
+        )
+        .filter(
+            leaderboard_rank__gte=F("team_rank") - neighbors,
+            leaderboard_rank__lte=F("team_rank") + neighbors,
+        )
+    ):
+        item["rank"] = item.pop("leaderboard_rank")
+        rank = item.pop("team_rank")
+        entries.append(format_leaderboard_entry(item))
+    entry = next(
+        (
+            entry
+            for entry in entries
+            if entry["rank"] == rank
+            and entry["submission__participant_team"]
+            == int(participant_team_pk)
+        ),
+        None,
+    )
+    if entry is None:
+        return None
+    return {
+        "rank": rank,
+        "count": LeaderboardRank.objects.filter(
+            challenge_phase_split=challenge_phase_split
+        ).count(),
+        "entry": entry,
+        "above": [entry for entry in entries if entry["rank"] < rank],
+        "below": [entry for entry in entries if entry["rank"] > rank],
+    }
+
+
+def get_columnar_leaderboard_entries(entries, schema):
+    """
+    Returns formatted leaderboard entries in a columnar layout, i.e. the
+    leaderboard schema once followed by one array per field
+    """
+    return {
+        "schema": schema,
+        "id": [entry["id"] for entry in entries],
+        "participant_team": [
+            entry["submission__participant_team"] for entry in entries
+        ],
+        "participant_team_name": [
+            entry["submission__participant_team__team_name"]
+            for entry in entries
+        ],
+        "participant_team_url": [
+            entry["submission__participant_team__team_url"]
+            for entry in entries
+        ],
+        "is_baseline": [entry["submission__is_baseline"] for entry in entries],
+        "result": [entry["result"] for entry in entries],
+        "error": [entry["error"] for entry in entries],
+        "filtering_score": [entry["filtering_score"] for entry in entries],
+        "filtering_error": [entry["filtering_error"] for entry in entries],
+        "submitted_at": [
+            entry["submission__submitted_at"] for entry in entries
+        ],
+        "method_name": [entry["submission__method_name"] for entry in entries],
+    }
+
+
+def serialize_submissions_in_chunks(submissions, request=None):
+    """
+    Yields the serialized submissions of a queryset chunk by chunk, so that
+    exports never hold all the submissions of a challenge in memory
+    """
+    submissions = ChallengeSubmissionManagementSerializer.setup_eager_loading(
+        submissions
+    )
+    for chunk in queryset_in_chunks(submissions):
+        serializer = ChallengeSubmissionManagementSerializer(
+            chunk, many=True, context={"request": request}
+        )
+        for submission in serializer.data:
+            yield submission
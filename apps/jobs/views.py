@@ -8,25 +8,27 @@ from rest_framework.decorators import (
     api_view,
     authentication_classes,
     permission_classes,
+    renderer_classes,
     throttle_classes,
 )
 
 from django.core.files.base import ContentFile
 from django.db import transaction, IntegrityError
-from django.db.models.expressions import RawSQL
-from django.db.models import FloatField, Q
 from django.utils import timezone
 
 from rest_framework_expiring_authtoken.authentication import (
     ExpiringTokenAuthentication,
 )
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.throttling import UserRateThrottle, AnonRateThrottle
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 
 from accounts.permissions import HasVerifiedEmail
+from base.renderers import MsgPackRenderer
 from base.utils import (
+    cache_response,
     paginated_queryset,
     StandardResultSetPagination,
     get_sqs_queue_object,
@@ -36,12 +38,14 @@ from challenges.models import (
     ChallengePhase,
     Challenge,
     ChallengePhaseSplit,
-    LeaderboardData,
+    LeaderboardSnapshot,
 )
 from challenges.utils import (
+    get_banned_participant_team_pks,
     get_challenge_model,
     get_challenge_phase_model,
     get_aws_credentials_for_challenge,
+    get_leaderboard_cache_keys,
 )
 from hosts.models import ChallengeHost
 from hosts.utils import is_user_a_host_of_challenge
@@ -52,6 +56,7 @@ from participants.utils import (
     get_participant_team_of_user_for_a_challenge,
     is_user_part_of_participant_team,
 )
+from .constants import submission_cursor_ordering
 from .filters import SubmissionFilter
 from .models import Submission
 from .sender import publish_submission_message
@@ -62,9 +67,16 @@ from .serializers import (
 )
 from .tasks import download_file_and_publish_submission_message
 from .utils import (
+    LEADERBOARD_RANK_MAX_NEIGHBORS,
+    LEADERBOARD_RANK_NEIGHBORS,
+    format_leaderboard_entry,
+    get_columnar_leaderboard_entries,
+    get_leaderboard_data,
+    get_leaderboard_rank_of_team,
+    get_leaderboard_snapshot_entries,
     get_submission_model,
-    get_remaining_submission_for_a_phase,
-    is_url_valid
+    get_remaining_submissions_for_phases,
+    is_url_valid,
 )
 
 logger = logging.getLogger(__name__)
@@ -140,9 +152,7 @@ def challenge_submission(request, challenge_id, challenge_phase_id):
         )
 
         # check if participant team exists or not.
-        try:
-            ParticipantTeam.objects.get(pk=participant_team_id)
-        except ParticipantTeam.DoesNotExist:
+        if participant_team_id is None:
             response_data = {
                 "error": "You haven't participated in the challenge"
             }
@@ -153,7 +163,11 @@ def challenge_submission(request, challenge_id, challenge_phase_id):
             challenge_phase=challenge_phase,
         ).order_by("-submitted_at")
         filtered_submissions = SubmissionFilter(request.GET, queryset=submission)
-        paginator, result_page = paginated_queryset(filtered_submissions.qs, request)
+        paginator, result_page = paginated_queryset(
+            SubmissionSerializer.setup_eager_loading(filtered_submissions.qs),
+            request,
+            cursor_ordering=submission_cursor_ordering,
+        )
         serializer = SubmissionSerializer(
             result_page, many=True, context={"request": request}
         )
@@ -212,15 +226,13 @@ def challenge_submission(request, challenge_id, challenge_phase_id):
             }
             return Response(response_data, status=status.HTTP_403_FORBIDDEN)
 
-        all_participants_email = participant_team.get_all_participants_email()
-        for participant_email in all_participants_email:
-            if participant_email in challenge.banned_email_ids:
-                message = "You're a part of {} team and it has been banned from this challenge. \
-                Please contact the challenge host.".format(participant_team.team_name)
-                response_data = {
-                    "error": message
-                }
-                return Response(response_data, status=status.HTTP_403_FORBIDDEN)
+        if participant_team.pk in get_banned_participant_team_pks(challenge):
+            message = "You're a part of {} team and it has been banned from this challenge. \
+            Please contact the challenge host.".format(participant_team.team_name)
+            response_data = {
+                "error": message
+            }
+            return Response(response_data, status=status.HTTP_403_FORBIDDEN)
 
         # Fetch the number of submissions under progress.
         submissions_in_progress_status = [
@@ -372,7 +384,21 @@ def change_submission_data_and_visibility(
             type=openapi.TYPE_STRING,
             description="Challenge Phase Split ID",
             required=True,
-        )
+        ),
+        openapi.Parameter(
+            name="order_by",
+            in_=openapi.IN_QUERY,
+            type=openapi.TYPE_STRING,
+            description="Leaderboard label used to sort the entries",
+            required=False,
+        ),
+        openapi.Parameter(
+            name="layout",
+            in_=openapi.IN_QUERY,
+            type=openapi.TYPE_STRING,
+            description="Set to columnar to get the entries as parallel arrays",
+            required=False,
+        ),
     ],
     operation_id="Get_Leaderboard_Data",
     responses={
@@ -433,6 +459,8 @@ def change_submission_data_and_visibility(
 )
 @api_view(["GET"])
 @throttle_classes([AnonRateThrottle])
+@renderer_classes((JSONRenderer, MsgPackRenderer))
+@cache_response(get_leaderboard_cache_keys)
 def leaderboard(request, challenge_phase_split_id):
     """Returns leaderboard for a corresponding Challenge Phase Split"""
 
@@ -448,33 +476,18 @@ def leaderboard(request, challenge_phase_split_id):
     # Get the leaderboard associated with the Challenge Phase Split
     leaderboard = challenge_phase_split.leaderboard
 
-    # Get the default order by key to rank the entries on the leaderboard
-    try:
-        default_order_by = leaderboard.schema["default_order_by"]
-    except KeyError:
+    # Check the default order by key used to rank the entries on the leaderboard
+    if "default_order_by" not in leaderboard.schema:
         response_data = {
             "error": "Sorry, Default filtering key not found in leaderboard schema!"
         }
         return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
 
-    # Exclude the submissions done by members of the host team
-    # while populating leaderboard
     challenge_obj = challenge_phase_split.challenge_phase.challenge
-    challenge_hosts_emails = (
-        challenge_obj.creator.get_all_challenge_host_email()
-    )
-    is_challenge_phase_public = challenge_phase_split.challenge_phase.is_public
-    # Exclude the submissions from challenge host team to be displayed on the leaderboard of public phases
-    challenge_hosts_emails = (
-        [] if not is_challenge_phase_public else challenge_hosts_emails
-    )
-
     challenge_host_user = is_user_a_host_of_challenge(
         request.user, challenge_obj.pk
     )
 
-    all_banned_email_ids = challenge_obj.banned_email_ids
-
     # Check if challenge phase leaderboard is public for participant user or not
     if (
         challenge_phase_split.visibility != ChallengePhaseSplit.PUBLIC
@@ -483,99 +496,158 @@ def leaderboard(request, challenge_phase_split_id):
         response_data = {"error": "Sorry, the leaderboard is not public!"}
         return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
 
-    leaderboard_data = LeaderboardData.objects.exclude(
-        Q(submission__created_by__email__in=challenge_hosts_emails)
-        & Q(submission__is_baseline=False)
+    leaderboard_labels = leaderboard.schema["labels"]
+    order_by = request.query_params.get("order_by")
+    if order_by is not None and order_by not in leaderboard_labels:
+        response_data = {
+            "error": "Sorry, {} is not a leaderboard label!".format(order_by)
+        }
+        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+
+    snapshot = (
+        LeaderboardSnapshot.objects.filter(
+            challenge_phase_split=challenge_phase_split
+        )
+        .select_related("challenge_phase_split__leaderboard")
+        .first()
     )
+    if snapshot is not None:
+        # The leaderboard of an ended phase is served from its snapshot
+        leaderboard_data = get_leaderboard_snapshot_entries(
+            snapshot, order_by=order_by
+        )
+    else:
+        leaderboard_data = get_leaderboard_data(
+            challenge_phase_split, order_by=order_by
+        )
 
-    # Get all the successful submissions related to the challenge phase split
-    leaderboard_data = leaderboard_data.filter(
-        challenge_phase_split=challenge_phase_split,
-        submission__is_flagged=False,
-        submission__status=Submission.FINISHED,
-    ).order_by("-created_at")
+    paginator, result_page = paginated_queryset(
+        leaderboard_data,
+        request,
+        pagination_class=StandardResultSetPagination(),
+    )
+    if snapshot is None:
+        result_page = [format_leaderboard_entry(item) for item in result_page]
+
+    response_data = result_page
+    if request.query_params.get("layout") == "columnar":
+        # The schema is sent once and the entries as parallel arrays
+        response_data = get_columnar_leaderboard_entries(
+            result_page, leaderboard.schema
+        )
+    return paginator.get_paginated_response(response_data)
 
-    leaderboard_data = leaderboard_data.annotate(
-        filtering_score=RawSQL(
-            "result->>%s", (default_order_by,), output_field=FloatField()
+
+@swagger_auto_schema(
+    methods=["get"],
+    manual_parameters=[
+        openapi.Parameter(
+            name="challenge_phase_split_id",
+            in_=openapi.IN_PATH,
+            type=openapi.TYPE_STRING,
+            description="Challenge Phase Split ID",
+            required=True,
         ),
-        filtering_error=RawSQL(
-            "error->>%s",
-            ("error_{0}".format(default_order_by),),
-            output_field=FloatField(),
+        openapi.Parameter(
+            name="participant_team_pk",
+            in_=openapi.IN_PATH,
+            type=openapi.TYPE_STRING,
+            description="Participant Team ID",
+            required=True,
         ),
-    ).values(
-        "id",
-        "submission__participant_team",
-        "submission__participant_team__team_name",
-        "submission__participant_team__team_url",
-        "submission__is_baseline",
-        "challenge_phase_split",
-        "result",
-        "error",
-        "filtering_score",
-        "filtering_error",
-        "leaderboard__schema",
-        "submission__submitted_at",
-        "submission__method_name",
-    )
-
-    if challenge_phase_split.visibility == ChallengePhaseSplit.PUBLIC:
-        leaderboard_data = leaderboard_data.filter(submission__is_public=True)
-
-    all_banned_participant_team = []
-    for leaderboard_item in leaderboard_data:
-        participant_team_id = leaderboard_item["submission__participant_team"]
-        participant_team = ParticipantTeam.objects.get(id=participant_team_id)
-        all_participants_email_ids = participant_team.get_all_participants_email()
-        for participant_email in all_participants_email_ids:
-            if participant_email in all_banned_email_ids:
-                all_banned_participant_team.append(participant_team_id)
-                break
-        if leaderboard_item["error"] is None:
-            leaderboard_item.update(filtering_error=0)
-
-    sorted_leaderboard_data = sorted(
-        leaderboard_data,
-        key=lambda k: (
-            float(k["filtering_score"]),
-            float(-k["filtering_error"]),
+        openapi.Parameter(
+            name="neighbors",
+            in_=openapi.IN_QUERY,
+            type=openapi.TYPE_INTEGER,
+            description="Number of entries returned above and below the team",
+            required=False,
         ),
-        reverse=True if challenge_phase_split.is_leaderboard_order_descending else False,
-    )
+    ],
+    operation_id="Get_Leaderboard_Rank_Of_Participant_Team",
+    responses={
+        status.HTTP_200_OK: openapi.Response(
+            description="",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    "rank": openapi.Schema(
+                        type=openapi.TYPE_INTEGER,
+                        description="Rank of the best entry of the team",
+                    ),
+                    "count": openapi.Schema(
+                        type=openapi.TYPE_INTEGER,
+                        description="Count of values on the leaderboard",
+                    ),
+                    "entry": openapi.Schema(
+                        type=openapi.TYPE_OBJECT,
+                        description="Best leaderboard entry of the team",
+                    ),
+                    "above": openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        description="Entries ranked right above the team",
+                        items=openapi.Schema(type=openapi.TYPE_OBJECT),
+                    ),
+                    "below": openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        description="Entries ranked right below the team",
+                        items=openapi.Schema(type=openapi.TYPE_OBJECT),
+                    ),
+                },
+            ),
+        )
+    },
+)
+@api_view(["GET"])
+@throttle_classes([AnonRateThrottle])
+@cache_response(get_leaderboard_cache_keys)
+def get_leaderboard_rank_of_participant_team(
+    request, challenge_phase_split_id, participant_team_pk
+):
+    """
+    Returns the rank of the best entry of a participant team on the
+    leaderboard of a Challenge Phase Split and the entries around it
+    """
+    try:
+        challenge_phase_split = ChallengePhaseSplit.objects.select_related(
+            "leaderboard"
+        ).get(pk=challenge_phase_split_id)
+    except ChallengePhaseSplit.DoesNotExist:
+        response_data = {"error": "Challenge Phase Split does not exist"}
+        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
 
-    distinct_sorted_leaderboard_data = []
-    team_list = []
-    for data in sorted_leaderboard_data:
-        if (
-            data["submission__participant_team__team_name"] in team_list or
-            data['submission__participant_team'] in all_banned_participant_team
-        ):
-            continue
-        elif data["submission__is_baseline"] is True:
-            distinct_sorted_leaderboard_data.append(data)
-        else:
-            distinct_sorted_leaderboard_data.append(data)
-            team_list.append(data["submission__participant_team__team_name"])
+    if "default_order_by" not in challenge_phase_split.leaderboard.schema:
+        response_data = {
+            "error": "Sorry, Default filtering key not found in leaderboard schema!"
+        }
+        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
 
-    leaderboard_labels = challenge_phase_split.leaderboard.schema["labels"]
-    for item in distinct_sorted_leaderboard_data:
-        item["result"] = [
-            item["result"][index] for index in leaderboard_labels
-        ]
-        if item["error"] is not None:
-            item["error"] = [
-                item["error"]["error_{0}".format(index)]
-                for index in leaderboard_labels
-            ]
+    challenge_pk = challenge_phase_split.challenge_phase.challenge_id
+    if (
+        challenge_phase_split.visibility != ChallengePhaseSplit.PUBLIC
+        and not is_user_a_host_of_challenge(request.user, challenge_pk)
+    ):
+        response_data = {"error": "Sorry, the leaderboard is not public!"}
+        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
 
-    paginator, result_page = paginated_queryset(
-        distinct_sorted_leaderboard_data,
-        request,
-        pagination_class=StandardResultSetPagination(),
+    try:
+        neighbors = int(
+            request.query_params.get("neighbors", LEADERBOARD_RANK_NEIGHBORS)
+        )
+    except ValueError:
+        response_data = {"error": "Sorry, neighbors must be an integer!"}
+        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+    neighbors = max(0, min(neighbors, LEADERBOARD_RANK_MAX_NEIGHBORS))
+
+    response_data = get_leaderboard_rank_of_team(
+        challenge_phase_split, participant_team_pk, neighbors
     )
-    response_data = result_page
-    return paginator.get_paginated_response(response_data)
+    if response_data is None:
+        response_data = {
+            "error": "Sorry, the participant team is not on the leaderboard!"
+        }
+        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+    response_data["participant_team"] = int(participant_team_pk)
+    return Response(response_data, status=status.HTTP_200_OK)
 
 
 @api_view(["GET"])
@@ -626,24 +698,25 @@ def get_remaining_submissions(request, challenge_pk):
         challenge_phases = challenge_phases.filter(
             challenge=challenge, is_public=True
         ).order_by("pk")
+
+    # The participant team is resolved once for all the phases
+    participant_team = get_participant_team_of_user_for_a_challenge(
+        request.user, challenge_pk
+    )
+    if participant_team is None:
+        response_data = {"error": "You haven't participated in the challenge"}
+        return Response(response_data, status=status.HTTP_403_FORBIDDEN)
+
     phase_data_list = list()
-    for phase in challenge_phases:
-        remaining_submission_message, response_status = get_remaining_submission_for_a_phase(
-            request.user, phase.id, challenge_pk
-        )
-        if response_status != status.HTTP_200_OK:
-            return Response(
-                remaining_submission_message, status=response_status
-            )
+    for phase, remaining_submission_message in get_remaining_submissions_for_phases(
+        participant_team.pk, list(challenge_phases)
+    ):
         phase_data_list.append(
             RemainingSubmissionDataSerializer(
                 phase, context={"limits": remaining_submission_message}
             ).data
         )
     phases_data["phases"] = phase_data_list
-    participant_team = get_participant_team_of_user_for_a_challenge(
-        request.user, challenge_pk
-    )
     phases_data["participant_team"] = participant_team.team_name
     phases_data["participant_team_id"] = participant_team.id
     return Response(phases_data, status=status.HTTP_200_OK)
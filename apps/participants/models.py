@@ -1,7 +1,9 @@
 from __future__ import unicode_literals
 
 from django.db import models
+from django.db.models.signals import post_delete, post_save
 from django.contrib.auth.models import User
+from django.dispatch import receiver
 
 from base.models import TimeStampedModel
 
@@ -9,6 +11,10 @@ from base.models import TimeStampedModel
 class Participant(TimeStampedModel):
     """Model representing the Participant of the competition. """
 
+    def __init__(self, *args, **kwargs):
+        super(Participant, self).__init__(*args, **kwargs)
+        self._original_team_id = self.__dict__.get("team_id")
+
     UNKNOWN = "Unknown"
     SELF = "Self"
     DENIED = "Denied"
@@ -56,3 +62,43 @@ class ParticipantTeam(TimeStampedModel):
     class Meta:
         app_label = "participants"
         db_table = "participant_team"
+
+
+@receiver(post_save, sender="participants.ParticipantTeam")
+def invalidate_participant_team_leaderboard_cached_responses(
+    sender, instance, created, **kwargs
+):
+    """The cached leaderboards show the name and url of the teams"""
+    from challenges.models import ChallengePhaseSplit
+    from challenges.utils import invalidate_leaderboard_cached_responses
+
+    if created:
+        return
+    invalidate_leaderboard_cached_responses(
+        ChallengePhaseSplit.objects.filter(
+            challenge_phase__challenge__participant_teams=instance
+        ).values_list("pk", flat=True)
+    )
+
+
+@receiver(post_save, sender="participants.Participant")
+@receiver(post_delete, sender="participants.Participant")
+def invalidate_participant_team_on_membership_change(
+    sender, instance, **kwargs
+):
+    from accounts.utils import invalidate_authorization_context
+    from challenges.models import Challenge
+    from .utils import invalidate_participant_team_cache
+
+    # A participant moved to another team leaves the challenges of both
+    team_pks = {instance.team_id, instance._original_team_id} - {None}
+    instance._original_team_id = instance.team_id
+    invalidate_authorization_context([instance.user_id])
+    if not team_pks:
+        return
+    challenge_pks = (
+        Challenge.objects.filter(participant_teams__in=team_pks)
+        .values_list("pk", flat=True)
+        .distinct()
+    )
+    invalidate_participant_team_cache([instance.user_id], challenge_pks)
@@ -165,6 +165,8 @@ class ChallengeParticipantSerializer(serializers.Serializer):
         return obj.team_name
 
     def get_team_members(self, obj):
+        if hasattr(obj, "team_member_usernames"):
+            return obj.team_member_usernames
         try:
             participant_team = ParticipantTeam.objects.get(
                 team_name=obj.team_name
@@ -182,6 +184,8 @@ class ChallengeParticipantSerializer(serializers.Serializer):
         )
 
     def get_team_members_email_ids(self, obj):
+        if hasattr(obj, "team_member_email_ids"):
+            return obj.team_member_email_ids
         try:
             participant_team = ParticipantTeam.objects.get(
                 team_name=obj.team_name
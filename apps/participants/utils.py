@@ -1,10 +1,30 @@
+from accounts.utils import get_authorization_context
 from challenges.models import Challenge
+from django.core.cache import cache
+from django.db.models.expressions import RawSQL
 
-from base.utils import get_model_object
+from base.utils import get_model_object, get_request_memo
 from .models import Participant, ParticipantTeam
 
 get_participant_team_model = get_model_object(ParticipantTeam)
 
+PARTICIPANT_TEAM_CACHE_KEY = "user_{}_challenge_{}_participant_team"
+PARTICIPANT_TEAM_CACHE_TIMEOUT = 5 * 60
+# Cached when the user has no participant team for the challenge
+NO_PARTICIPANT_TEAM = 0
+
+# Array of a field of the members of each participant team, ordered by user
+TEAM_MEMBERS_ARRAY_QUERY = """
+    ARRAY(
+        SELECT auth_user.{field} FROM auth_user
+        WHERE auth_user.id IN (
+            SELECT participant.user_id FROM participant
+            WHERE participant.team_id = participant_team.id
+        )
+        ORDER BY auth_user.id
+    )
+"""
+
 
 def is_user_part_of_participant_team(user, participant_team):
     """Returns boolean if the user belongs to the participant team or not"""
@@ -29,21 +49,53 @@ def get_participant_teams_for_user(user):
 
 def has_user_participated_in_challenge(user, challenge_id):
     """Returns boolean if the user has participated in a particular challenge"""
-    participant_teams = get_participant_teams_for_user(user)
-    return Challenge.objects.filter(
-        pk=challenge_id, participant_teams__in=participant_teams
-    ).exists()
+    if user.is_anonymous() or challenge_id is None:
+        return False
+    context = get_authorization_context(user)
+    return int(challenge_id) in context.participated_challenge_pks
 
 
 def get_participant_team_id_of_user_for_a_challenge(user, challenge_id):
     """Returns the participant team id for a particular user for a particular challenge"""
-    participant_teams = get_participant_teams_for_user(user)
-    for participant_team in participant_teams:
-        if Challenge.objects.filter(
-            pk=challenge_id, participant_teams=participant_team
-        ).exists():
-            return participant_team
-    return
+    if user.is_anonymous():
+        return None
+    cache_key = PARTICIPANT_TEAM_CACHE_KEY.format(user.pk, challenge_id)
+    memo = get_request_memo()
+    if memo is not None and cache_key in memo:
+        return memo[cache_key]
+
+    participant_team_id = cache.get(cache_key)
+    if participant_team_id is None:
+        participant_team_id = (
+            Participant.objects.filter(user=user, team__challenge=challenge_id)
+            .order_by("pk")
+            .values_list("team", flat=True)
+            .first()
+        ) or NO_PARTICIPANT_TEAM
+        cache.set(
+            cache_key, participant_team_id, PARTICIPANT_TEAM_CACHE_TIMEOUT
+        )
+    participant_team_id = participant_team_id or None
+    if memo is not None:
+        memo[cache_key] = participant_team_id
+    return participant_team_id
+
+
+def invalidate_participant_team_cache(user_pks, challenge_pks):
+    """
+    Drops the cached participant teams of users for challenges, e.g. when
+    a team joins a challenge or when the members of a team change
+    """
+    cache_keys = [
+        PARTICIPANT_TEAM_CACHE_KEY.format(user_pk, challenge_pk)
+        for user_pk in user_pks
+        for challenge_pk in challenge_pks
+    ]
+    cache.delete_many(cache_keys)
+    memo = get_request_memo()
+    if memo is not None:
+        for cache_key in cache_keys:
+            memo.pop(cache_key, None)
 
 
 def get_participant_team_of_user_for_a_challenge(user, challenge_id):
@@ -66,3 +118,18 @@ def get_list_of_challenges_participated_by_a_user(user):
     """Returns list of challenges participated by a user"""
     participant_teams = get_participant_teams_for_user(user)
     return get_list_of_challenges_for_participant_team(participant_teams)
+
+
+def get_participant_team_roster(challenge):
+    """
+    Returns the participant teams of a challenge annotated with the
+    usernames and the emails of their members, in a single query
+    """
+    return challenge.participant_teams.annotate(
+        team_member_usernames=RawSQL(
+            TEAM_MEMBERS_ARRAY_QUERY.format(field="username"), ()
+        ),
+        team_member_email_ids=RawSQL(
+            TEAM_MEMBERS_ARRAY_QUERY.format(field="email"), ()
+        ),
+    ).order_by("-team_name")
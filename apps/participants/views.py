@@ -48,7 +48,9 @@ def participant_team_list(request):
         participant_teams = ParticipantTeam.objects.filter(
             id__in=participant_teams_id
         ).order_by("-id")
-        paginator, result_page = paginated_queryset(participant_teams, request)
+        paginator, result_page = paginated_queryset(
+            participant_teams, request, cursor_ordering=("-id",)
+        )
         serializer = ParticipantTeamDetailSerializer(result_page, many=True)
         response_data = serializer.data
         return paginator.get_paginated_response(response_data)
@@ -0,0 +1,14 @@
+"""
+ASGI config for evalai project.
+
+It exposes the channel layer used by the websocket interface servers and
+workers as a module-level variable named ``channel_layer``.
+"""
+
+import os
+
+from channels.asgi import get_channel_layer
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "settings")
+
+channel_layer = get_channel_layer()
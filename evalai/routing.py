@@ -0,0 +1,12 @@
+from channels.routing import route
+
+from jobs.consumers import ws_connect_leaderboard, ws_disconnect_leaderboard
+
+LEADERBOARD_PATH = r"^/ws/leaderboard/(?P<challenge_phase_split_id>[0-9]+)/$"
+
+channel_routing = [
+    route("websocket.connect", ws_connect_leaderboard, path=LEADERBOARD_PATH),
+    route(
+        "websocket.disconnect", ws_disconnect_leaderboard, path=LEADERBOARD_PATH
+    ),
+]
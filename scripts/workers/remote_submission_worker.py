@@ -8,6 +8,7 @@ import importlib
 import json
 import logging
 import os
+import random
 import requests
 import signal
 import shutil
@@ -18,6 +19,7 @@ import traceback
 import zipfile
 
 from os.path import join
+from requests.adapters import HTTPAdapter
 
 # all challenge and submission will be stored in temp directory
 BASE_TEMP_DIR = tempfile.mkdtemp()
@@ -53,6 +55,28 @@ URLS = {
 }
 EVALAI_ERROR_CODES = [400, 401, 406]
 
+# HTTP client settings used by `make_request`
+REQUEST_CONNECT_TIMEOUT = float(os.environ.get("REQUEST_CONNECT_TIMEOUT", 5))
+REQUEST_READ_TIMEOUT = float(os.environ.get("REQUEST_READ_TIMEOUT", 60))
+REQUEST_MAX_RETRIES = int(os.environ.get("REQUEST_MAX_RETRIES", 3))
+REQUEST_RETRY_BACKOFF = float(os.environ.get("REQUEST_RETRY_BACKOFF", 0.5))
+REQUEST_POOL_SIZE = int(os.environ.get("REQUEST_POOL_SIZE", 10))
+# seconds between two logs of the request metrics
+REQUEST_METRICS_LOG_INTERVAL = float(
+    os.environ.get("REQUEST_METRICS_LOG_INTERVAL", 300)
+)
+# 500 is only retried for GET, since the server may have already applied
+# a PUT/PATCH (e.g. created leaderboard entries) before failing
+RETRY_STATUS_CODES = [502, 503, 504]
+IDEMPOTENT_RETRY_STATUS_CODES = [500] + RETRY_STATUS_CODES
+IDEMPOTENT_METHODS = ["GET"]
+
+# shared `requests.Session`, created lazily by `get_session`
+SESSION = None
+
+# map of HTTP method : call count, error count, retry count, total time
+REQUEST_METRICS = {}
+
 # map of challenge id : phase id : phase annotation file name
 # Use: On arrival of submission message, lookup here to fetch phase file name
 # this saves db query just to fetch phase annotation file name
@@ -330,53 +354,148 @@ def get_request_headers():
     return headers
 
 
-def make_request(url, method, data=None):
-    headers = get_request_headers()
-    if method == "GET":
-        try:
-            response = requests.get(url=url, headers=headers)
-            response.raise_for_status()
-        except requests.exceptions.RequestException:
-            logger.info(
-                "The worker is not able to establish connection with EvalAI"
-            )
-            raise
-        return response.json()
+def get_session():
+    """
+        Returns the HTTP session shared by all the calls to EvalAI so that
+        the connections are kept alive and reused across requests.
+    """
+    global SESSION
+    if SESSION is None:
+        SESSION = requests.Session()
+        # retries are handled in `make_request` to add jitter and
+        # distinguish idempotent calls, so the adapter never retries
+        adapter = HTTPAdapter(
+            pool_connections=REQUEST_POOL_SIZE,
+            pool_maxsize=REQUEST_POOL_SIZE,
+            max_retries=0,
+        )
+        SESSION.mount("http://", adapter)
+        SESSION.mount("https://", adapter)
+    return SESSION
 
-    elif method == "PUT":
-        try:
-            response = requests.put(url=url, headers=headers, data=data)
-            response.raise_for_status()
-        except requests.exceptions.RequestException:
-            logger.exception(
-                "The worker is not able to establish connection with EvalAI due to {}"
-                % (response.json())
+
+def get_retry_delay(attempt):
+    """
+        Exponential backoff with full jitter for the given retry attempt
+    """
+    return random.uniform(0, REQUEST_RETRY_BACKOFF * (2 ** attempt))
+
+
+def is_retryable(method, response=None, exception=None):
+    """
+        Checks if a failed call to EvalAI can safely be sent again
+    """
+    if method in IDEMPOTENT_METHODS:
+        if exception is not None:
+            return isinstance(
+                exception,
+                (
+                    requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout,
+                ),
             )
-            raise
-        except requests.exceptions.HTTPError:
-            logger.exception(
-                "The request to URL {} is failed due to {}"
-                % (url, response.json())
+        return response.status_code in IDEMPOTENT_RETRY_STATUS_CODES
+    if exception is not None:
+        # the request never reached the server
+        return isinstance(exception, requests.exceptions.ConnectTimeout)
+    return response.status_code in RETRY_STATUS_CODES
+
+
+def record_request_metrics(method, elapsed, retries, failed):
+    metrics = REQUEST_METRICS.setdefault(
+        method, {"count": 0, "errors": 0, "retries": 0, "total_time": 0.0}
+    )
+    metrics["count"] += 1
+    metrics["retries"] += retries
+    metrics["total_time"] += elapsed
+    if failed:
+        metrics["errors"] += 1
+
+
+def log_request_metrics():
+    for method, metrics in sorted(REQUEST_METRICS.items()):
+        logger.info(
+            "{} requests: {} calls, {} errors, {} retries, {:.3f}s average".format(
+                method,
+                metrics["count"],
+                metrics["errors"],
+                metrics["retries"],
+                metrics["total_time"] / metrics["count"],
             )
-            raise
-        return response.json()
+        )
+
 
-    elif method == "PATCH":
+def make_request(url, method, data=None):
+    """
+        Sends a request to EvalAI using the shared session and returns the
+        decoded JSON response. Connection errors and gateway errors are
+        retried up to `REQUEST_MAX_RETRIES` times.
+    """
+    headers = get_request_headers()
+    session = get_session()
+    timeout = (REQUEST_CONNECT_TIMEOUT, REQUEST_READ_TIMEOUT)
+    start_time = time.time()
+    attempt = 0
+    response = None
+    while True:
         try:
-            response = requests.patch(url=url, headers=headers, data=data)
-            response.raise_for_status()
-        except requests.exceptions.RequestException:
+            response = session.request(
+                method, url=url, headers=headers, data=data, timeout=timeout
+            )
+        except requests.exceptions.RequestException as e:
+            if attempt < REQUEST_MAX_RETRIES and is_retryable(
+                method, exception=e
+            ):
+                delay = get_retry_delay(attempt)
+                logger.warning(
+                    "{} request to URL {} failed due to {}, retrying in {:.2f}s".format(
+                        method, url, e, delay
+                    )
+                )
+                attempt += 1
+                time.sleep(delay)
+                continue
+            record_request_metrics(
+                method, time.time() - start_time, attempt, True
+            )
             logger.info(
                 "The worker is not able to establish connection with EvalAI"
             )
             raise
-        except requests.exceptions.HTTPError:
-            logger.info(
-                "The request to URL {} is failed due to {}"
-                % (url, response.json())
+        if (
+            not response.ok
+            and attempt < REQUEST_MAX_RETRIES
+            and is_retryable(method, response=response)
+        ):
+            delay = get_retry_delay(attempt)
+            logger.warning(
+                "{} request to URL {} returned {}, retrying in {:.2f}s".format(
+                    method, url, response.status_code, delay
+                )
             )
-            raise
-        return response.json()
+            attempt += 1
+            time.sleep(delay)
+            continue
+        break
+
+    elapsed = time.time() - start_time
+    try:
+        response.raise_for_status()
+    except requests.exceptions.HTTPError:
+        record_request_metrics(method, elapsed, attempt, True)
+        logger.exception(
+            "The request to URL {} is failed due to {}".format(
+                url, response.text
+            )
+        )
+        raise
+    record_request_metrics(method, elapsed, attempt, False)
+    logger.debug(
+        "{} {} took {:.3f}s with {} retries".format(
+            method, url, elapsed, attempt
+        )
+    )
+    return response.json()
 
 
 def get_message_from_sqs_queue():
@@ -574,7 +693,11 @@ def main():
     create_dir_as_python_package(SUBMISSION_DATA_BASE_DIR)
     load_challenge()
 
+    metrics_logged_at = time.time()
     while True:
+        if time.time() - metrics_logged_at >= REQUEST_METRICS_LOG_INTERVAL:
+            log_request_metrics()
+            metrics_logged_at = time.time()
         logger.info(
             "Fetching new messages from the queue {}".format(QUEUE_NAME)
         )
@@ -600,6 +723,7 @@ def main():
         time.sleep(5)
         if killer.kill_now:
             break
+    log_request_metrics()
 
 
 if __name__ == "__main__":
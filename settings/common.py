@@ -71,6 +71,7 @@ THIRD_PARTY_APPS = [
     "rest_framework_expiring_authtoken",
     "drf_yasg",
     "django_filters",
+    "channels",
 ]
 
 INSTALLED_APPS = DEFAULT_APPS + OUR_APPS + THIRD_PARTY_APPS
@@ -84,6 +85,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "base.middleware.RequestMemoMiddleware",
 ]
 
 ROOT_URLCONF = "evalai.urls"
@@ -266,6 +268,23 @@ CACHES = {
     }
 }
 
+# Maximum time in seconds a public API response is served from the cache
+RESPONSE_CACHE_TIMEOUT = 60
+
+# The leaderboard websocket push needs a redis channel layer, it is
+# disabled when REDIS_URL is not set
+CHANNEL_LAYERS = {}
+if os.environ.get("REDIS_URL"):
+    CHANNEL_LAYERS["default"] = {
+        "BACKEND": "asgi_redis.RedisChannelLayer",
+        "CONFIG": {"hosts": [os.environ.get("REDIS_URL")]},
+        "ROUTING": "evalai.routing.channel_routing",
+    }
+
+# Number of top leaderboard entries whose rank changes are pushed to the
+# websocket clients
+LEADERBOARD_PUSH_TOP_N = 10
+
 # The maximum size in bytes for request body
 # https://docs.djangoproject.com/en/1.10/ref/settings/#data-upload-max-memory-size
 FILE_UPLOAD_MAX_MEMORY_SIZE = 4294967296  # 4 GB
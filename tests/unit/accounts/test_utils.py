@@ -0,0 +1,118 @@
+from datetime import timedelta
+
+from allauth.account.models import EmailAddress
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from accounts.utils import get_authorization_context
+from base.utils import clear_request_memo, start_request_memo
+from challenges.models import Challenge
+from hosts.models import ChallengeHost, ChallengeHostTeam
+from hosts.utils import is_user_a_host_of_challenge
+from participants.models import Participant, ParticipantTeam
+from participants.utils import has_user_participated_in_challenge
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+        }
+    }
+)
+class AuthorizationContextTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(
+            username="user", email="user@test.com", password="password"
+        )
+        EmailAddress.objects.create(
+            user=self.user, email="user@test.com", primary=True, verified=True
+        )
+        self.challenge_host_team = ChallengeHostTeam.objects.create(
+            team_name="Test Challenge Host Team", created_by=self.user
+        )
+        self.challenge = Challenge.objects.create(
+            title="Test Challenge",
+            description="Description for test challenge",
+            terms_and_conditions="Terms and conditions for test challenge",
+            submission_guidelines="Submission guidelines for test challenge",
+            creator=self.challenge_host_team,
+            start_date=timezone.now() - timedelta(days=2),
+            end_date=timezone.now() + timedelta(days=1),
+            published=False,
+            enable_forum=True,
+            anonymous_leaderboard=False,
+        )
+        self.participant_team = ParticipantTeam.objects.create(
+            team_name="Participant Team", created_by=self.user
+        )
+        Participant.objects.create(
+            user=self.user,
+            status=Participant.ACCEPTED,
+            team=self.participant_team,
+        )
+        start_request_memo()
+        self.addCleanup(clear_request_memo)
+
+    def test_checks_are_memoized_for_the_request(self):
+        self.assertFalse(
+            is_user_a_host_of_challenge(self.user, self.challenge.pk)
+        )
+        self.assertFalse(
+            has_user_participated_in_challenge(self.user, self.challenge.pk)
+        )
+        with self.assertNumQueries(0):
+            is_user_a_host_of_challenge(self.user, self.challenge.pk)
+            has_user_participated_in_challenge(self.user, self.challenge.pk)
+
+    def test_context_is_invalidated_on_host_and_participation_changes(self):
+        self.assertFalse(
+            is_user_a_host_of_challenge(self.user, self.challenge.pk)
+        )
+        self.assertFalse(
+            has_user_participated_in_challenge(self.user, self.challenge.pk)
+        )
+        ChallengeHost.objects.create(
+            user=self.user,
+            team_name=self.challenge_host_team,
+            status=ChallengeHost.ACCEPTED,
+            permissions=ChallengeHost.ADMIN,
+        )
+        self.challenge.participant_teams.add(self.participant_team)
+        self.assertTrue(
+            is_user_a_host_of_challenge(self.user, self.challenge.pk)
+        )
+        self.assertTrue(
+            has_user_participated_in_challenge(self.user, self.challenge.pk)
+        )
+
+    def test_verified_email_is_invalidated_on_email_change(self):
+        self.assertTrue(
+            get_authorization_context(self.user).has_verified_email
+        )
+        EmailAddress.objects.filter(user=self.user).delete()
+        self.assertFalse(
+            get_authorization_context(self.user).has_verified_email
+        )
+
+    def test_is_challenge_creator(self):
+        other_user = User.objects.create(
+            username="other", email="other@test.com", password="password"
+        )
+        self.assertTrue(
+            get_authorization_context(self.user).is_challenge_creator(
+                self.challenge.pk
+            )
+        )
+        self.assertFalse(
+            get_authorization_context(other_user).is_challenge_creator(
+                self.challenge.pk
+            )
+        )
+
+    def test_checks_of_a_missing_challenge(self):
+        self.assertFalse(is_user_a_host_of_challenge(self.user, None))
+        self.assertFalse(has_user_participated_in_challenge(self.user, None))
@@ -14,6 +14,8 @@ from allauth.account.models import EmailAddress
 from rest_framework import status
 from rest_framework.test import APITestCase, APIClient
 
+from analytics.models import ExportJob
+from analytics.tasks import run_export_job
 from challenges.models import Challenge, ChallengePhase
 from challenges.utils import get_challenge_model
 from hosts.models import ChallengeHost, ChallengeHostTeam
@@ -779,7 +781,7 @@ class GetLastSubmissionTimeTest(BaseAPITestClass):
         )
         expected = {
             "last_submission_datetime": "{0}{1}".format(
-                self.submission.created_at.isoformat(), "Z"
+                self.submission.submitted_at.isoformat(), "Z"
             ).replace("+00:00", "")
         }
         response = self.client.get(self.url, {})
@@ -904,7 +906,7 @@ class GetLastSubmissionDateTimeAnalysisTest(BaseAPITestClass):
             },
         )
 
-        datetime = self.submission.created_at.isoformat()
+        datetime = self.submission.submitted_at.isoformat()
         expected = {
             "last_submission_timestamp_in_challenge_phase": "You dont have any submissions in this challenge phase!",
             "last_submission_timestamp_in_challenge": "{0}{1}".format(
@@ -932,7 +934,7 @@ class GetLastSubmissionDateTimeAnalysisTest(BaseAPITestClass):
             },
         )
 
-        datetime = self.submission.created_at.isoformat()
+        datetime = self.submission.submitted_at.isoformat()
         expected = {
             "last_submission_timestamp_in_challenge_phase": "{0}{1}".format(
                 datetime, "Z"
@@ -958,6 +960,32 @@ class GetLastSubmissionDateTimeAnalysisTest(BaseAPITestClass):
         self.assertEqual(response_data, expected)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_get_last_submission_datetime_analysis_with_submissions_in_other_phases(
+        self
+    ):
+        submission2 = Submission.objects.create(
+            participant_team=self.participant_team,
+            challenge_phase=self.challenge_phase2,
+            created_by=self.challenge_host_team.created_by,
+            status="submitted",
+            input_file=self.challenge_phase2.test_annotation,
+            method_name="Test Method",
+            method_description="Test Description",
+            project_url="http://testserver/",
+            publication_url="http://testserver/",
+            is_public=True,
+        )
+        response = self.client.get(self.url, {})
+        self.assertEqual(
+            response.data["last_submission_timestamp_in_challenge_phase"],
+            self.submission.submitted_at,
+        )
+        self.assertEqual(
+            response.data["last_submission_timestamp_in_challenge"],
+            submission2.submitted_at,
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
 
 class GetParticipantTeamsTest(BaseAPITestClass):
     def setUp(self):
@@ -1021,3 +1049,199 @@ class GetParticipantTeamsTest(BaseAPITestClass):
         response = self.client.get(self.url, {})
         self.assertEqual(response.data, expected)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ExportJobTest(BaseAPITestClass):
+    def setUp(self):
+        super(ExportJobTest, self).setUp()
+        self.url = reverse_lazy(
+            "analytics:create_export_job",
+            kwargs={"challenge_pk": self.challenge.pk},
+        )
+        self.challenge.participant_teams.add(self.participant_team)
+        self.challenge.participant_teams.add(self.participant_team3)
+
+    def test_create_export_job_reuses_unchanged_export(self):
+        data = {"export_type": ExportJob.PARTICIPANTS, "file_format": "csv"}
+        response = self.client.post(self.url, data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["status"], ExportJob.QUEUED)
+        export_job_pk = response.data["id"]
+
+        response = self.client.post(self.url, data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["id"], export_job_pk)
+
+        Participant.objects.create(
+            user=self.user, status=Participant.SELF, team=self.participant_team
+        )
+        response = self.client.post(self.url, data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotEqual(response.data["id"], export_job_pk)
+
+    def test_create_export_job_of_submissions_tracks_team_members(self):
+        data = {"export_type": ExportJob.SUBMISSIONS, "file_format": "csv"}
+        response = self.client.post(self.url, data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        export_job_pk = response.data["id"]
+
+        Participant.objects.create(
+            user=self.user, status=Participant.SELF, team=self.participant_team
+        )
+        response = self.client.post(self.url, data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotEqual(response.data["id"], export_job_pk)
+
+    def test_run_export_job_writes_participant_teams(self):
+        response = self.client.post(
+            self.url, {"export_type": ExportJob.PARTICIPANTS}
+        )
+        export_job = ExportJob.objects.get(pk=response.data["id"])
+        with self.settings(MEDIA_ROOT="/tmp/evalai"):
+            run_export_job(export_job.pk)
+            export_job.refresh_from_db()
+            with export_job.export_file.storage.open(
+                export_job.export_file.name
+            ) as export_file:
+                rows = list(
+                    csv.reader(io.StringIO(export_file.read().decode("utf-8")))
+                )
+        self.assertEqual(export_job.status, ExportJob.FINISHED)
+        self.assertEqual(export_job.rows_count, 2)
+        self.assertEqual(
+            rows,
+            [
+                ["team_name", "team_members", "team_members_email_ids"],
+                ["Participant Team3", "user3", "user3@test.com"],
+                ["Participant Team", "otheruser", "otheruser@test.com"],
+            ],
+        )
+
+        url = reverse_lazy(
+            "analytics:get_export_job",
+            kwargs={
+                "challenge_pk": self.challenge.pk,
+                "export_job_pk": export_job.pk,
+            },
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], ExportJob.FINISHED)
+        self.assertIsNotNone(response.data["url"])
+
+    def test_user_not_host_creates_export_job(self):
+        expected = {
+            "error": "Sorry, you are not authorized to make this request"
+        }
+        self.client.force_authenticate(user=self.user2)
+        response = self.client.post(
+            self.url, {"export_type": ExportJob.SUBMISSIONS}
+        )
+        self.assertEqual(response.data, expected)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class GetChallengeAnalyticsOfAllPhasesTest(BaseAPITestClass):
+    def setUp(self):
+        super(GetChallengeAnalyticsOfAllPhasesTest, self).setUp()
+        self.url = reverse_lazy(
+            "analytics:get_challenge_analytics_of_all_phases",
+            kwargs={"challenge_pk": self.challenge1.pk},
+        )
+        self.submission = Submission.objects.create(
+            participant_team=self.participant_team,
+            challenge_phase=self.challenge_phase1,
+            created_by=self.user2,
+            status=Submission.SUBMITTED,
+            input_file=self.challenge_phase1.test_annotation,
+        )
+        self.submission.status = Submission.FINISHED
+        self.submission.is_flagged = True
+        self.submission.is_public = True
+        self.submission.save()
+        self.submission2 = Submission.objects.create(
+            participant_team=self.participant_team3,
+            challenge_phase=self.challenge_phase1,
+            created_by=self.user3,
+            status=Submission.SUBMITTED,
+            input_file=self.challenge_phase1.test_annotation,
+        )
+        self.submission2.status = Submission.FAILED
+        self.submission2.is_public = False
+        self.submission2.save()
+
+    def test_get_challenge_analytics_of_all_phases(self):
+        response = self.client.get(self.url, {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["challenge"], self.challenge1.pk)
+        self.assertEqual(
+            response.data["last_submission_timestamp_in_challenge"],
+            self.submission2.submitted_at,
+        )
+        phase1, phase2 = response.data["challenge_phases"]
+        self.assertEqual(phase1["challenge_phase"], self.challenge_phase1.pk)
+        self.assertEqual(phase1["total_submissions"], 2)
+        self.assertEqual(phase1["participant_team_count"], 2)
+        self.assertEqual(phase1["flagged_submissions_count"], 1)
+        self.assertEqual(phase1["public_submissions_count"], 1)
+        self.assertEqual(phase1["status_counts"][Submission.FINISHED], 1)
+        self.assertEqual(phase1["status_counts"][Submission.FAILED], 1)
+        self.assertEqual(phase1["status_counts"][Submission.RUNNING], 0)
+        self.assertEqual(phase2["challenge_phase"], self.challenge_phase2.pk)
+        self.assertEqual(phase2["total_submissions"], 0)
+        self.assertEqual(phase2["flagged_submissions_count"], 0)
+        self.assertIsNone(phase2["last_submission_timestamp"])
+
+    def test_user_not_host_gets_challenge_analytics(self):
+        expected = {
+            "error": "Sorry, you are not authorized to make this request"
+        }
+        self.client.force_authenticate(user=self.user2)
+        response = self.client.get(self.url, {})
+        self.assertEqual(response.data, expected)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class GetSubmissionTrendsOfChallengeTest(BaseAPITestClass):
+    def setUp(self):
+        super(GetSubmissionTrendsOfChallengeTest, self).setUp()
+        self.url = reverse_lazy(
+            "analytics:get_submission_trends_of_challenge",
+            kwargs={"challenge_pk": self.challenge.pk},
+        )
+        self.submission = Submission.objects.create(
+            participant_team=self.participant_team,
+            challenge_phase=self.challenge_phase,
+            created_by=self.user2,
+            status=Submission.SUBMITTED,
+            input_file=self.challenge_phase.test_annotation,
+        )
+        self.submission2 = Submission.objects.create(
+            participant_team=self.participant_team3,
+            challenge_phase=self.challenge_phase,
+            created_by=self.user3,
+            status=Submission.SUBMITTED,
+            input_file=self.challenge_phase.test_annotation,
+        )
+        self.submission2.status = Submission.FAILED
+        self.submission2.save()
+
+    def test_get_submission_trends_per_day(self):
+        response = self.client.get(self.url, {"granularity": "day"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(
+            response.data[0]["period"],
+            self.submission.submitted_at.replace(
+                hour=0, minute=0, second=0, microsecond=0
+            ),
+        )
+        self.assertEqual(response.data[0]["total"], 2)
+        self.assertEqual(
+            response.data[0]["status_counts"],
+            {Submission.SUBMITTED: 1, Submission.FAILED: 1},
+        )
+
+    def test_get_submission_trends_with_wrong_granularity(self):
+        response = self.client.get(self.url, {"granularity": "year"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
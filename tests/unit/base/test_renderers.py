@@ -0,0 +1,34 @@
+import json
+import msgpack
+
+from datetime import datetime
+from decimal import Decimal
+from unittest import TestCase
+
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from base.renderers import MsgPackRenderer
+
+
+class MsgPackRendererTest(TestCase):
+    def setUp(self):
+        self.renderer = MsgPackRenderer()
+
+    def test_render_encodes_like_json(self):
+        data = {
+            "id": 1,
+            "team_name": "Participant Team",
+            "result": [50.0, None],
+            "score": Decimal("75.50"),
+            "submitted_at": datetime(2019, 5, 1, 12, 30, tzinfo=timezone.utc),
+        }
+        expected = json.loads(JSONRenderer().render(data).decode("utf-8"))
+
+        content = self.renderer.render(data)
+        self.assertEqual(msgpack.unpackb(content, raw=False), expected)
+        self.assertEqual(expected["submitted_at"], "2019-05-01T12:30:00Z")
+        self.assertEqual(expected["score"], 75.5)
+
+    def test_render_none(self):
+        self.assertEqual(self.renderer.render(None), b"")
@@ -6,15 +6,39 @@ from datetime import timedelta
 
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.urlresolvers import reverse_lazy
+from django.test import override_settings
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.utils import timezone
 
 from allauth.account.models import EmailAddress
+from mock import patch
 from rest_framework import status
-from rest_framework.test import APITestCase, APIClient
+from rest_framework.request import Request
+from rest_framework.test import (
+    APIClient,
+    APIRequestFactory,
+    APITestCase,
+    APITransactionTestCase,
+)
 
-from base.utils import RandomFileName, send_slack_notification
-from challenges.models import Challenge, ChallengePhase
+from base.utils import (
+    RandomFileName,
+    get_cache_versions,
+    paginated_queryset,
+    send_slack_notification,
+    StandardResultSetPagination,
+)
+from challenges.models import (
+    LEADERBOARD_CACHE_VERSION_KEY,
+    Challenge,
+    ChallengePhase,
+    ChallengePhaseSplit,
+    DatasetSplit,
+    Leaderboard,
+    LeaderboardData,
+)
 from hosts.models import ChallengeHostTeam
 from jobs.models import Submission
 from participants.models import Participant, ParticipantTeam
@@ -22,7 +46,7 @@ from participants.models import Participant, ParticipantTeam
 from scripts import seed
 
 
-class BaseAPITestClass(APITestCase):
+class BaseAPITestMixin(object):
     def setUp(self):
         self.client = APIClient(enforce_csrf_checks=True)
 
@@ -96,6 +120,10 @@ class BaseAPITestClass(APITestCase):
         )
 
 
+class BaseAPITestClass(BaseAPITestMixin, APITestCase):
+    pass
+
+
 class TestRandomFileName(BaseAPITestClass):
     def setUp(self):
         super(TestRandomFileName, self).setUp()
@@ -140,3 +168,155 @@ class TestSlackNotification(BaseAPITestClass):
         )
         self.assertEqual(type(response), requests.models.Response)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+        }
+    }
+)
+class TestCacheResponse(BaseAPITestMixin, APITransactionTestCase):
+    # The cached versions are bumped once the changes are committed, so the
+    # tests do not run in a transaction
+    def setUp(self):
+        super(TestCacheResponse, self).setUp()
+        self.challenge.published = True
+        self.challenge.approved_by_admin = True
+        self.challenge.save()
+        self.url = reverse_lazy(
+            "challenges:get_all_challenges",
+            kwargs={"challenge_time": "all"},
+        )
+        self.client.force_authenticate(user=None)
+
+    def tearDown(self):
+        cache.clear()
+        super(TestCacheResponse, self).tearDown()
+
+    def test_cache_response_returns_not_modified_for_current_etag(self):
+        response = self.client.get(self.url, {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("ETag", response)
+        self.assertIn("Last-Modified", response)
+
+        response = self.client.get(
+            self.url, {}, HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_cache_response_is_invalidated_when_challenge_changes(self):
+        response = self.client.get(self.url, {})
+        etag = response["ETag"]
+        self.assertEqual(response.data["results"][0]["title"], "Test Challenge")
+
+        self.challenge.title = "Updated Test Challenge"
+        self.challenge.save()
+
+        response = self.client.get(self.url, {}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(
+            response.data["results"][0]["title"], "Updated Test Challenge"
+        )
+
+    def test_cache_response_is_invalidated_when_host_team_changes(self):
+        response = self.client.get(self.url, {})
+        etag = response["ETag"]
+
+        self.challenge_host_team.team_name = "Updated Host Team"
+        self.challenge_host_team.save()
+
+        response = self.client.get(self.url, {}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["results"][0]["creator"]["team_name"],
+            "Updated Host Team",
+        )
+
+    def test_leaderboard_version_is_bumped_by_team_and_method_changes(self):
+        challenge_phase_split = ChallengePhaseSplit.objects.create(
+            dataset_split=DatasetSplit.objects.create(
+                name="Test Dataset Split", codename="test-split"
+            ),
+            challenge_phase=self.challenge_phase,
+            leaderboard=Leaderboard.objects.create(
+                schema={"labels": ["score"], "default_order_by": "score"}
+            ),
+            visibility=ChallengePhaseSplit.PUBLIC,
+        )
+        self.participant_team.challenge_set.add(self.challenge)
+        version_key = LEADERBOARD_CACHE_VERSION_KEY.format(
+            challenge_phase_split.pk
+        )
+        versions = get_cache_versions([version_key])
+
+        self.participant_team.team_name = "Updated Participant Team"
+        self.participant_team.save()
+        self.assertNotEqual(get_cache_versions([version_key]), versions)
+        versions = get_cache_versions([version_key])
+
+        LeaderboardData.objects.create(
+            challenge_phase_split=challenge_phase_split,
+            submission=self.submission,
+            leaderboard=challenge_phase_split.leaderboard,
+            result={"score": 1},
+        )
+        versions = get_cache_versions([version_key])
+        self.submission.method_name = "Updated Test Method"
+        self.submission.save()
+        self.assertNotEqual(get_cache_versions([version_key]), versions)
+
+
+class TestApproximateCountPagination(BaseAPITestClass):
+    def setUp(self):
+        super(TestApproximateCountPagination, self).setUp()
+        for index in range(4):
+            User.objects.create(
+                username="pageduser{}".format(index),
+                email="pageduser{}@test.com".format(index),
+                password="secret_password",
+            )
+        self.users = User.objects.order_by("pk")
+
+    def paginate(self, **params):
+        request = Request(APIRequestFactory().get("/", params))
+        paginator, result_page = paginated_queryset(
+            self.users,
+            request,
+            pagination_class=StandardResultSetPagination(),
+        )
+        return paginator.get_paginated_response(
+            [user.pk for user in result_page]
+        ).data
+
+    @patch("base.utils.PAGINATION_COUNT_CAP", 3)
+    def test_capped_count_of_first_page(self):
+        response_data = self.paginate(count="capped", page_size=2)
+        self.assertEqual(response_data["count"], "3+")
+        self.assertEqual(
+            response_data["results"],
+            list(self.users.values_list("pk", flat=True)[:2]),
+        )
+        self.assertIsNone(response_data["previous"])
+        self.assertIn("page=2", response_data["next"])
+
+    @patch("base.utils.PAGINATION_COUNT_CAP", 10)
+    def test_capped_count_under_the_cap(self):
+        response_data = self.paginate(count="capped", page_size=2)
+        self.assertEqual(response_data["count"], 5)
+
+    def test_exact_count_of_last_page(self):
+        response_data = self.paginate(count="estimated", page_size=2, page=3)
+        self.assertEqual(response_data["count"], 5)
+        self.assertEqual(
+            response_data["results"],
+            list(self.users.values_list("pk", flat=True)[4:]),
+        )
+        self.assertIsNone(response_data["next"])
+        self.assertIn("page=2", response_data["previous"])
+
+    def test_estimated_count_is_at_least_the_paged_results(self):
+        response_data = self.paginate(count="estimated", page_size=2)
+        self.assertGreaterEqual(response_data["count"], 3)
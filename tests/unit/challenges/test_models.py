@@ -8,6 +8,7 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
 from django.contrib.auth.models import User
 from django.utils import timezone
+from mock import patch
 
 from challenges.models import (
     Challenge,
@@ -209,6 +210,35 @@ class LeaderboardTestCase(BaseTestCase):
         instance_id = str(self.leaderboard.id)
         self.assertEqual(instance_id, self.leaderboard.__str__())
 
+    @patch("challenges.utils.update_leaderboard_data_label_values")
+    @patch("jobs.utils.rebuild_leaderboard_ranks")
+    def test_save_only_rewrites_leaderboard_on_schema_change(
+        self, rebuild_leaderboard_ranks, update_leaderboard_data_label_values
+    ):
+        leaderboard = Leaderboard.objects.create(
+            schema={"labels": ["score"], "default_order_by": "score"}
+        )
+        ChallengePhaseSplit.objects.filter(
+            pk=self.challenge_phase_split.pk
+        ).update(leaderboard=leaderboard)
+
+        leaderboard.save()
+        self.assertFalse(update_leaderboard_data_label_values.called)
+        self.assertFalse(rebuild_leaderboard_ranks.called)
+
+        leaderboard.schema["labels"].append("accuracy")
+        leaderboard.save()
+        update_leaderboard_data_label_values.assert_called_once_with(
+            leaderboard
+        )
+        self.assertFalse(rebuild_leaderboard_ranks.called)
+
+        leaderboard.schema["default_order_by"] = "accuracy"
+        leaderboard.save()
+        rebuild_leaderboard_ranks.assert_called_once_with(
+            self.challenge_phase_split.pk
+        )
+
 
 class ChallengePhaseSplitTestCase(BaseTestCase):
     def setUp(self):
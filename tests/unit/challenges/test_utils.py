@@ -2,8 +2,16 @@ import os
 import unittest
 
 from django.conf import settings
+from django.test import TestCase
 
-from challenges.utils import get_file_content
+from challenges.models import Leaderboard
+from challenges.utils import (
+    LEADERBOARD_METRIC_INDEX_PREFIX,
+    create_leaderboard_metric_index,
+    get_file_content,
+    get_leaderboard_metric_index_name,
+    get_leaderboard_metric_indexes,
+)
 
 
 class BaseTestCase(unittest.TestCase):
@@ -16,3 +24,28 @@ class BaseTestCase(unittest.TestCase):
         test_file_content = get_file_content(self.test_file_path, "rb")
         expected = "1\n2\n3\n4\n5\n6\n7\n8\n9\n10\n"
         self.assertEqual(test_file_content.decode(), expected)
+
+    def test_get_leaderboard_metric_index_name(self):
+        name = get_leaderboard_metric_index_name("score")
+        self.assertTrue(name.startswith(LEADERBOARD_METRIC_INDEX_PREFIX))
+        self.assertLessEqual(len(name), 63)
+        self.assertEqual(name, get_leaderboard_metric_index_name("score"))
+        self.assertNotEqual(name, get_leaderboard_metric_index_name("error"))
+
+
+class LeaderboardMetricIndexTestCase(TestCase):
+    def test_leaderboard_save_does_not_create_metric_index(self):
+        Leaderboard.objects.create(
+            schema={"labels": ["accuracy"], "default_order_by": "accuracy"}
+        )
+        self.assertNotIn(
+            get_leaderboard_metric_index_name("accuracy"),
+            get_leaderboard_metric_indexes(),
+        )
+
+    def test_create_leaderboard_metric_index(self):
+        create_leaderboard_metric_index("score")
+        self.assertEqual(
+            get_leaderboard_metric_indexes(),
+            {get_leaderboard_metric_index_name("score"): True},
+        )
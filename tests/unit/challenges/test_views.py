@@ -12,7 +12,9 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.urlresolvers import reverse_lazy
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.db import connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 import mock
 
@@ -3100,6 +3102,51 @@ class GetAllSubmissionsTest(BaseAPITestClass):
         self.assertEqual(response_phase2.data["results"], [])
         self.assertEqual(response_phase2.status_code, status.HTTP_200_OK)
 
+    def test_get_all_submissions_query_count_does_not_grow_with_page_size(
+        self
+    ):
+        self.url = reverse_lazy(
+            "challenges:get_all_submissions_of_challenge",
+            kwargs={
+                "challenge_pk": self.challenge5.pk,
+                "challenge_phase_pk": self.challenge5_phase1.pk,
+            },
+        )
+        self.client.force_authenticate(user=self.user5)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {})
+        self.assertEqual(len(response.data["results"]), 2)
+        query_count = len(queries)
+
+        for index in range(3):
+            user = User.objects.create(
+                username="member{}".format(index),
+                email="member{}@test.com".format(index),
+            )
+            participant_team = ParticipantTeam.objects.create(
+                team_name="Member Team {}".format(index), created_by=user
+            )
+            Participant.objects.create(
+                user=user, status=Participant.ACCEPTED, team=participant_team
+            )
+            with self.settings(MEDIA_ROOT="/tmp/evalai"):
+                Submission.objects.create(
+                    participant_team=participant_team,
+                    challenge_phase=self.challenge5_phase1,
+                    created_by=user,
+                    status="submitted",
+                    input_file=SimpleUploadedFile(
+                        "test_sample_file.txt",
+                        b"Dummy file content",
+                        content_type="text/plain",
+                    ),
+                )
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {})
+        self.assertEqual(len(response.data["results"]), 5)
+        self.assertEqual(len(queries), query_count)
+
     def test_get_all_submissions_when_user_is_participant_of_challenge(self):
         self.url = reverse_lazy(
             "challenges:get_all_submissions_of_challenge",
@@ -3309,6 +3356,32 @@ class DownloadAllSubmissionsFileTest(BaseAPITestClass):
         response = self.client.get(self.url, {})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_download_all_submissions_streams_a_row_per_submission(self):
+        self.url = reverse_lazy(
+            "challenges:download_all_submissions",
+            kwargs={
+                "challenge_pk": self.challenge.pk,
+                "challenge_phase_pk": self.challenge_phase.pk,
+                "file_type": self.file_type_csv,
+            },
+        )
+        response = self.client.get(self.url, {})
+        self.assertTrue(response.streaming)
+        rows = list(
+            csv.reader(
+                io.StringIO(
+                    b"".join(response.streaming_content).decode("utf-8")
+                )
+            )
+        )
+        submission_ids = Submission.objects.filter(
+            challenge_phase__challenge=self.challenge
+        ).order_by("-submitted_at").values_list("id", flat=True)
+        self.assertEqual(rows[0][:2], ["id", "Team Name"])
+        self.assertEqual(
+            [int(row[0]) for row in rows[1:]], list(submission_ids)
+        )
+
     def test_download_all_submissions_for_host_with_custom_fields(self):
         self.url = reverse_lazy('challenges:download_all_submissions',
                                 kwargs={'challenge_pk': self.challenge.pk,
@@ -3339,7 +3412,10 @@ class DownloadAllSubmissionsFileTest(BaseAPITestClass):
                         row.append(submission[field])
                 expected_submissions.writerow(row)
         response = self.client.post(self.url, self.data)
-        self.assertEqual(response.content.decode('utf-8'), expected.getvalue())
+        self.assertEqual(
+            b"".join(response.streaming_content).decode('utf-8'),
+            expected.getvalue(),
+        )
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
     def test_download_all_submissions_when_user_is_challenge_participant(self):
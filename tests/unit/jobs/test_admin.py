@@ -11,7 +11,15 @@ from django.utils import timezone
 from allauth.account.models import EmailAddress
 from rest_framework.test import APITestCase, APIClient
 
-from challenges.models import Challenge, ChallengePhase
+from challenges.models import (
+    Challenge,
+    ChallengePhase,
+    ChallengePhaseSplit,
+    DatasetSplit,
+    Leaderboard,
+    LeaderboardData,
+    LeaderboardRank,
+)
 from hosts.models import ChallengeHostTeam
 from jobs.models import Submission
 from jobs.admin import SubmissionAdmin
@@ -138,3 +146,36 @@ class SubmissionAdminTest(BaseAPITestClass):
         self.assertEqual(
             Submission.objects.filter(status="submitted").count(), 1
         )
+
+    def test_submit_job_to_worker_removes_leaderboard_ranks(self):
+        challenge_phase_split = ChallengePhaseSplit.objects.create(
+            challenge_phase=self.challenge_phase,
+            dataset_split=DatasetSplit.objects.create(
+                name="Split 1", codename="split1"
+            ),
+            leaderboard=Leaderboard.objects.create(
+                schema={"labels": ["score"], "default_order_by": "score"}
+            ),
+            visibility=ChallengePhaseSplit.HOST,
+        )
+        LeaderboardData.objects.create(
+            challenge_phase_split=challenge_phase_split,
+            submission=self.submission,
+            leaderboard=challenge_phase_split.leaderboard,
+            result={"score": 50.0},
+        )
+        self.submission.status = Submission.FINISHED
+        self.submission.save()
+        self.assertTrue(
+            LeaderboardRank.objects.filter(
+                challenge_phase_split=challenge_phase_split
+            ).exists()
+        )
+
+        queryset = Submission.objects.filter(status=Submission.FINISHED)
+        self.app_admin.submit_job_to_worker(request, queryset)
+        self.assertFalse(
+            LeaderboardRank.objects.filter(
+                challenge_phase_split=challenge_phase_split
+            ).exists()
+        )
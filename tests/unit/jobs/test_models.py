@@ -7,10 +7,17 @@ from django.contrib.auth.models import User
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
 from django.utils import timezone
+from mock import patch
 
 from challenges.models import Challenge, ChallengePhase
 from hosts.models import ChallengeHostTeam
-from jobs.models import Submission
+from jobs.models import (
+    Submission,
+    SubmissionQuota,
+    SubmissionRollup,
+    rebuild_submission_quota,
+    rebuild_submission_rollup,
+)
 from participants.models import ParticipantTeam
 
 
@@ -63,9 +70,9 @@ class BaseTestCase(TestCase):
         shutil.rmtree("/tmp/evalai")
 
 
-class SubmissionTestCase(BaseTestCase):
+class BaseSubmissionTestCase(BaseTestCase):
     def setUp(self):
-        super(SubmissionTestCase, self).setUp()
+        super(BaseSubmissionTestCase, self).setUp()
 
         self.submission = Submission.objects.create(
             participant_team=self.participant_team,
@@ -76,7 +83,121 @@ class SubmissionTestCase(BaseTestCase):
             is_public=True,
         )
 
+
+class SubmissionTestCase(BaseSubmissionTestCase):
     def test__str__(self):
         self.assertEqual(
             "{}".format(self.submission.id), self.submission.__str__()
         )
+
+
+class SubmissionQuotaTestCase(BaseSubmissionTestCase):
+    def get_quota(self):
+        return SubmissionQuota.objects.get(
+            participant_team=self.participant_team,
+            challenge_phase=self.challenge_phase,
+        )
+
+    def create_submission(self):
+        return Submission.objects.create(
+            participant_team=self.participant_team,
+            challenge_phase=self.challenge_phase,
+            created_by=self.user,
+            status="submitted",
+            input_file=self.challenge_phase.test_annotation,
+            is_public=True,
+        )
+
+    def test_quota_is_updated_on_submission(self):
+        submission = self.create_submission()
+        quota = self.get_quota()
+        self.assertEqual(submission.submission_number, 2)
+        self.assertEqual(quota.submission_number, 2)
+        self.assertEqual(quota.excluded_count, 0)
+        self.assertEqual(quota.daily_count, 2)
+        self.assertEqual(quota.monthly_count, 2)
+
+    def test_quota_counts_are_not_computed_when_quota_exists(self):
+        with patch("jobs.models.get_submission_quota_counts") as counts:
+            self.create_submission()
+        self.assertFalse(counts.called)
+        self.assertEqual(self.get_quota().submission_number, 2)
+
+    def test_missing_quota_is_created_from_submissions(self):
+        SubmissionQuota.objects.all().delete()
+        submission = self.create_submission()
+        quota = self.get_quota()
+        self.assertEqual(submission.submission_number, 2)
+        self.assertEqual(quota.submission_number, 2)
+        self.assertEqual(quota.daily_count, 2)
+
+    def test_quota_is_updated_on_status_change(self):
+        self.submission.status = Submission.FAILED
+        self.submission.save()
+        quota = self.get_quota()
+        self.assertEqual(quota.excluded_count, 1)
+        self.assertEqual(quota.daily_count, 0)
+        self.assertEqual(quota.monthly_count, 0)
+
+        self.submission.status = Submission.SUBMITTED
+        self.submission.save()
+        quota = self.get_quota()
+        self.assertEqual(quota.excluded_count, 0)
+        self.assertEqual(quota.daily_count, 1)
+        self.assertEqual(quota.monthly_count, 1)
+
+    def test_rebuild_submission_quota(self):
+        self.create_submission()
+        SubmissionQuota.objects.all().update(
+            submission_number=0, daily_count=0, monthly_count=0
+        )
+        rebuild_submission_quota(
+            self.participant_team.pk, self.challenge_phase.pk
+        )
+        quota = self.get_quota()
+        self.assertEqual(quota.submission_number, 2)
+        self.assertEqual(quota.daily_count, 2)
+        self.assertEqual(quota.monthly_count, 2)
+
+
+class SubmissionRollupTestCase(BaseSubmissionTestCase):
+    def get_rollup_counts(self):
+        return dict(
+            SubmissionRollup.objects.filter(
+                challenge_phase=self.challenge_phase
+            ).values_list("status", "count")
+        )
+
+    def test_rollup_is_updated_on_submission(self):
+        self.assertEqual(
+            self.get_rollup_counts(), {Submission.SUBMITTED: 1}
+        )
+        rollup = SubmissionRollup.objects.get(
+            challenge_phase=self.challenge_phase
+        )
+        self.assertEqual(
+            rollup.hour,
+            self.submission.submitted_at.replace(
+                minute=0, second=0, microsecond=0
+            ),
+        )
+
+    def test_rollup_is_updated_on_status_change_and_delete(self):
+        self.submission.status = Submission.FINISHED
+        self.submission.save()
+        self.assertEqual(
+            self.get_rollup_counts(),
+            {Submission.SUBMITTED: 0, Submission.FINISHED: 1},
+        )
+        self.submission.delete()
+        self.assertEqual(
+            self.get_rollup_counts(),
+            {Submission.SUBMITTED: 0, Submission.FINISHED: 0},
+        )
+
+    def test_rebuild_submission_rollup(self):
+        SubmissionRollup.objects.all().delete()
+        rebuild_submission_rollup(self.challenge_phase.pk)
+        self.assertEqual(
+            self.get_rollup_counts(), {Submission.SUBMITTED: 1}
+        )
@@ -185,6 +185,26 @@ class TestJobsUrls(BaseAPITestClass):
         resolver = resolve(self.url)
         self.assertEqual(resolver.view_name, "jobs:leaderboard")
 
+    def test_get_leaderboard_rank_of_participant_team(self):
+        self.url = reverse_lazy(
+            "jobs:get_leaderboard_rank_of_participant_team",
+            kwargs={
+                "challenge_phase_split_id": self.challenge_phase_split.pk,
+                "participant_team_pk": self.participant_team.pk,
+            },
+        )
+        self.assertEqual(
+            self.url,
+            "/api/jobs/challenge_phase_split/{}/participant_team/{}/rank/".format(
+                self.challenge_phase_split.pk, self.participant_team.pk
+            ),
+        )
+        resolver = resolve(self.url)
+        self.assertEqual(
+            resolver.view_name,
+            "jobs:get_leaderboard_rank_of_participant_team",
+        )
+
     def test_get_submission_by_pk(self):
         self.url = reverse_lazy(
             "jobs:get_submission_by_pk",
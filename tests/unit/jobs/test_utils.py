@@ -0,0 +1,96 @@
+import unittest
+
+from mock import Mock, patch
+
+from jobs.utils import (
+    format_leaderboard_entry,
+    get_leaderboard_rank_delta,
+    send_leaderboard_rank_delta,
+    sort_leaderboard_entries,
+)
+
+
+class GetLeaderboardRankDeltaTest(unittest.TestCase):
+    def setUp(self):
+        self.challenge_phase_split = Mock(pk=1)
+
+    def get_entry(self, pk, rank):
+        return {
+            "leaderboard_data": pk,
+            "participant_team": pk,
+            "participant_team__team_name": "Team {}".format(pk),
+            "is_baseline": False,
+            "score": 100.0 - rank,
+            "rank": rank,
+        }
+
+    def test_unchanged_top_entries(self):
+        top_entries = {1: self.get_entry(1, 1), 2: self.get_entry(2, 2)}
+        delta = get_leaderboard_rank_delta(
+            self.challenge_phase_split, top_entries, dict(top_entries)
+        )
+        self.assertIsNone(delta)
+
+    def test_new_entry_displaces_last_entry(self):
+        previous_top_entries = {
+            1: self.get_entry(1, 1),
+            2: self.get_entry(2, 2),
+        }
+        top_entries = {3: self.get_entry(3, 1), 1: self.get_entry(1, 2)}
+        delta = get_leaderboard_rank_delta(
+            self.challenge_phase_split, previous_top_entries, top_entries
+        )
+        self.assertEqual(delta["challenge_phase_split"], 1)
+        self.assertEqual(
+            [
+                (entry["id"], entry["rank"], entry["previous_rank"])
+                for entry in delta["entries"]
+            ],
+            [(3, 1, None), (1, 2, 1)],
+        )
+        self.assertEqual(
+            [
+                (entry["id"], entry["rank"], entry["previous_rank"])
+                for entry in delta["displaced"]
+            ],
+            [(2, None, 2)],
+        )
+
+
+class SendLeaderboardRankDeltaTest(unittest.TestCase):
+    @patch("jobs.utils.logger")
+    @patch("jobs.utils.Group")
+    def test_push_errors_are_logged(self, group, logger):
+        group.return_value.send.side_effect = ConnectionError
+        send_leaderboard_rank_delta(1, {"challenge_phase_split": 1})
+        self.assertTrue(logger.exception.called)
+
+
+class FormatLeaderboardEntryTest(unittest.TestCase):
+    def get_entry(self, result, error=None):
+        return {
+            "leaderboard__schema": {"labels": ["score", "status"]},
+            "result": result,
+            "error": error,
+        }
+
+    def test_values_are_returned_as_submitted(self):
+        entry = format_leaderboard_entry(
+            self.get_entry(
+                {"score": 10, "status": "ok"}, {"error_score": 1}
+            )
+        )
+        self.assertEqual(entry["result"], [10, "ok"])
+        self.assertIsInstance(entry["result"][0], int)
+        self.assertEqual(entry["error"], [1, None])
+
+    def test_sort_ignores_non_numeric_values(self):
+        entries = [
+            format_leaderboard_entry(self.get_entry({"score": "n/a"})),
+            format_leaderboard_entry(self.get_entry({"score": 1})),
+            format_leaderboard_entry(self.get_entry({"score": 2.5})),
+        ]
+        entries = sort_leaderboard_entries(entries, 0, True)
+        self.assertEqual(
+            [entry["result"][0] for entry in entries], [2.5, 1, "n/a"]
+        )
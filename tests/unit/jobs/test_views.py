@@ -1,14 +1,22 @@
 import collections
 import json
+import msgpack
 import os
 import shutil
 
 from datetime import timedelta
 
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
 from django.core.urlresolvers import reverse_lazy
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.contrib.auth.models import User
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
+from mock import patch
 
 from allauth.account.models import EmailAddress
 from rest_framework import status
@@ -21,9 +29,14 @@ from challenges.models import (
     DatasetSplit,
     Leaderboard,
     LeaderboardData,
+    LeaderboardRank,
 )
 from hosts.models import ChallengeHostTeam, ChallengeHost
 from jobs.models import Submission
+from jobs.utils import (
+    create_leaderboard_snapshot,
+    get_leaderboard_snapshot_entries,
+)
 from participants.models import ParticipantTeam, Participant
 
 
@@ -642,6 +655,40 @@ class GetChallengeSubmissionTest(BaseAPITestClass):
         self.assertEqual(response.data["results"], expected)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_get_challenge_submissions_with_cursor_pagination(self):
+        submission = Submission.objects.create(
+            participant_team=self.participant_team,
+            challenge_phase=self.challenge_phase,
+            created_by=self.challenge_host_team.created_by,
+            status="submitted",
+            input_file=self.challenge_phase.test_annotation,
+            method_name="Test Method",
+            method_description="Test Description",
+            project_url="http://testserver/",
+            publication_url="http://testserver/",
+            is_public=True,
+        )
+        self.challenge.participant_teams.add(self.participant_team)
+
+        response = self.client.get(
+            self.url, {"pagination": "cursor", "page_size": 1}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", response.data)
+        self.assertIsNone(response.data["previous"])
+        self.assertEqual(
+            [result["id"] for result in response.data["results"]],
+            [submission.id],
+        )
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data["next"])
+        self.assertEqual(
+            [result["id"] for result in response.data["results"]],
+            [self.submission.id],
+        )
+
 
 class GetRemainingSubmissionTest(BaseAPITestClass):
     def setUp(self):
@@ -804,6 +851,56 @@ class GetRemainingSubmissionTest(BaseAPITestClass):
         self.assertEqual(response.data["phases"][0]["limits"], expected)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_get_remaining_submission_queries_do_not_grow_with_phases(self):
+        self.url = reverse_lazy(
+            "jobs:get_remaining_submissions",
+            kwargs={"challenge_pk": self.challenge.pk},
+        )
+        self.challenge.participant_teams.add(self.participant_team)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {})
+        phases_count = len(response.data["phases"])
+
+        with self.settings(MEDIA_ROOT="/tmp/evalai"):
+            for index in range(2):
+                challenge_phase = ChallengePhase.objects.create(
+                    name="Challenge Phase {}".format(index),
+                    description="Description for Challenge Phase",
+                    leaderboard_public=False,
+                    max_submissions_per_day=10,
+                    max_submissions_per_month=20,
+                    max_submissions=100,
+                    is_public=True,
+                    start_date=timezone.now() - timedelta(days=2),
+                    end_date=timezone.now() + timedelta(days=1),
+                    challenge=self.challenge,
+                    test_annotation=SimpleUploadedFile(
+                        "test_sample_file.txt",
+                        b"Dummy file content",
+                        content_type="text/plain",
+                    ),
+                    codename="Phase Code name {}".format(index),
+                )
+                Submission.objects.create(
+                    participant_team=self.participant_team,
+                    challenge_phase=challenge_phase,
+                    created_by=self.challenge_host_team.created_by,
+                    status="finished",
+                    input_file=challenge_phase.test_annotation,
+                    method_name="Test Method",
+                )
+
+        with self.assertNumQueries(len(queries)):
+            response = self.client.get(self.url, {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["phases"]), phases_count + 2)
+        self.assertEqual(
+            response.data["phases"][-1]["limits"][
+                "remaining_submissions_count"
+            ],
+            99,
+        )
+
     def get_remaining_submission_time_when_max_limit_is_exhausted(self):
         self.url = reverse_lazy(
             "jobs:get_remaining_submissions",
@@ -1988,6 +2085,233 @@ class ChallengeLeaderboardTest(BaseAPITestClass):
         self.assertEqual(response.data["results"], expected["results"])
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_get_leaderboard_when_submission_is_flagged(self):
+        self.url = reverse_lazy(
+            "jobs:leaderboard",
+            kwargs={"challenge_phase_split_id": self.challenge_phase_split.id},
+        )
+        self.submission.is_flagged = True
+        self.submission.save()
+
+        response = self.client.get(self.url, {})
+        self.assertEqual(response.data["count"], 0)
+        self.assertEqual(response.data["results"], [])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_leaderboard_when_participant_team_is_banned(self):
+        self.url = reverse_lazy(
+            "jobs:leaderboard",
+            kwargs={"challenge_phase_split_id": self.challenge_phase_split.id},
+        )
+        self.challenge.banned_email_ids = [self.user1.email]
+        self.challenge.save()
+
+        response = self.client.get(self.url, {})
+        self.assertEqual(response.data["count"], 0)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # The team is shown again once the banned member leaves it
+        self.participant.delete()
+        response = self.client.get(self.url, {})
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_leaderboard_after_rebuilding_ranks(self):
+        self.url = reverse_lazy(
+            "jobs:leaderboard",
+            kwargs={"challenge_phase_split_id": self.challenge_phase_split.id},
+        )
+        LeaderboardRank.objects.all().delete()
+        call_command("rebuild_leaderboard_ranks")
+
+        response = self.client.get(self.url, {})
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(
+            response.data["results"][0]["id"], self.leaderboard_data.id
+        )
+        self.assertEqual(
+            LeaderboardRank.objects.get(
+                leaderboard_data=self.leaderboard_data
+            ).rank,
+            1,
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_leaderboard_skips_non_numeric_metric_values(self):
+        self.url = reverse_lazy(
+            "jobs:leaderboard",
+            kwargs={"challenge_phase_split_id": self.challenge_phase_split.id},
+        )
+        LeaderboardData.objects.create(
+            challenge_phase_split=self.challenge_phase_split,
+            submission=self.submission,
+            leaderboard=self.leaderboard,
+            result={"score": "N/A", "test-score": 90.0},
+            error={"error_score": "N/A"},
+        )
+        call_command("rebuild_leaderboard_ranks")
+
+        response = self.client.get(self.url, {})
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(
+            response.data["results"][0]["id"], self.leaderboard_data.id
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_leaderboard_ordered_by_label(self):
+        self.url = reverse_lazy(
+            "jobs:leaderboard",
+            kwargs={"challenge_phase_split_id": self.challenge_phase_split.id},
+        )
+
+        response = self.client.get(self.url, {"order_by": "test-score"})
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(
+            response.data["results"][0]["result"], self.expected_results
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_leaderboard_ordered_by_invalid_label(self):
+        self.url = reverse_lazy(
+            "jobs:leaderboard",
+            kwargs={"challenge_phase_split_id": self.challenge_phase_split.id},
+        )
+
+        expected = {"error": "Sorry, accuracy is not a leaderboard label!"}
+
+        response = self.client.get(self.url, {"order_by": "accuracy"})
+        self.assertEqual(response.data, expected)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_leaderboard_from_snapshot(self):
+        self.url = reverse_lazy(
+            "jobs:leaderboard",
+            kwargs={"challenge_phase_split_id": self.challenge_phase_split.id},
+        )
+        snapshot = create_leaderboard_snapshot(self.challenge_phase_split)
+        self.assertEqual(snapshot.entries_count, 1)
+        # The snapshot is served without reading the live leaderboard
+        LeaderboardRank.objects.all().delete()
+
+        response = self.client.get(self.url, {})
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(
+            response.data["results"][0]["id"], self.leaderboard_data.id
+        )
+        self.assertEqual(
+            response.data["results"][0]["result"], self.expected_results
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+            }
+        }
+    )
+    def test_leaderboard_snapshot_entries_are_cached(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        snapshot = create_leaderboard_snapshot(self.challenge_phase_split)
+        entries = get_leaderboard_snapshot_entries(snapshot)
+        with patch("jobs.utils.load_leaderboard_snapshot") as load:
+            self.assertEqual(get_leaderboard_snapshot_entries(snapshot), entries)
+        self.assertFalse(load.called)
+        self.assertEqual(entries[0]["id"], self.leaderboard_data.id)
+
+    def test_get_leaderboard_rank_of_participant_team(self):
+        self.url = reverse_lazy(
+            "jobs:get_leaderboard_rank_of_participant_team",
+            kwargs={
+                "challenge_phase_split_id": self.challenge_phase_split.id,
+                "participant_team_pk": self.participant_team.id,
+            },
+        )
+
+        response = self.client.get(self.url, {"neighbors": 2})
+        self.assertEqual(response.data["participant_team"], self.participant_team.id)
+        self.assertEqual(response.data["rank"], 1)
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(response.data["entry"]["id"], self.leaderboard_data.id)
+        self.assertEqual(response.data["above"], [])
+        self.assertEqual(response.data["below"], [])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_leaderboard_rank_of_participant_team_not_on_leaderboard(self):
+        self.url = reverse_lazy(
+            "jobs:get_leaderboard_rank_of_participant_team",
+            kwargs={
+                "challenge_phase_split_id": self.challenge_phase_split.id,
+                "participant_team_pk": self.participant_team.id + 100,
+            },
+        )
+
+        expected = {
+            "error": "Sorry, the participant team is not on the leaderboard!"
+        }
+
+        response = self.client.get(self.url, {})
+        self.assertEqual(response.data, expected)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_leaderboard_rank_of_participant_team_when_ranks_change(
+        self
+    ):
+        self.url = reverse_lazy(
+            "jobs:get_leaderboard_rank_of_participant_team",
+            kwargs={
+                "challenge_phase_split_id": self.challenge_phase_split.id,
+                "participant_team_pk": self.participant_team.id,
+            },
+        )
+        LeaderboardRank.objects.filter(
+            challenge_phase_split=self.challenge_phase_split
+        ).update(rank=F("rank") + 1)
+
+        response = self.client.get(self.url, {})
+        self.assertEqual(response.data["rank"], 2)
+        self.assertEqual(response.data["entry"]["id"], self.leaderboard_data.id)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_leaderboard_as_msgpack(self):
+        self.url = reverse_lazy(
+            "jobs:leaderboard",
+            kwargs={"challenge_phase_split_id": self.challenge_phase_split.id},
+        )
+
+        for params in ({}, {"layout": "columnar"}):
+            response = self.client.get(self.url, params)
+            expected = json.loads(response.content.decode("utf-8"))
+
+            response = self.client.get(
+                self.url, params, HTTP_ACCEPT="application/msgpack"
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response["Content-Type"], "application/msgpack")
+            self.assertEqual(
+                msgpack.unpackb(response.content, raw=False), expected
+            )
+
+    def test_get_leaderboard_with_columnar_layout(self):
+        self.url = reverse_lazy(
+            "jobs:leaderboard",
+            kwargs={"challenge_phase_split_id": self.challenge_phase_split.id},
+        )
+
+        response = self.client.get(self.url, {"layout": "columnar"})
+        results = response.data["results"]
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(results["schema"], self.leaderboard.schema)
+        self.assertEqual(results["id"], [self.leaderboard_data.id])
+        self.assertEqual(
+            results["participant_team_name"],
+            [self.submission.participant_team.team_name],
+        )
+        self.assertEqual(results["result"], [self.expected_results])
+        self.assertEqual(results["filtering_score"], [self.filtering_score])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
     def test_get_leaderboard_with_invalid_challenge_phase_split_id(self):
         self.url = reverse_lazy(
             "jobs:leaderboard",
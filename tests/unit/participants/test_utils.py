@@ -0,0 +1,143 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from challenges.models import Challenge
+from hosts.models import ChallengeHostTeam
+from participants.models import Participant, ParticipantTeam
+from participants.utils import (
+    get_participant_team_id_of_user_for_a_challenge,
+    get_participant_team_roster,
+)
+
+
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+        }
+    }
+)
+class GetParticipantTeamIdOfUserForAChallengeTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(
+            username="user", email="user@test.com", password="password"
+        )
+        self.participant_team = ParticipantTeam.objects.create(
+            team_name="Participant Team", created_by=self.user
+        )
+        self.challenge_host_team = ChallengeHostTeam.objects.create(
+            team_name="Test Challenge Host Team", created_by=self.user
+        )
+        self.challenge = Challenge.objects.create(
+            title="Test Challenge",
+            description="Description for test challenge",
+            terms_and_conditions="Terms and conditions for test challenge",
+            submission_guidelines="Submission guidelines for test challenge",
+            creator=self.challenge_host_team,
+            start_date=timezone.now() - timedelta(days=2),
+            end_date=timezone.now() + timedelta(days=1),
+            published=False,
+            enable_forum=True,
+            anonymous_leaderboard=False,
+        )
+        self.participant = Participant.objects.create(
+            user=self.user,
+            status=Participant.ACCEPTED,
+            team=self.participant_team,
+        )
+
+    def test_cache_is_invalidated_when_team_joins_challenge(self):
+        self.assertIsNone(
+            get_participant_team_id_of_user_for_a_challenge(
+                self.user, self.challenge.pk
+            )
+        )
+        self.challenge.participant_teams.add(self.participant_team)
+        self.assertEqual(
+            get_participant_team_id_of_user_for_a_challenge(
+                self.user, self.challenge.pk
+            ),
+            self.participant_team.pk,
+        )
+
+    def test_cache_is_invalidated_when_membership_changes(self):
+        self.challenge.participant_teams.add(self.participant_team)
+        self.assertEqual(
+            get_participant_team_id_of_user_for_a_challenge(
+                self.user, self.challenge.pk
+            ),
+            self.participant_team.pk,
+        )
+        self.participant.delete()
+        self.assertIsNone(
+            get_participant_team_id_of_user_for_a_challenge(
+                self.user, self.challenge.pk
+            )
+        )
+
+
+class GetParticipantTeamRosterTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(
+            username="user", email="user@test.com", password="password"
+        )
+        self.other_user = User.objects.create(
+            username="other", email="other@test.com", password="password"
+        )
+        challenge_host_team = ChallengeHostTeam.objects.create(
+            team_name="Test Challenge Host Team", created_by=self.user
+        )
+        self.challenge = Challenge.objects.create(
+            title="Test Challenge",
+            description="Description for test challenge",
+            terms_and_conditions="Terms and conditions for test challenge",
+            submission_guidelines="Submission guidelines for test challenge",
+            creator=challenge_host_team,
+            start_date=timezone.now() - timedelta(days=2),
+            end_date=timezone.now() + timedelta(days=1),
+            published=False,
+            enable_forum=True,
+            anonymous_leaderboard=False,
+        )
+        self.participant_team = ParticipantTeam.objects.create(
+            team_name="Participant Team", created_by=self.user
+        )
+        self.empty_participant_team = ParticipantTeam.objects.create(
+            team_name="Empty Participant Team", created_by=self.user
+        )
+        for user in (self.user, self.other_user):
+            Participant.objects.create(
+                user=user,
+                status=Participant.ACCEPTED,
+                team=self.participant_team,
+            )
+        self.challenge.participant_teams.add(
+            self.participant_team, self.empty_participant_team
+        )
+
+    def test_roster_is_loaded_in_one_query(self):
+        with self.assertNumQueries(1):
+            roster = [
+                (
+                    team.team_name,
+                    team.team_member_usernames,
+                    team.team_member_email_ids,
+                )
+                for team in get_participant_team_roster(self.challenge)
+            ]
+        self.assertEqual(
+            roster,
+            [
+                (
+                    "Participant Team",
+                    ["user", "other"],
+                    ["user@test.com", "other@test.com"],
+                ),
+                ("Empty Participant Team", [], []),
+            ],
+        )
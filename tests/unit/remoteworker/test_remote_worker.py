@@ -1,8 +1,13 @@
 import mock
+import requests
 
 from unittest import TestCase
 
 from scripts.workers.remote_submission_worker import (
+    REQUEST_CONNECT_TIMEOUT,
+    REQUEST_MAX_RETRIES,
+    REQUEST_READ_TIMEOUT,
+    log_request_metrics,
     make_request,
     get_message_from_sqs_queue,
     delete_message_from_sqs_queue,
@@ -50,23 +55,87 @@ class BaseTestClass(TestCase):
 
 
 @mock.patch("scripts.workers.remote_submission_worker.AUTH_TOKEN", "test_token")
-@mock.patch("scripts.workers.remote_submission_worker.requests")
+@mock.patch("scripts.workers.remote_submission_worker.get_session")
 class MakeRequestTestClass(BaseTestClass):
     def setUp(self):
         super(MakeRequestTestClass, self).setUp()
         self.url = super(MakeRequestTestClass, self).make_request_url()
+        self.timeout = (REQUEST_CONNECT_TIMEOUT, REQUEST_READ_TIMEOUT)
 
-    def test_make_request_get(self, mock_make_request):
+    def make_response(self, status_code):
+        response = mock.Mock(status_code=status_code, ok=status_code < 400)
+        if status_code >= 400:
+            response.raise_for_status.side_effect = requests.exceptions.HTTPError()
+        return response
+
+    def test_make_request_get(self, mock_session):
         make_request(self.url, "GET")
-        mock_make_request.get.assert_called_with(url=self.url, headers=self.headers)
+        mock_session.return_value.request.assert_called_with(
+            "GET", url=self.url, headers=self.headers, data=None, timeout=self.timeout
+        )
 
-    def test_make_request_put(self, mock_make_request):
+    def test_make_request_put(self, mock_session):
         make_request(self.url, "PUT", data=self.data)
-        mock_make_request.put.assert_called_with(url=self.url, headers=self.headers, data=self.data)
+        mock_session.return_value.request.assert_called_with(
+            "PUT", url=self.url, headers=self.headers, data=self.data, timeout=self.timeout
+        )
 
-    def test_make_request_patch(self, mock_make_request):
+    def test_make_request_patch(self, mock_session):
         make_request(self.url, "PATCH", data=self.data)
-        mock_make_request.patch.assert_called_with(url=self.url, headers=self.headers, data=self.data)
+        mock_session.return_value.request.assert_called_with(
+            "PATCH", url=self.url, headers=self.headers, data=self.data, timeout=self.timeout
+        )
+
+    @mock.patch("scripts.workers.remote_submission_worker.time.sleep")
+    def test_make_request_get_retries_server_error(self, mock_sleep, mock_session):
+        mock_session.return_value.request.side_effect = [
+            self.make_response(503),
+            self.make_response(200),
+        ]
+        make_request(self.url, "GET")
+        self.assertEqual(mock_session.return_value.request.call_count, 2)
+        self.assertEqual(mock_sleep.call_count, 1)
+
+    @mock.patch("scripts.workers.remote_submission_worker.time.sleep")
+    def test_make_request_get_retries_connection_error(self, mock_sleep, mock_session):
+        mock_session.return_value.request.side_effect = [
+            requests.exceptions.ConnectionError(),
+            self.make_response(200),
+        ]
+        make_request(self.url, "GET")
+        self.assertEqual(mock_session.return_value.request.call_count, 2)
+
+    @mock.patch("scripts.workers.remote_submission_worker.time.sleep")
+    def test_make_request_gives_up_after_max_retries(self, mock_sleep, mock_session):
+        mock_session.return_value.request.return_value = self.make_response(502)
+        with self.assertRaises(requests.exceptions.HTTPError):
+            make_request(self.url, "GET")
+        self.assertEqual(
+            mock_session.return_value.request.call_count, REQUEST_MAX_RETRIES + 1
+        )
+
+    @mock.patch("scripts.workers.remote_submission_worker.time.sleep")
+    def test_make_request_put_does_not_retry_internal_server_error(self, mock_sleep, mock_session):
+        mock_session.return_value.request.return_value = self.make_response(500)
+        with self.assertRaises(requests.exceptions.HTTPError):
+            make_request(self.url, "PUT", data=self.data)
+        self.assertEqual(mock_session.return_value.request.call_count, 1)
+        mock_sleep.assert_not_called()
+
+    @mock.patch("scripts.workers.remote_submission_worker.time.sleep")
+    def test_make_request_does_not_retry_client_error(self, mock_sleep, mock_session):
+        mock_session.return_value.request.return_value = self.make_response(400)
+        with self.assertRaises(requests.exceptions.HTTPError):
+            make_request(self.url, "GET")
+        self.assertEqual(mock_session.return_value.request.call_count, 1)
+
+    @mock.patch("scripts.workers.remote_submission_worker.logger")
+    @mock.patch("scripts.workers.remote_submission_worker.REQUEST_METRICS", {})
+    def test_log_request_metrics(self, mock_logger, mock_session):
+        make_request(self.url, "GET")
+        log_request_metrics()
+        mock_logger.info.assert_called_once()
+        self.assertIn("GET requests: 1 calls, 0 errors, 0 retries", mock_logger.info.call_args[0][0])
 
 
 @mock.patch("scripts.workers.remote_submission_worker.QUEUE_NAME", "evalai_submission_queue")